@@ -0,0 +1,450 @@
+"""Benchmarks of the node editor, run without showing a window.
+
+Every benchmark returns its parameters and "timings" in seconds, results
+get printed as JSON and can be compared against an earlier run.
+
+usage:
+    python benchmark.py
+    python benchmark.py build render --nodes 2000 --output new.json
+    python benchmark.py --baseline old.json --tolerance 0.2
+"""
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5 import QtWidgets, QtCore, QtGui
+
+import scene
+import view
+import logger
+
+
+def gridRecords(count, columns=100, spacing=200):
+    """This function describes nodes laid out on a grid.
+    Args:
+        count (int): Number of nodes.
+        columns (int): Nodes per row.
+        spacing (int): Distance in between nodes.
+    Returns:
+        (list): Returns node records for scene.GraphScene.addNodes.
+    """
+    return [{"label": "node", "nodeType": "bench",
+             "pos": ((index % columns) * spacing - columns * spacing / 2,
+                     (index // columns) * spacing),
+             "parameters": [("in", 0)]} for index in range(count)]
+
+
+def chainScene(count):
+    """This function builds a scene of nodes on a grid, each connected to
+        the previous one.
+    Args:
+        count (int): Number of nodes.
+    Returns:
+        (scene.GraphScene): Returns the scene.
+    """
+    graphScene = scene.GraphScene()
+    nodes = graphScene.addNodes(gridRecords(count))
+    graphScene.addConnections(
+        [x.getParameter("out").portId for x in nodes[:-1]],
+        [x.getParameter("in").portId for x in nodes[1:]])
+    return graphScene
+
+
+def timeIt(function, repeat):
+    """This function measures average run time of a function.
+    Args:
+        function (callable): Function to run.
+        repeat (int): Number of runs.
+    Returns:
+        (float): Returns seconds per run.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def best(function, repeat):
+    """This function runs a measurement several times and keeps the fastest
+        run, which is the least disturbed by the rest of the machine.
+    Args:
+        function (callable): Returns seconds of one measured run, its own
+            set up excluded.
+        repeat (int): Number of runs.
+    Returns:
+        (float): Returns the smallest seconds.
+    """
+    return min(function() for _ in range(repeat))
+
+
+def buildNodes(graphScene, count, parameters, columns=100, spacing=200):
+    """This function adds nodes one by one the way the editor does.
+    Args:
+        graphScene (scene.GraphScene): Scene to add to.
+        count (int): Number of nodes.
+        parameters (int): Input parameters per node, named p0, p1, ...
+        columns (int): Nodes per row.
+        spacing (int): Distance in between nodes.
+    Returns:
+        (list): Returns the node.Node objects.
+    """
+    nodes = []
+    for index in range(count):
+        node_ = graphScene.addNode(label="node", nodeType="bench")
+        for paramIndex in range(parameters):
+            node_.addParameter(paramName="p{}".format(paramIndex),
+                               paramValue=0)
+        node_.setPos((index % columns) * spacing - columns * spacing / 2,
+                     (index // columns) * spacing)
+        nodes.append(node_)
+    return nodes
+
+
+def connectNodes(nodes, shape):
+    """This function connects nodes through Parameter.addConnection.
+    Args:
+        nodes (list): node.Node objects with at least two parameters.
+        shape (str): "chain" connects each node to the next one, "diamond"
+            connects groups of four a -> b, a -> c, b -> d, c -> d with d
+            feeding a of the next group and "fanOut" connects the first node
+            to all others.
+    Returns:
+        (int): Returns number of connections made.
+    """
+    pairs = []
+    if shape == "chain":
+        pairs = [(x, y, "p0") for x, y in zip(nodes, nodes[1:])]
+    elif shape == "diamond":
+        for index in range(0, len(nodes) - 3, 4):
+            a, b, c, d = nodes[index:index + 4]
+            pairs.extend([(a, b, "p0"), (a, c, "p0"), (b, d, "p0"),
+                          (c, d, "p1")])
+            if index + 4 < len(nodes):
+                pairs.append((d, nodes[index + 4], "p0"))
+    elif shape == "fanOut":
+        pairs = [(nodes[0], x, "p0") for x in nodes[1:]]
+    made = 0
+    for source, target, paramName in pairs:
+        if source.getParameter("out").addConnection(
+                target.getParameter(paramName)):
+            made += 1
+    return made
+
+
+def renderFrame(graphView):
+    """This function polishes items through the event loop and draws one
+        frame of the view, which makes the scene index them, as in the
+        editor.
+    Args:
+        graphView (view.GraphView): View to draw.
+    Returns:
+        (None): Returns None.
+    """
+    QtWidgets.QApplication.processEvents()
+    image = QtGui.QImage(640, 480, QtGui.QImage.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+    graphView.render(painter)
+    painter.end()
+
+
+def benchmarkBuild(count=1000, parameters=4, repeat=3):
+    """This function measures adding nodes with GraphScene.addNode and
+        Node.addParameter.
+    Args:
+        count (int): Number of nodes.
+        parameters (int): Parameters per node.
+        repeat (int): Runs, the fastest one is kept.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    def run():
+        graphScene = scene.GraphScene()
+        start = time.perf_counter()
+        buildNodes(graphScene, count, parameters)
+        return time.perf_counter() - start
+    return {"params": {"nodes": count, "parameters": parameters},
+            "timings": {"addNodes": best(run, repeat)}}
+
+
+def benchmarkConnect(count=1000, repeat=3):
+    """This function measures connecting chains, diamonds and fan-outs with
+        Parameter.addConnection.
+    Args:
+        count (int): Number of nodes of each shape.
+        repeat (int): Runs, the fastest one is kept.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    result = {"params": {"nodes": count}, "timings": {}, "connections": {}}
+    for shape in ("chain", "diamond", "fanOut"):
+        def run():
+            graphScene = scene.GraphScene()
+            nodes = buildNodes(graphScene, count, 2)
+            start = time.perf_counter()
+            result["connections"][shape] = connectNodes(nodes, shape)
+            return time.perf_counter() - start
+        result["timings"][shape] = best(run, repeat)
+    return result
+
+
+def benchmarkDelete(count=1000, repeat=3):
+    """This function measures GraphView.deleteSelected with every node of a
+        connected chain selected.
+    Args:
+        count (int): Number of nodes.
+        repeat (int): Runs, the fastest one is kept.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    def run():
+        graphView = view.GraphView()
+        nodes = buildNodes(graphView.scene, count, 2)
+        connectNodes(nodes, "chain")
+        for item in graphView.scene.items():
+            if item.flags() & QtWidgets.QGraphicsItem.ItemIsSelectable:
+                item.setSelected(True)
+        renderFrame(graphView)
+        start = time.perf_counter()
+        graphView.deleteSelected()
+        return time.perf_counter() - start
+    return {"params": {"nodes": count},
+            "timings": {"deleteSelected": best(run, repeat)}}
+
+
+def benchmarkUndo(count=5000, repeat=3):
+    """This function measures pasting a connected chain with
+        GraphScene.addNodes and addConnections and deleting it with
+        GraphView.deleteSelected, each against undoing and redoing it.
+    Args:
+        count (int): Number of nodes.
+        repeat (int): Runs, the fastest one is kept.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    timings = collections.OrderedDict()
+
+    def measure(name, function):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        timings[name] = min(timings.get(name, elapsed), elapsed)
+
+    def paste(graphScene):
+        with graphScene.undoStack.command("Paste"):
+            nodes = graphScene.addNodes(gridRecords(count))
+            graphScene.addConnections(
+                [x.getParameter("out").portId for x in nodes[:-1]],
+                [x.getParameter("in").portId for x in nodes[1:]])
+
+    def select(graphView):
+        for item in graphView.scene.items():
+            if item.flags() & QtWidgets.QGraphicsItem.ItemIsSelectable:
+                item.setSelected(True)
+        renderFrame(graphView)
+
+    for _ in range(repeat):
+        graphView = view.GraphView()
+        graphScene = graphView.scene
+        measure("paste", lambda: paste(graphScene))
+        renderFrame(graphView)
+        measure("paste.undo", graphScene.undoEdit)
+        renderFrame(graphView)
+        measure("paste.redo", graphScene.redoEdit)
+        select(graphView)
+        measure("delete", graphView.deleteSelected)
+        renderFrame(graphView)
+        measure("delete.undo", graphScene.undoEdit)
+        select(graphView)
+        measure("delete.redo", graphScene.redoEdit)
+    return {"params": {"nodes": count}, "timings": timings}
+
+
+def benchmarkTraversal(count=1000, repeat=20):
+    """This function measures walking the whole up stream of the last node
+        of a chain and of a diamond graph. The cached closures are dropped
+        before each walk, looking a cached closure up is measured apart.
+    Args:
+        count (int): Number of nodes.
+        repeat (int): Walks per measurement.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    result = {"params": {"nodes": count}, "timings": {}}
+    for shape in ("chain", "diamond"):
+        graphScene = scene.GraphScene()
+        nodes = buildNodes(graphScene, count - count % 4, 2)
+        connectNodes(nodes, shape)
+        last = nodes[-1]
+        closures = graphScene.traversal.upClosures
+
+        def walk(ordered=False):
+            closures.clear()
+            return last.getUpStreamDependencies(ordered=ordered)
+
+        result["timings"][shape] = timeIt(walk, repeat)
+        result["timings"][shape + "Ordered"] = timeIt(
+            lambda: walk(ordered=True), repeat)
+        result["timings"][shape + "Cached"] = timeIt(
+            lambda: last.getUpStreamDependencies(), repeat)
+    return result
+
+
+def benchmarkRender(count=1000, frames=10, zooms=(0.1, 0.5, 1.0, 2.0),
+                    size=(1280, 720)):
+    """This function measures rendering frames of a view of a connected
+        chain into a QImage at several zoom levels.
+    Args:
+        count (int): Number of nodes.
+        frames (int): Frames per zoom level.
+        zooms (tuple): View scales.
+        size (tuple): Width and height of the frames.
+    Returns:
+        (dict): Returns seconds per frame of each zoom.
+    """
+    graphView = view.GraphView()
+    graphView.resize(*size)
+    nodes = buildNodes(graphView.scene, count, 2)
+    connectNodes(nodes, "chain")
+    image = QtGui.QImage(size[0], size[1],
+                         QtGui.QImage.Format_ARGB32_Premultiplied)
+    center = nodes[len(nodes) // 2].pos()
+    result = {"params": {"nodes": count, "frames": frames,
+                         "size": list(size)}, "timings": {}}
+    for zoom in zooms:
+        graphView.resetTransform()
+        graphView.scale(zoom, zoom)
+        graphView.centerOn(center)
+
+        def frame():
+            painter = QtGui.QPainter(image)
+            painter.setRenderHints(graphView.renderHints())
+            graphView.render(painter)
+            painter.end()
+        frame()  # first frame fills caches.
+        result["timings"]["zoom{}".format(zoom)] = timeIt(frame, frames)
+    return result
+
+
+def benchmarkCulling(count=5000, repeat=200):
+    """This function checks the item index prunes region and point queries.
+        A viewport sized region should only return the items inside it and
+        the BSP tree should answer faster than a linear scan.
+    Args:
+        count (int): Number of nodes.
+        repeat (int): Queries per measurement.
+    Returns:
+        (dict): Returns the measurements.
+    """
+    graphScene = chainScene(count)
+    total = len(graphScene.items())
+    region = QtCore.QRectF(-400, 0, 1200, 800)
+    point = QtCore.QPointF(0, 0)
+    transform = QtGui.QTransform()
+    result = {"params": {"nodes": count, "items": total,
+                         "itemsInRegion": len(graphScene.items(region))},
+              "timings": {}}
+    for name, method in (("noIndex", QtWidgets.QGraphicsScene.NoIndex),
+                         ("bspTree", QtWidgets.QGraphicsScene.BspTreeIndex)):
+        graphScene.indexWith(method)
+        graphScene.items(region)  # builds the index.
+        result["timings"][name + ".regionQuery"] = timeIt(
+            lambda: graphScene.items(region), repeat)
+        result["timings"][name + ".pointQuery"] = timeIt(
+            lambda: graphScene.itemAt(point, transform), repeat)
+    return result
+
+
+BENCHMARKS = collections.OrderedDict([
+    ("build", benchmarkBuild),
+    ("connect", benchmarkConnect),
+    ("delete", benchmarkDelete),
+    ("undo", benchmarkUndo),
+    ("traversal", benchmarkTraversal),
+    ("render", benchmarkRender),
+    ("culling", benchmarkCulling),
+])
+
+
+def run(names=None, count=None):
+    """This function runs benchmarks.
+    Args:
+        names (list): Names from BENCHMARKS, all if None.
+        count (int): Number of nodes, defaults of each benchmark if None.
+    Returns:
+        (dict): Returns {name: measurements}.
+    """
+    results = collections.OrderedDict()
+    for name in names or BENCHMARKS:
+        kwargs = {"count": count} if count else {}
+        results[name] = BENCHMARKS[name](**kwargs)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """This function finds timings slower than a baseline run.
+    Args:
+        results (dict): Measurements of run().
+        baseline (dict): Measurements of an earlier run().
+        tolerance (float): Allowed slow down, 0.2 is 20 percent.
+    Returns:
+        (list): Returns (benchmark, timing, baseline seconds, seconds) of
+            the regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name, {}).get("timings", {})
+        for timing, seconds in result["timings"].items():
+            if timing in old and seconds > old[timing] * (1 + tolerance):
+                regressions.append((name, timing, old[timing], seconds))
+    return regressions
+
+
+def main(argv=None):
+    """This function runs the benchmarks from the command line.
+    Args:
+        argv (list): Command line arguments, sys.argv if None.
+    Returns:
+        (int): Returns 1 if any timing regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("benchmarks", nargs="*",
+                        help="benchmarks to run, all by default: {}".format(
+                            ", ".join(BENCHMARKS)))
+    parser.add_argument("-n", "--nodes", type=int,
+                        help="number of nodes of every benchmark")
+    parser.add_argument("-o", "--output", help="write results to this file")
+    parser.add_argument("-b", "--baseline",
+                        help="results of an earlier run to compare against")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.2,
+                        help="allowed slow down, default 0.2 (20%%)")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks).difference(BENCHMARKS)
+    if unknown:
+        parser.error("unknown benchmarks {}".format(", ".join(sorted(unknown))))
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    logger.suspend()
+    results = run(args.benchmarks, args.nodes)
+    logger.resume()
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(text)
+    print(text)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, timing, old, seconds in regressions:
+        sys.stderr.write("REGRESSION : {}.{} : {:.6f}s -> {:.6f}s\n".format(
+            name, timing, old, seconds))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
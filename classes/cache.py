@@ -0,0 +1,153 @@
+"""Memoized node outputs keyed by a hash of the node inputs.
+
+A node key is derived from its nodeType, its own parameter values and the
+keys of its up stream nodes, so toggling a parameter back to a previous
+value finds the output computed back then. Entries live in one global LRU
+evicted by approximate byte size.
+"""
+import collections
+import hashlib
+import pickle
+import sys
+
+
+"""Declaring global variables for cache"""
+MEMORY_BUDGET = 256 * 1024 * 1024  # Bytes the global cache may hold.
+PLAIN_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+def valueToken(value):
+    """This function converts a parameter value to bytes for hashing.
+    Args:
+        value (): Value of a parameter.
+    Returns:
+        (bytes): Returns bytes representing the value, None if the value
+            cannot be pickled. The repr of such values mostly holds their
+            address, which a later value can share.
+    """
+    if isinstance(value, PLAIN_TYPES):
+        return repr(value).encode()
+    try:
+        return pickle.dumps(value, protocol=4)
+    except Exception:
+        return None
+
+
+def makeKey(nodeType, tokens, version=0):
+    """This function hashes node type and input tokens to a cache key.
+    Args:
+        nodeType (str): Type of the node.
+        tokens (list): List of bytes from valueToken or up stream keys.
+        version (int): Registration of the compute function of the type,
+            outputs of a replaced function get other keys.
+    Returns:
+        (bytes): Returns 16 bytes digest.
+    """
+    digest = hashlib.blake2b(repr((nodeType, version)).encode(),
+                             digest_size=16)
+    for token in tokens:
+        digest.update(len(token).to_bytes(8, "little"))
+        digest.update(token)
+    return digest.digest()
+
+
+def sizeOf(value, depth=3):
+    """This function approximates memory used by a value in bytes.
+    Args:
+        value (): Value to measure.
+        depth (int): How deep to follow containers.
+    Returns:
+        (int): Returns approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if depth:
+        if isinstance(value, dict):
+            size += sum(sizeOf(k, depth - 1) + sizeOf(v, depth - 1)
+                        for k, v in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(sizeOf(x, depth - 1) for x in value)
+    return size
+
+
+class OutputCache(object):
+    """Creating OutputCache class, a LRU evicting by byte size."""
+    def __init__(self, budget=None):
+        """Initializing OutputCache class.
+        Args:
+            budget (int): Memory budget in bytes, MEMORY_BUDGET if None.
+        """
+        self.budget = MEMORY_BUDGET if budget is None else budget
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Returns number of cached outputs."""
+        return len(self.entries)
+
+    def get(self, key):
+        """This method looks up a cached output.
+        Args:
+            key (bytes): Cache key of the node.
+        Returns:
+            (tuple): Returns (True, value) on hit else (False, None).
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, key, value, size=None):
+        """This method stores an output, evicting least recently used
+            outputs above the budget. Values larger than the whole budget
+            are not cached.
+        Args:
+            key (bytes): Cache key of the node.
+            value (): Computed value.
+            size (int): Size of the value in bytes, measured if None.
+        Returns:
+            (None): Returns None.
+        """
+        if size is None:
+            size = sizeOf(value)
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+        if size > self.budget:
+            return
+        self.entries[key] = (value, size)
+        self.size += size
+        self.evict()
+
+    def evict(self):
+        """This method drops least recently used outputs until the cache
+            fits its budget.
+        Returns:
+            (None): Returns None.
+        """
+        while self.size > self.budget and self.entries:
+            self.size -= self.entries.popitem(last=False)[1][1]
+
+    def setBudget(self, budget):
+        """This method changes the memory budget.
+        Args:
+            budget (int): Memory budget in bytes.
+        Returns:
+            (None): Returns None.
+        """
+        self.budget = budget
+        self.evict()
+
+    def clear(self):
+        """This method drops all cached outputs.
+        Returns:
+            (None): Returns None.
+        """
+        self.entries.clear()
+        self.size = 0
+
+
+CACHE = OutputCache()  # Global cache shared by all evaluators.
@@ -3,18 +3,24 @@ import math
 
 import variables
 import logger
+import tracing
+import undo
+import geometry
 
 
+@tracing.instrument
 class Connection(QtWidgets.QGraphicsPathItem):
     """Creating Connection class by inheriting QGraphicsItem"""
     def __init__(self, parent=None, sourceParam=None, targetParam=None,
-                 toolTip=None):
+                 toolTip=None, edgeId=None):
         """Initializing Connection class.
         Args:
             parent (QtWidgets.QGraphicsItem): Parent widget of this class.
             sourceParam (parameter.Parameter): Source Parameter of this connection.
             targetParam (parameter.Parameter): Target Parameter of this connection.
             toolTip (str): Tool tip for connection in string format.
+            edgeId (int): Id of an existing edge in the graph model to
+                display, a new edge is created if None.
         """
         super(Connection, self).__init__(parent=parent)
         self.setFlags(QtWidgets.QGraphicsItem.ItemIsSelectable |
@@ -25,62 +31,47 @@ class Connection(QtWidgets.QGraphicsPathItem):
         self.setToolTip(self.toolTip)
         self.sourceNode = self.sourceParam.node
         self.targetNode = self.targetParam.node
+        self.graph = self.sourceNode.graph
+        if edgeId is None:
+            edgeId = self.graph.addEdge(self.sourceParam.portId,
+                                        self.targetParam.portId)
+        self.edgeId = edgeId
+        self.sourceNode.scene.connectionItems[self.edgeId] = self
         self.activePen = QtGui.QPen(QtCore.Qt.green)
         self.activePen.setWidth(2)
         self.deActivePen = QtGui.QPen(QtCore.Qt.black)
         self.deActivePen.setWidth(2)
+        # cosmetic pens used when zoomed out, see paint.
+        self.activeLinePen = QtGui.QPen(QtCore.Qt.green, 0)
+        self.deActiveLinePen = QtGui.QPen(QtCore.Qt.black, 0)
+        # bounding rect of the path item includes the pen width.
+        self.setPen(self.deActivePen)
+        # a child item, it enters and leaves the scene with this connection.
         self.arrowShape = ArrowHead(self)
-        self.targetParam.node.scene.addItem(self.arrowShape)
-        self.targetNode.compute()
-
-    def boundingRect(self):
-        """Creating Bounding Rectangle for Connection widget.
-        Returns (QtCore.QRectF): Returnsb Bounding RectF item.
-
-        """
-        return QtCore.QRectF(self.sourceParam.scenePos().x() +
-                       variables.NODE_SIZE + 10,
-                       (self.sourceParam.scenePos().y() -
-                        variables.NODE_SIZE / 2) + 5,
-                             self.targetParam.scenePos().x()
-                             - variables.NODE_SIZE - 10,
-                             (self.targetParam.scenePos().y() -
-                              variables.NODE_SIZE + 27) +
-                             (20 * self.targetParam.paramIndex) - 18
-                             ).normalized()
+        self.updatePath()
 
-    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
-        """Defining the Paint event for the Connection class.
-        Args:
-            painter (QtGui.QPainter): Painter object to paint this widget.
-            QStyleOptionGraphicsItem (QtWidgets.QStyleGraphicsItem): pass
-            widget (QtWidgets.QGraphicsItem): widget for which you want to paint.
+    @tracing.traced("layout")
+    def updatePath(self):
+        """This method recomputes the line and arrow head from the current
+            parameter positions. Nodes call it when they move, so paint only
+            draws the stored path and the bounding rect follows the path.
         Returns:
             (None): Returns None.
         """
-        painter.setBrush(QtCore.Qt.black)
-        if self.isSelected():
-            self.arrowShape.selected = True
-            painter.setPen(self.activePen)
-        else:
-            painter.setPen(self.deActivePen)
-            self.arrowShape.selected = False
+        sourcePos = self.sourceParam.scenePos()
+        targetPos = self.targetParam.scenePos()
+        start_point = [sourcePos.x() + variables.NODE_SIZE + 10,
+                       (sourcePos.y() - variables.NODE_SIZE / 2) + 5]
 
-        start_point = [self.sourceParam.scenePos().x() +
-                       variables.NODE_SIZE + 10,
-                       (self.sourceParam.scenePos().y() -
-                        variables.NODE_SIZE / 2) + 5]
-
-        end_point = [self.targetParam.scenePos().x()
-                     - variables.NODE_SIZE - 10,
-                     (self.targetParam.scenePos().y() -
+        end_point = [targetPos.x() - variables.NODE_SIZE - 10,
+                     (targetPos.y() -
                       variables.NODE_SIZE + (variables.NODE_SIZE/2)) +
                      ((variables.NODE_SIZE/3) * self.targetParam.paramIndex) - (variables.NODE_SIZE/3)]
 
         path = QtGui.QPainterPath(QtCore.QPointF(start_point[0], start_point[1]))
         path.lineTo(QtCore.QPointF(end_point[0], end_point[1]))
+        # setPath takes care of prepareGeometryChange.
         self.setPath(path)
-        painter.drawPath(self.path())
 
         # setting arrow head position
         rotDeg = 0
@@ -94,39 +85,110 @@ class Connection(QtWidgets.QGraphicsPathItem):
                 self.arrowShape.setRotation(rotDeg + 180)
             else:
                 self.arrowShape.setRotation(-rotDeg + 180)
-
-        # calculating midpoint
         self.arrowShape.setPos(end_point[0], end_point[1])
 
+    def itemChange(self, change, value):
+        """Overriding itemChange to highlight the arrow head on selection.
+        Args:
+            change (QtWidgets.QGraphicsItem.GraphicsItemChange): Change.
+            value (): Value of the change.
+        Returns:
+            (): Returns the value of the base class.
+        """
+        if change == QtWidgets.QGraphicsItem.ItemSelectedHasChanged:
+            self.arrowShape.selected = bool(value)
+            self.arrowShape.update()
+        return super(Connection, self).itemChange(change, value)
+
+    @tracing.traced("paint")
+    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        """Defining the Paint event for the Connection class.
+        Args:
+            painter (QtGui.QPainter): Painter object to paint this widget.
+            QStyleOptionGraphicsItem (QtWidgets.QStyleGraphicsItem): pass
+            widget (QtWidgets.QGraphicsItem): widget for which you want to paint.
+        Returns:
+            (None): Returns None.
+        """
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        selected = self.isSelected()
+        if lod >= variables.LOD_MINIMUM:
+            painter.setPen(self.activePen if selected else self.deActivePen)
+            painter.drawPath(self.path())
+        else:
+            # zoomed out, a plain line, the arrow head skips painting too.
+            painter.setPen(self.activeLinePen if selected else
+                           self.deActiveLinePen)
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+            path = self.path()
+            painter.drawLine(QtCore.QPointF(path.elementAt(0).x,
+                                            path.elementAt(0).y),
+                             QtCore.QPointF(path.elementAt(1).x,
+                                            path.elementAt(1).y))
+
+    def bind(self, sourceParam, targetParam, edgeId):
+        """This method makes an unbound item display another graph edge, so
+            virtualized views can recycle items instead of creating them.
+        Args:
+            sourceParam (parameter.Parameter): Source Parameter of the edge.
+            targetParam (parameter.Parameter): Target Parameter of the edge.
+            edgeId (int): Id of the edge in the graph model.
+        Returns:
+            (None): Returns None.
+        """
+        self.prepareGeometryChange()
+        self.sourceParam = sourceParam
+        self.targetParam = targetParam
+        self.sourceNode = sourceParam.node
+        self.targetNode = targetParam.node
+        self.edgeId = edgeId
+        self.sourceNode.scene.connectionItems[edgeId] = self
+        self.updatePath()
+        self.show()
+
+    def unbind(self):
+        """This method detaches this item from its graph edge and hides it.
+        Returns:
+            (None): Returns None.
+        """
+        items = self.sourceNode.scene.connectionItems
+        if items.get(self.edgeId) is self:
+            del items[self.edgeId]
+        self.setSelected(False)
+        self.hide()
+
+    @tracing.traced("edit")
+    @undo.undoable("Remove connection")
     def remove(self):
         """This method removes the connection of self.
+            Removing the graph edge is enough, the scene drops this item as it
+            observes the graph.
         Returns:
             (None): Returns None.
         """
-        logger.log(msg="Removing connection of parameter {} from node {} from"
-                       " parameter {} from node {}".format(
-                        self.targetParam.paramName,
-                        self.targetParam.node.label,
-                        self.sourceParam.paramName,
-                        self.sourceParam.node.label,
-            ))
-        self.targetParam.node.scene.removeItem(self.arrowShape)
-        self.sourceParam.node.outConnections.remove(self)
-        self.sourceParam.outConnections.remove(self)
-        if self.sourceParam.node in self.sourceParam.node.downStreamDependencies:
-            self.sourceParam.node.downStreamDependencies.remove(self.sourceParam.node)
-
-        self.targetParam.node.inConnections.remove(self)
-        if self.targetParam.node in self.targetParam.node.upStreamDependencies:
-            self.targetParam.node.upStreamDependencies.remove(self.targetParam.node)
-        self.targetParam.inConnections.remove(self)
+        self.graph.removeEdge(self.edgeId)
 
+    @tracing.traced("edit")
+    def release(self):
+        """This method removes this item from the scene once its graph edge
+            is gone.
+        Returns:
+            (None): Returns None.
+        """
+        logger.log(msg="Removing connection of parameter {} from node {} from"
+                       " parameter {} from node {}",
+                   args=(self.targetParam.paramName,
+                         self.targetParam.node.label,
+                         self.sourceParam.paramName,
+                         self.sourceParam.node.label))
         self.sourceParam.node.scene.removeItem(self)
 
     def compute(self):
         self.targetNode.compute()
 
 
+@tracing.instrument
 class ArrowHead(QtWidgets.QGraphicsPolygonItem):
     """Creating a ArrowHead class by inheriting
         QtWidgets.QtGraphicsPolygonItem"""
@@ -141,22 +203,16 @@ class ArrowHead(QtWidgets.QGraphicsPolygonItem):
         self.setFillRule(QtCore.Qt.WindingFill)
         self.setZValue(-1)
         self.selected = False
+        self.setPolygon(geometry.arrowPolygon())
+        self.selectedBrush = QtGui.QBrush(QtCore.Qt.green)
 
-    def boundingRect(self):
-        """This method sets bounding box rectangle for this class"""
-        return QtCore.QRectF(0, 0, 10, 10)
-
+    @tracing.traced("paint")
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
         """This method paints widget on the screen"""
-        if self.selected:
-            painter.setBrush(QtGui.QBrush(QtCore.Qt.green))
-            painter.setPen(self.pen)
-        else:
-            painter.setBrush(self.brush)
-            painter.setPen(self.pen)
-        point_1_pos = QtCore.QPointF(0, 0)
-        point_2_pos = QtCore.QPointF(-20, -5)
-        point_3_pos = QtCore.QPointF(-20, 5)
-        polygon = QtGui.QPolygonF([point_1_pos, point_2_pos, point_3_pos])
-        self.setPolygon(polygon)
-        painter.drawPolygon(polygon)
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        if lod < variables.LOD_MINIMUM:
+            return
+        painter.setBrush(self.selectedBrush if self.selected else self.brush)
+        painter.setPen(self.pen)
+        painter.drawPolygon(geometry.arrowPolygon())
@@ -6,6 +6,7 @@ import view
 import toolbar
 import variables
 import node
+import tracing
 
 
 class GraphEditor(QtWidgets.QWidget):
@@ -53,6 +54,16 @@ class GraphEditor(QtWidgets.QWidget):
         self.toolBar.gridButton.clicked.connect(self.toggleGrid)
         self.toolBar.notesButton.clicked.connect(self.toggleNote)
 
+    def closeEvent(self, event):
+        """This method stops background threads of the scene on closing.
+        Args:
+            event (QtGui.QCloseEvent): Close event.
+        Returns:
+            (None): Returns None.
+        """
+        self.graphicsView.scene.shutdown()
+        super(GraphEditor, self).closeEvent(event)
+
     def toggleGrid(self):
         """This method toggles the grid visibility for scene.
         Returns:
@@ -87,6 +98,10 @@ class GraphEditor(QtWidgets.QWidget):
 
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
+    if variables.TRACE_ENABLED:
+        tracing.enable()
     win = GraphEditor()
     win.show()
     app.exec_()
+    if variables.TRACE_ENABLED:
+        tracing.export(variables.TRACE_FILE)
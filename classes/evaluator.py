@@ -0,0 +1,300 @@
+"""Dirty flag incremental evaluation of the graph model.
+
+Changing a parameter value or a connection marks only the down stream
+closure of the changed node dirty. A compute pass evaluates just the dirty
+nodes in topological order, each exactly once.
+"""
+import graph
+import cache
+import logger
+import tracing
+
+
+"""Declaring global compute functions registry"""
+COMPUTE_FUNCTIONS = {}  # nodeType : callable(inputs) returning out value.
+REGISTRATIONS = {}  # nodeType : times a compute function got registered.
+
+
+def registerNodeType(nodeType, function):
+    """This function registers compute function of a node type.
+    Args:
+        nodeType (str): Node type the function computes.
+        function (callable): Called with dict of {paramName: value} of the
+            node inputs, its return value is stored on the node outputs.
+            Cached outputs of a function registered before are not reused.
+    Returns:
+        (None): Returns None.
+    """
+    COMPUTE_FUNCTIONS[nodeType] = function
+    REGISTRATIONS[nodeType] = REGISTRATIONS.get(nodeType, 0) + 1
+
+
+@tracing.instrument
+class Evaluator(object):
+    """Creating Evaluator class tracking dirty nodes of a graph."""
+    def __init__(self, graph_=None):
+        """Initializing Evaluator class.
+        Args:
+            graph_ (graph.Graph): Graph model to evaluate.
+        """
+        self.graph = graph_
+        self.dirty = set()
+        self.scheduler = None  # scheduler.Scheduler for parallel evaluation.
+        self.cache = cache.CACHE  # cache.OutputCache, None disables caching.
+        self.keys = {}  # nodeId : cache key of its current outputs.
+        self.graph.addListener(self.graphChanged)
+
+    def graphChanged(self, event, ident):
+        """This method marks nodes dirty as the graph changes.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        graph_ = self.graph
+        if event in ("edgeAdded", "edgeRemoved"):
+            self.markDirty(graph_.portNodes[graph_.edgeTargets[ident]])
+        elif event in ("valueChanged", "portAdded", "portRemoved"):
+            # outputs are written by the evaluation itself.
+            if graph_.portKinds[ident] == graph.INPUT and \
+                    graph_.hasNode(graph_.portNodes[ident]):
+                self.markDirty(graph_.portNodes[ident])
+        elif event == "nodeAdded":
+            self.markDirty(ident)
+        elif event == "nodeRemoved":
+            self.dirty.discard(ident)
+            self.keys.pop(ident, None)
+
+    def markDirty(self, nodeId):
+        """This method marks node and its down stream closure dirty.
+            Down stream of a dirty node is always dirty, so the walk stops at
+            nodes which are dirty already.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (None): Returns None.
+        """
+        dirty = self.dirty
+        downStream = self.graph.downStream
+        stack = [nodeId]
+        while stack:
+            nodeId = stack.pop()
+            if nodeId in dirty:
+                continue
+            dirty.add(nodeId)
+            stack.extend(downStream(nodeId))
+
+    def isDirty(self, nodeId):
+        """This method checks if node needs to be computed.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (bool): Returns True if node is dirty.
+        """
+        return nodeId in self.dirty
+
+    def dirtyUpStream(self, nodeIds):
+        """This method collects dirty nodes required to compute given nodes.
+            A clean node never has a dirty up stream, so the walk only
+            follows dirty nodes.
+        Args:
+            nodeIds (list): Ids of the nodes to compute.
+        Returns:
+            (set): Returns set of dirty node ids.
+        """
+        dirty = self.dirty
+        upStream = self.graph.upStream
+        required = set()
+        stack = [nodeId for nodeId in nodeIds if nodeId in dirty]
+        while stack:
+            nodeId = stack.pop()
+            if nodeId in required:
+                continue
+            required.add(nodeId)
+            stack.extend(x for x in upStream(nodeId) if x in dirty)
+        return required
+
+    def sortNodes(self, nodeIds):
+        """This method sorts given nodes in topological order.
+        Args:
+            nodeIds (set): Ids of the nodes to sort.
+        Returns:
+            (list): Returns list of node ids, up stream first.
+        """
+        upStream, downStream = self.graph.upStream, self.graph.downStream
+        inDegree = dict.fromkeys(nodeIds, 0)
+        for nodeId in nodeIds:
+            for upNode in upStream(nodeId):
+                if upNode in inDegree:
+                    inDegree[nodeId] += 1
+        ready = [nodeId for nodeId, count in inDegree.items() if not count]
+        order = []
+        while ready:
+            nodeId = ready.pop()
+            order.append(nodeId)
+            for downNode in downStream(nodeId):
+                if downNode in inDegree:
+                    inDegree[downNode] -= 1
+                    if not inDegree[downNode]:
+                        ready.append(downNode)
+        return order
+
+    def gatherInputs(self, nodeId):
+        """This method gets input values of a node.
+            Connected inputs take the value of their source output.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (dict): Returns {paramName: value} of node inputs.
+        """
+        graph_ = self.graph
+        inputs = {}
+        for portId in graph_.ports(nodeId, kind=graph.INPUT):
+            edgeId = graph_.inputEdge(portId)
+            if edgeId is not None:
+                value = graph_.portValues[graph_.edgeSources[edgeId]]
+            else:
+                value = graph_.portValues[portId]
+            inputs[graph_.portNames[portId]] = value
+        return inputs
+
+    def storeOutputs(self, nodeId, value):
+        """This method writes computed value to outputs of a node.
+        Args:
+            nodeId (int): Id of the node.
+            value (): Computed value.
+        Returns:
+            (None): Returns None.
+        """
+        for portId in self.graph.ports(nodeId, kind=graph.OUTPUT):
+            self.graph.setValue(portId, value)
+
+    def cacheKey(self, nodeId):
+        """This method derives cache key of a node from its type, its own
+            parameter values and the keys of its up stream nodes.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (bytes): Returns the cache key, None if an input value cannot be
+                hashed and the node is not cached.
+        """
+        graph_ = self.graph
+        tokens = []
+        for portId in graph_.ports(nodeId, kind=graph.INPUT):
+            tokens.append(graph_.portNames[portId].encode())
+            edgeId = graph_.inputEdge(portId)
+            if edgeId is not None:
+                sourcePort = graph_.edgeSources[edgeId]
+                token = self.keys.get(graph_.portNodes[sourcePort])
+                if token is None:
+                    token = cache.valueToken(graph_.portValues[sourcePort])
+            else:
+                token = cache.valueToken(graph_.portValues[portId])
+            if token is None:
+                return None
+            tokens.append(token)
+        nodeType = graph_.nodeTypes[nodeId]
+        return cache.makeKey(nodeType, tokens,
+                             version=REGISTRATIONS.get(nodeType, 0))
+
+    def lookup(self, nodeId):
+        """This method looks up cached outputs of a node.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (tuple): Returns (key, hit, value), key is None without a cache
+                or for a node which is not cached.
+        """
+        if self.cache is None:
+            return None, False, None
+        key = self.cacheKey(nodeId)
+        if key is None:
+            return None, False, None
+        hit, value = self.cache.get(key)
+        return key, hit, value
+
+    def finishNode(self, nodeId, key, value, store=True):
+        """This method stores computed outputs and marks the node clean.
+        Args:
+            nodeId (int): Id of the node.
+            key (bytes): Cache key from lookup, None to skip caching.
+            value (): Computed value.
+            store (bool): If True value is written to the outputs and cache.
+        Returns:
+            (None): Returns None.
+        """
+        if store:
+            self.storeOutputs(nodeId, value)
+            if key is not None:
+                self.cache.put(key, value)
+        if key is None:
+            self.keys.pop(nodeId, None)
+        else:
+            self.keys[nodeId] = key
+        self.dirty.discard(nodeId)
+
+    @tracing.traced("compute", describe=tracing.nodeIdArgs)
+    def computeNode(self, nodeId):
+        """This method computes a single node with its registered function.
+            Cached outputs are reused and nodes without a registered compute
+            function keep their outputs.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (None): Returns None.
+        """
+        function = COMPUTE_FUNCTIONS.get(self.graph.nodeTypes[nodeId])
+        if not function:
+            self.finishNode(nodeId, None, None, store=False)
+            return
+        key, hit, value = self.lookup(nodeId)
+        if not hit:
+            value = function(self.gatherInputs(nodeId))
+        self.finishNode(nodeId, key, value)
+
+    def computeFailed(self, nodeId, err):
+        """This method reports a node whose compute function raised.
+            The node stays dirty.
+        Args:
+            nodeId (int): Id of the node.
+            err (Exception): Raised error.
+        Returns:
+            (None): Returns None.
+        """
+        logger.log(typ="ERROR",
+                   msg="Compute failed on node {} : {}",
+                   args=(self.graph.nodeLabels[nodeId], err))
+
+    @tracing.traced("compute")
+    def evaluate(self, nodeIds=None):
+        """This method computes dirty nodes in topological order.
+        Args:
+            nodeIds (list): Ids of the nodes to bring up to date, only their
+                dirty up stream gets computed. All dirty nodes if None.
+        Returns:
+            (list): Returns ids of the computed nodes in compute order.
+        """
+        if nodeIds is None:
+            required = set(self.dirty)
+        else:
+            required = self.dirtyUpStream(nodeIds)
+        if not required:
+            return []
+        if self.scheduler:
+            return self.scheduler.run(self, required)
+        failed = set()
+        computed = []
+        upStream = self.graph.upStream
+        for nodeId in self.sortNodes(required):
+            if any(upNode in failed for upNode in upStream(nodeId)):
+                failed.add(nodeId)
+                continue
+            try:
+                self.computeNode(nodeId)
+            except Exception as err:
+                self.computeFailed(nodeId, err)
+                failed.add(nodeId)
+                continue
+            computed.append(nodeId)
+        return computed
@@ -0,0 +1,230 @@
+"""Paint geometry and styles shared by all items of a kind.
+
+Shapes only depend on sizes from variables and styles only on colors, so
+each is built once per distinct value and shared by every item instead of
+being rebuilt in every paint call.
+"""
+from PyQt5 import QtGui, QtCore
+import collections
+import functools
+
+import variables
+
+
+"""Declaring global variables for geometry"""
+NodeGeometry = collections.namedtuple(
+    "NodeGeometry", ["bounds", "outline", "labelOutline", "thumbnail"])
+NodeStyle = collections.namedtuple(
+    "NodeStyle", ["outlineSelectedPen", "outlineDeSelectedPen", "bodyBrush",
+                  "labelForeBrush", "labelBrush", "labelFont"])
+ParameterStyle = collections.namedtuple(
+    "ParameterStyle", ["penActive", "penInActive", "activeBrush",
+                       "inActiveBrush", "outputInactiveBrush",
+                       "outputInactivePen"])
+
+
+@functools.lru_cache(maxsize=None)
+def nodeGeometry(size):
+    """This function builds shapes of a node body.
+    Args:
+        size (int): Half the width of a node, variables.NODE_SIZE.
+    Returns:
+        (NodeGeometry): Returns bounds, outline and label outline polygons
+            and the thumbnail rectangle.
+    """
+    outline = QtGui.QPolygon()
+    outline.setPoints(-size, -size, -size, size, size, size, size, -size)
+    labelOutline = QtGui.QPolygon()
+    labelOutline.setPoints(-size + 1, -size + 1, -size + 1, -size + 19,
+                           size - 1, -size + 19, size - 1, -size + 1)
+    return NodeGeometry(
+        # bounds include the selected outline pen, 3 pixels wide.
+        bounds=QtCore.QRectF(-size - 2, -size - 2, size * 2 + 4, size * 2 + 4),
+        outline=outline,
+        labelOutline=labelOutline,
+        thumbnail=QtCore.QRect(-size + 15, -size + 25, size + 30, size + 30))
+
+
+@functools.lru_cache(maxsize=None)
+def nodeStyle(selectColor, deselectColor, bodyColor, labelForeColor,
+              labelBackColor):
+    """This function builds pens and brushes of a node.
+    Args:
+        selectColor (str): Outline color when selected.
+        deselectColor (str): Outline color when not selected.
+        bodyColor (str): Body color.
+        labelForeColor (str): Label text color.
+        labelBackColor (str): Label background color.
+    Returns:
+        (NodeStyle): Returns the pens, brushes and label font.
+    """
+    outlineSelectedPen = QtGui.QPen(QtGui.QColor(selectColor))
+    outlineSelectedPen.setWidth(3)
+    return NodeStyle(
+        outlineSelectedPen=outlineSelectedPen,
+        outlineDeSelectedPen=QtGui.QPen(QtGui.QColor(deselectColor)),
+        bodyBrush=QtGui.QBrush(QtGui.QColor(bodyColor)),
+        labelForeBrush=QtGui.QBrush(QtGui.QColor(labelForeColor)),
+        labelBrush=QtGui.QBrush(QtGui.QColor(labelBackColor)),
+        labelFont=QtGui.QFont("Verdana", 10))
+
+
+def currentNodeStyle():
+    """This function gets node style for the colors in variables.
+    Returns:
+        (NodeStyle): Returns the shared node style.
+    """
+    return nodeStyle(variables.NODE_OUTLINE_SELECT_COLOR,
+                     variables.NODE_OUTLINE_DESELECT_COLOR,
+                     variables.NODE_BODY_COLOR,
+                     variables.NODE_LABEL_FORECOLOR,
+                     variables.NODE_LABEL_BACKCOLOR)
+
+
+@functools.lru_cache(maxsize=None)
+def parameterEllipse(size, radius, paramType, paramIndex):
+    """This function builds the rectangle a parameter circle is drawn in.
+    Args:
+        size (int): Half the width of a node, variables.NODE_SIZE.
+        radius (int): Parameter size, variables.PARAM_RADIUS.
+        paramType (str): "input" or "output".
+        paramIndex (int): Index of the parameter on its node.
+    Returns:
+        (QtCore.QRectF): Returns the rectangle in item coordinates.
+    """
+    if paramType == "input":
+        return QtCore.QRectF(-size - radius,
+                             (size / 3 * paramIndex + 3) - size + 3,
+                             radius, radius)
+    return QtCore.QRectF(size, -size / 2, radius, radius)
+
+
+@functools.lru_cache(maxsize=None)
+def parameterBounds(size, radius, paramType, paramIndex):
+    """This function builds the bounding rectangle of a parameter, its
+        circle plus the outline pen.
+    Args:
+        size (int): Half the width of a node, variables.NODE_SIZE.
+        radius (int): Parameter size, variables.PARAM_RADIUS.
+        paramType (str): "input" or "output".
+        paramIndex (int): Index of the parameter on its node.
+    Returns:
+        (QtCore.QRectF): Returns the rectangle in item coordinates.
+    """
+    return parameterEllipse(size, radius, paramType, paramIndex).adjusted(
+        -1, -1, 1, 1)
+
+
+@functools.lru_cache(maxsize=None)
+def noteBounds():
+    """This function builds the bounding rectangle of a note, its balloon
+        plus the outline pen.
+    Returns:
+        (QtCore.QRectF): Returns the rectangle in item coordinates.
+    """
+    return QtCore.QRectF(-76, -51, 152, 152)
+
+
+@functools.lru_cache(maxsize=None)
+def parameterStyle():
+    """This function builds pens and brushes of a parameter.
+    Returns:
+        (ParameterStyle): Returns the shared parameter style.
+    """
+    return ParameterStyle(
+        penActive=QtGui.QPen(QtCore.Qt.green, 1),
+        penInActive=QtGui.QPen(QtCore.Qt.white, 1),
+        activeBrush=QtGui.QBrush(QtCore.Qt.red),
+        inActiveBrush=QtGui.QBrush(QtCore.Qt.black),
+        outputInactiveBrush=QtGui.QBrush(QtCore.Qt.black),
+        outputInactivePen=QtGui.QPen(QtCore.Qt.black))
+
+
+@functools.lru_cache(maxsize=None)
+def arrowPolygon():
+    """This function builds the arrow head triangle, its tip is at 0, 0.
+    Returns:
+        (QtGui.QPolygonF): Returns the triangle.
+    """
+    return QtGui.QPolygonF([QtCore.QPointF(0, 0), QtCore.QPointF(-20, -5),
+                            QtCore.QPointF(-20, 5)])
+
+
+def gridSpacing(size, squares, scale, minimum):
+    """This function gets distance in between the minor lines of the grid
+        at a zoom level. Lines closer than minimum pixels are thinned out by
+        stepping up to the major lines, so the number of lines on screen
+        stays about the same at every zoom level.
+    Args:
+        size (int): Size of one square, variables.SC_GRID_SIZE.
+        squares (int): Squares in a major square,
+            variables.SC_GRID_SQUARE_SIZE.
+        scale (float): Pixels per scene unit.
+        minimum (float): Smallest distance in pixels, variables.
+            SC_GRID_MIN_SPACING.
+    Returns:
+        (int): Returns the distance in scene units.
+    """
+    spacing = size
+    while spacing * scale < minimum:
+        spacing *= squares
+    return spacing
+
+
+@functools.lru_cache(maxsize=None)
+def gridPens(lightColor, darkColor, lightWidth, darkWidth):
+    """This function builds pens of the minor and major grid lines.
+    Args:
+        lightColor (str): Minor line color, variables.SC_GRID_LIGHT_COLOR.
+        darkColor (str): Major line color, variables.SC_GRID_DARK_COLOR.
+        lightWidth (int): Minor line width in scene units.
+        darkWidth (int): Major line width in scene units.
+    Returns:
+        (tuple): Returns the minor and major QtGui.QPen.
+    """
+    lightPen = QtGui.QPen(QtGui.QColor(lightColor))
+    lightPen.setWidth(lightWidth)
+    darkPen = QtGui.QPen(QtGui.QColor(darkColor))
+    darkPen.setWidth(darkWidth)
+    return lightPen, darkPen
+
+
+@functools.lru_cache(maxsize=32)
+def gridBrush(period, tileSize, squares, lightColor, darkColor, lightWidth,
+              darkWidth):
+    """This function renders one major square of the grid into a tile and
+        builds a brush repeating it, aligned to scene coordinates.
+    Args:
+        period (int): Size of the major square in scene units.
+        tileSize (int): Size of the tile in pixels.
+        squares (int): Minor squares in a major square.
+        lightColor (str): Minor line color.
+        darkColor (str): Major line color.
+        lightWidth (int): Minor line width in scene units.
+        darkWidth (int): Major line width in scene units.
+    Returns:
+        (QtGui.QBrush): Returns the texture brush.
+    """
+    pixels = tileSize / period  # tile pixels per scene unit.
+    lightWidth = max(int(round(lightWidth * pixels)), 1)
+    darkWidth = max(int(round(darkWidth * pixels)), 1)
+    tile = QtGui.QPixmap(tileSize, tileSize)
+    tile.fill(QtCore.Qt.transparent)
+    painter = QtGui.QPainter(tile)
+    light, dark = QtGui.QColor(lightColor), QtGui.QColor(darkColor)
+    for index in range(1, squares):
+        position = int(round(index * tileSize / squares)) - lightWidth // 2
+        painter.fillRect(position, 0, lightWidth, tileSize, light)
+        painter.fillRect(0, position, tileSize, lightWidth, light)
+    # major lines lie on the tile edges, half of them on either side.
+    before = darkWidth // 2
+    after = darkWidth - before
+    painter.fillRect(0, 0, after, tileSize, dark)
+    painter.fillRect(tileSize - before, 0, before, tileSize, dark)
+    painter.fillRect(0, 0, tileSize, after, dark)
+    painter.fillRect(0, tileSize - before, tileSize, before, dark)
+    painter.end()
+    brush = QtGui.QBrush(tile)
+    brush.setTransform(QtGui.QTransform.fromScale(period / tileSize,
+                                                  period / tileSize))
+    return brush
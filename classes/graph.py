@@ -0,0 +1,679 @@
+"""Qt-free graph model used underneath the Node Editor items.
+
+Nodes, ports (parameters) and edges (connections) are stored in flat,
+integer indexed tables. Ids are never reused, a removed entry is only marked
+dead. The QGraphicsItems in node.py, parameter.py and connection.py hold ids
+into this model and observe it through listeners, so graphs can be built
+and edited in processes which never import PyQt5. Removed entries can be
+brought back under their ids, which is what undo.UndoStack, the journal of
+a graph, relies on.
+"""
+from array import array
+
+
+INPUT = 0  # port kind of an input parameter.
+OUTPUT = 1  # port kind of an output parameter.
+PORT_TYPES = ("input", "output")  # paramType names indexed by port kind.
+
+
+class Graph(object):
+    """Creating Graph class holding array backed adjacency tables."""
+    __slots__ = (
+        "nodeLabels", "nodeTypes", "nodeAlive", "nodePorts",
+        "nodeInEdges", "nodeOutEdges", "nodeUpNodes", "nodeDownNodes",
+        "nodeXs", "nodeYs", "nodeThumbnails", "nodeNotes",
+        "portNodes", "portNames", "portValues", "portKinds", "portIndices",
+        "portAlive", "portInEdges", "portOutEdges",
+        "edgeSources", "edgeTargets", "edgeAlive",
+        "labelIndex", "typeIndex", "labelCounters",
+        "nodeCount", "edgeCount", "listeners", "journal",
+    )
+
+    def __init__(self):
+        """Initializing Graph class."""
+        # node tables, indexed by node id.
+        self.nodeLabels = []
+        self.nodeTypes = []
+        self.nodeAlive = bytearray()
+        self.nodePorts = []  # rows of {paramName: portId} in port order.
+        # adjacency rows are {id: None} dicts in insertion order, None until
+        # the first entry, so adding and removing an entry is O(1).
+        self.nodeInEdges = []
+        self.nodeOutEdges = []
+        # {nodeId: number of edges} of direct up and down stream nodes.
+        self.nodeUpNodes = []
+        self.nodeDownNodes = []
+        self.nodeXs = array("d")
+        self.nodeYs = array("d")
+        self.nodeThumbnails = []
+        self.nodeNotes = []
+        # port tables, indexed by port id.
+        self.portNodes = array("q")
+        self.portNames = []
+        self.portValues = []
+        self.portKinds = array("b")
+        self.portIndices = array("q")
+        self.portAlive = bytearray()
+        self.portInEdges = []
+        self.portOutEdges = []
+        # edge tables, indexed by edge id.
+        self.edgeSources = array("q")
+        self.edgeTargets = array("q")
+        self.edgeAlive = bytearray()
+
+        # lookup indexes.
+        self.labelIndex = {}  # label : nodeId, labels are unique.
+        self.typeIndex = {}  # nodeType : {nodeId: None} in creation order.
+        self.labelCounters = {}  # label : last suffix used to de-duplicate.
+
+        self.nodeCount = 0
+        self.edgeCount = 0
+        self.listeners = []
+        self.journal = None  # undo.UndoStack recording changes.
+
+    def __len__(self):
+        """Returns number of alive nodes in the graph."""
+        return self.nodeCount
+
+    def addListener(self, listener):
+        """This method registers a callable notified on every graph change.
+        Args:
+            listener (callable): Called as listener(event, ident) where event
+                is one of "nodeAdded", "nodeRemoved", "portAdded",
+                "portRemoved", "edgeAdded", "edgeRemoved", "valueChanged",
+                "positionChanged", "noteChanged".
+        Returns:
+            (None): Returns None.
+        """
+        self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        """This method unregisters a listener added with addListener.
+        Args:
+            listener (callable): Listener to remove.
+        Returns:
+            (None): Returns None.
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event, ident):
+        """This method notifies all listeners about a change.
+        Args:
+            event (str): Name of the event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        for listener in self.listeners:
+            listener(event, ident)
+
+    # nodes
+    def addNode(self, label=None, nodeType=None):
+        """This method adds a node to the graph.
+        Args:
+            label (str): Label of the node, suffixed if already in use.
+            nodeType (str): Type of the node.
+        Returns:
+            (int): Returns id of the new node.
+        """
+        nodeId = len(self.nodeAlive)
+        if label is not None:
+            label = self.uniqueLabel(label)
+            self.labelIndex[label] = nodeId
+        self.typeIndex.setdefault(nodeType, {})[nodeId] = None
+        self.nodeLabels.append(label)
+        self.nodeTypes.append(nodeType)
+        self.nodeAlive.append(1)
+        self.nodePorts.append({})
+        self.nodeInEdges.append(None)
+        self.nodeOutEdges.append(None)
+        self.nodeUpNodes.append(None)
+        self.nodeDownNodes.append(None)
+        self.nodeXs.append(0.0)
+        self.nodeYs.append(0.0)
+        self.nodeThumbnails.append(None)
+        self.nodeNotes.append(None)
+        self.nodeCount += 1
+        if self.journal is not None:
+            self.journal.record("nodeAdded", nodeId)
+        if self.listeners:
+            self.notify("nodeAdded", nodeId)
+        return nodeId
+
+    def removeNode(self, nodeId):
+        """This method removes node with all of its ports and edges.
+            Edges are removed one by one, the ports go along with the node
+            and are covered by the nodeRemoved event. The node keeps its
+            row of ports, for restoreNodes.
+        Args:
+            nodeId (int): Id of the node to remove.
+        Returns:
+            (None): Returns None.
+        """
+        if not self.hasNode(nodeId):
+            return
+        for portId in self.nodePorts[nodeId].values():
+            for edgeId in self.portEdges(portId):
+                self.removeEdge(edgeId)
+            self.portAlive[portId] = 0
+        self.nodeAlive[nodeId] = 0
+        self.nodeCount -= 1
+        if self.labelIndex.get(self.nodeLabels[nodeId]) == nodeId:
+            del self.labelIndex[self.nodeLabels[nodeId]]
+        del self.typeIndex[self.nodeTypes[nodeId]][nodeId]
+        if self.journal is not None:
+            self.journal.record("nodeRemoved", nodeId)
+        if self.listeners:
+            self.notify("nodeRemoved", nodeId)
+
+    def restoreNodes(self, nodeIds):
+        """This method brings back removed nodes under their ids, along with
+            the ports they had when they got removed. Edges are restored on
+            their own, see restoreEdge.
+        Args:
+            nodeIds (iterable): Ids of removed nodes, alive ones are skipped.
+        Returns:
+            (None): Returns None.
+        """
+        unsorted = set()
+        for nodeId in nodeIds:
+            if not 0 <= nodeId < len(self.nodeAlive) or \
+                    self.nodeAlive[nodeId]:
+                continue
+            label = self.nodeLabels[nodeId]
+            if label is not None:
+                if label in self.labelIndex:
+                    # taken by a node added since then.
+                    label = self.uniqueLabel(label)
+                    self.nodeLabels[nodeId] = label
+                self.labelIndex[label] = nodeId
+            row = self.typeIndex.setdefault(self.nodeTypes[nodeId], {})
+            if row and nodeId < next(reversed(row)):
+                unsorted.add(self.nodeTypes[nodeId])
+            row[nodeId] = None
+            for portId in self.nodePorts[nodeId].values():
+                self.portAlive[portId] = 1
+            self.nodeAlive[nodeId] = 1
+            self.nodeCount += 1
+            if self.journal is not None:
+                self.journal.record("nodeAdded", nodeId)
+            if self.listeners:
+                self.notify("nodeAdded", nodeId)
+        # rows of typeIndex are in creation order.
+        for nodeType in unsorted:
+            self.typeIndex[nodeType] = dict.fromkeys(
+                sorted(self.typeIndex[nodeType]))
+
+    def hasNode(self, nodeId):
+        """This method checks if node id exists and is alive.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (bool): Returns True if node is alive.
+        """
+        return 0 <= nodeId < len(self.nodeAlive) and \
+            bool(self.nodeAlive[nodeId])
+
+    def setPosition(self, nodeId, x, y):
+        """This method sets scene position of a node.
+        Args:
+            nodeId (int): Id of the node.
+            x (float): X position.
+            y (float): Y position.
+        Returns:
+            (None): Returns None.
+        """
+        if self.journal is not None:
+            self.journal.record("positionChanged", nodeId,
+                                self.nodeXs[nodeId], self.nodeYs[nodeId])
+        self.nodeXs[nodeId] = x
+        self.nodeYs[nodeId] = y
+        if self.listeners:
+            self.notify("positionChanged", nodeId)
+
+    def setNote(self, nodeId, note):
+        """This method sets note message of a node.
+        Args:
+            nodeId (int): Id of the node.
+            note (str): Note message, None to remove the note.
+        Returns:
+            (None): Returns None.
+        """
+        if self.journal is not None:
+            self.journal.record("noteChanged", nodeId, self.nodeNotes[nodeId])
+        self.nodeNotes[nodeId] = note
+        if self.listeners:
+            self.notify("noteChanged", nodeId)
+
+    def uniqueLabel(self, label):
+        """This method gets a label no other node uses.
+        Args:
+            label (str): Wanted label.
+        Returns:
+            (str): Returns label itself or label suffixed with "_<number>".
+        """
+        if label not in self.labelIndex:
+            return label
+        counter = self.labelCounters.get(label, 0)
+        while True:
+            counter += 1
+            candidate = "{}_{}".format(label, counter)
+            if candidate not in self.labelIndex:
+                self.labelCounters[label] = counter
+                return candidate
+
+    def findNode(self, label):
+        """This method finds node by its label.
+        Args:
+            label (str): Label of the node.
+        Returns:
+            (int): Returns node id or None if not found.
+        """
+        return self.labelIndex.get(label)
+
+    def nodesOfType(self, nodeType):
+        """This method gets all nodes of a node type.
+        Args:
+            nodeType (str): Type of the nodes.
+        Returns:
+            (list): Returns list of node ids in creation order.
+        """
+        return list(self.typeIndex.get(nodeType, ()))
+
+    def nodes(self):
+        """This method iterates over ids of all alive nodes.
+        Returns:
+            (generator): Generator of node ids.
+        """
+        alive = self.nodeAlive
+        return (nodeId for nodeId in range(len(alive)) if alive[nodeId])
+
+    def ports(self, nodeId, kind=None):
+        """This method gets port ids of given node.
+        Args:
+            nodeId (int): Id of the node.
+            kind (int): INPUT or OUTPUT to filter ports, None for all.
+        Returns:
+            (list): Returns list of port ids.
+        """
+        if kind is None:
+            return list(self.nodePorts[nodeId].values())
+        kinds = self.portKinds
+        return [portId for portId in self.nodePorts[nodeId].values()
+                if kinds[portId] == kind]
+
+    def findPort(self, nodeId, paramName):
+        """This method finds port of a node by its name.
+        Args:
+            nodeId (int): Id of the node.
+            paramName (str): Name of the port.
+        Returns:
+            (int): Returns port id or None if not found.
+        """
+        return self.nodePorts[nodeId].get(paramName)
+
+    def inEdges(self, nodeId):
+        """This method gets ids of edges coming into given node.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (list): Returns list of edge ids.
+        """
+        return list(self.nodeInEdges[nodeId] or ())
+
+    def outEdges(self, nodeId):
+        """This method gets ids of edges going out of given node.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (list): Returns list of edge ids.
+        """
+        return list(self.nodeOutEdges[nodeId] or ())
+
+    def upStream(self, nodeId):
+        """This method gets direct up stream nodes, each one once however
+            many edges lead from it.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        return list(self.nodeUpNodes[nodeId] or ())
+
+    def downStream(self, nodeId):
+        """This method gets direct down stream nodes, each one once however
+            many edges lead to it.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        return list(self.nodeDownNodes[nodeId] or ())
+
+    # ports
+    def addPort(self, nodeId, paramName=None, paramValue=None, kind=INPUT,
+                paramIndex=None):
+        """This method adds a port to given node.
+        Args:
+            nodeId (int): Id of the node.
+            paramName (str): Name of the port.
+            paramValue (): Value of the port.
+            kind (int): INPUT or OUTPUT.
+            paramIndex (int): Index of the port, defaults to port count.
+        Returns:
+            (int): Returns id of the new port.
+        Raises:
+            ValueError: If the node has a port with this name already.
+        """
+        if paramName in self.nodePorts[nodeId]:
+            raise ValueError("Port {} already exists on node {}".format(
+                paramName, self.nodeLabels[nodeId]))
+        portId = len(self.portAlive)
+        if paramIndex is None:
+            paramIndex = len(self.nodePorts[nodeId])
+        self.portNodes.append(nodeId)
+        self.portNames.append(paramName)
+        self.portValues.append(paramValue)
+        self.portKinds.append(kind)
+        self.portIndices.append(paramIndex)
+        self.portAlive.append(1)
+        self.portInEdges.append(None)
+        self.portOutEdges.append(None)
+        self.nodePorts[nodeId][paramName] = portId
+        if self.journal is not None:
+            self.journal.record("portAdded", portId)
+        if self.listeners:
+            self.notify("portAdded", portId)
+        return portId
+
+    def removePort(self, portId):
+        """This method removes port and all of its edges.
+            Ports of the same kind after it move one index down, so indexes
+            stay packed.
+        Args:
+            portId (int): Id of the port to remove.
+        Returns:
+            (None): Returns None.
+        """
+        if not self.hasPort(portId):
+            return
+        for edgeId in self.portEdges(portId):
+            self.removeEdge(edgeId)
+        self.portAlive[portId] = 0
+        row = self.nodePorts[self.portNodes[portId]]
+        del row[self.portNames[portId]]
+        kinds, indices = self.portKinds, self.portIndices
+        kind, paramIndex = kinds[portId], indices[portId]
+        for otherPort in row.values():
+            if kinds[otherPort] == kind and indices[otherPort] > paramIndex:
+                indices[otherPort] -= 1
+        if self.journal is not None:
+            self.journal.record("portRemoved", portId)
+        if self.listeners:
+            self.notify("portRemoved", portId)
+
+    def restorePort(self, portId):
+        """This method brings back a removed port of an alive node under its
+            id. Ports of the same kind from its index on move one index up,
+            the reverse of removePort. Edges are restored on their own, see
+            restoreEdge.
+        Args:
+            portId (int): Id of the port to restore.
+        Returns:
+            (None): Returns None.
+        Raises:
+            ValueError: If the node has a port with this name already.
+        """
+        if not 0 <= portId < len(self.portAlive) or self.portAlive[portId]:
+            return
+        nodeId = self.portNodes[portId]
+        if not self.hasNode(nodeId):
+            return
+        row = self.nodePorts[nodeId]
+        if self.portNames[portId] in row:
+            raise ValueError("Port {} already exists on node {}".format(
+                self.portNames[portId], self.nodeLabels[nodeId]))
+        kinds, indices = self.portKinds, self.portIndices
+        kind, paramIndex = kinds[portId], indices[portId]
+        for otherPort in row.values():
+            if kinds[otherPort] == kind and indices[otherPort] >= paramIndex:
+                indices[otherPort] += 1
+        row[self.portNames[portId]] = portId
+        # rows are in port order, ports are created in that order.
+        self.nodePorts[nodeId] = dict(
+            sorted(row.items(), key=lambda item: item[1]))
+        self.portAlive[portId] = 1
+        if self.journal is not None:
+            self.journal.record("portAdded", portId)
+        if self.listeners:
+            self.notify("portAdded", portId)
+
+    def hasPort(self, portId):
+        """This method checks if port id exists and is alive.
+        Args:
+            portId (int): Id of the port.
+        Returns:
+            (bool): Returns True if port is alive.
+        """
+        return 0 <= portId < len(self.portAlive) and \
+            bool(self.portAlive[portId])
+
+    def portEdges(self, portId):
+        """This method gets ids of all edges connected to given port.
+        Args:
+            portId (int): Id of the port.
+        Returns:
+            (list): Returns list of edge ids, incoming first.
+        """
+        return list(self.portInEdges[portId] or ()) + \
+            list(self.portOutEdges[portId] or ())
+
+    def inputEdge(self, portId):
+        """This method gets the edge an input port takes its value from, the
+            last one connected.
+        Args:
+            portId (int): Id of the port.
+        Returns:
+            (int): Returns id of the edge, None if not connected.
+        """
+        edges = self.portInEdges[portId]
+        return next(reversed(edges)) if edges else None
+
+    def setValue(self, portId, paramValue):
+        """This method sets value of given port.
+        Args:
+            portId (int): Id of the port.
+            paramValue (): New value of the port.
+        Returns:
+            (None): Returns None.
+        """
+        self.portValues[portId] = paramValue
+        if self.listeners:
+            self.notify("valueChanged", portId)
+
+    def getValue(self, portId):
+        """This method gets value of given port.
+        Args:
+            portId (int): Id of the port.
+        Returns:
+            (): Returns value of the port.
+        """
+        return self.portValues[portId]
+
+    # edges
+    def addEdge(self, sourcePort, targetPort):
+        """This method adds an edge in between two ports.
+            Validation (types, cycles, duplicates) is up to the caller.
+        Args:
+            sourcePort (int): Id of the output port.
+            targetPort (int): Id of the input port.
+        Returns:
+            (int): Returns id of the new edge.
+        """
+        edgeId = len(self.edgeAlive)
+        self.edgeSources.append(sourcePort)
+        self.edgeTargets.append(targetPort)
+        self.edgeAlive.append(0)
+        self.restoreEdge(edgeId)
+        return edgeId
+
+    def restoreEdge(self, edgeId):
+        """This method brings back a removed edge under its id. Its ports
+            have to be alive.
+        Args:
+            edgeId (int): Id of the edge to restore.
+        Returns:
+            (None): Returns None.
+        """
+        if self.hasEdge(edgeId):
+            return
+        sourcePort = self.edgeSources[edgeId]
+        targetPort = self.edgeTargets[edgeId]
+        sourceNode = self.portNodes[sourcePort]
+        targetNode = self.portNodes[targetPort]
+        self.addTo(self.portOutEdges, sourcePort, edgeId)
+        self.addTo(self.portInEdges, targetPort, edgeId)
+        self.addTo(self.nodeOutEdges, sourceNode, edgeId)
+        self.addTo(self.nodeInEdges, targetNode, edgeId)
+        self.countIn(self.nodeDownNodes, sourceNode, targetNode)
+        self.countIn(self.nodeUpNodes, targetNode, sourceNode)
+        self.edgeAlive[edgeId] = 1
+        self.edgeCount += 1
+        if self.journal is not None:
+            self.journal.record("edgeAdded", edgeId)
+        if self.listeners:
+            self.notify("edgeAdded", edgeId)
+
+    def removeEdge(self, edgeId):
+        """This method removes an edge.
+        Args:
+            edgeId (int): Id of the edge to remove.
+        Returns:
+            (None): Returns None.
+        """
+        if not self.hasEdge(edgeId):
+            return
+        sourcePort = self.edgeSources[edgeId]
+        targetPort = self.edgeTargets[edgeId]
+        sourceNode = self.portNodes[sourcePort]
+        targetNode = self.portNodes[targetPort]
+        del self.portOutEdges[sourcePort][edgeId]
+        del self.portInEdges[targetPort][edgeId]
+        del self.nodeOutEdges[sourceNode][edgeId]
+        del self.nodeInEdges[targetNode][edgeId]
+        self.countOut(self.nodeDownNodes, sourceNode, targetNode)
+        self.countOut(self.nodeUpNodes, targetNode, sourceNode)
+        self.edgeAlive[edgeId] = 0
+        self.edgeCount -= 1
+        if self.journal is not None:
+            self.journal.record("edgeRemoved", edgeId)
+        if self.listeners:
+            self.notify("edgeRemoved", edgeId)
+
+    def hasEdge(self, edgeId):
+        """This method checks if edge id exists and is alive.
+        Args:
+            edgeId (int): Id of the edge.
+        Returns:
+            (bool): Returns True if edge is alive.
+        """
+        return 0 <= edgeId < len(self.edgeAlive) and \
+            bool(self.edgeAlive[edgeId])
+
+    def edges(self):
+        """This method iterates over ids of all alive edges.
+        Returns:
+            (generator): Generator of edge ids.
+        """
+        alive = self.edgeAlive
+        return (edgeId for edgeId in range(len(alive)) if alive[edgeId])
+
+    def edgeNodes(self, edgeId):
+        """This method gets source and target node of an edge.
+        Args:
+            edgeId (int): Id of the edge.
+        Returns:
+            (tuple): Returns (source node id, target node id).
+        """
+        return (self.portNodes[self.edgeSources[edgeId]],
+                self.portNodes[self.edgeTargets[edgeId]])
+
+    def removeEdges(self, edgeIds):
+        """This method removes many edges, each in O(1).
+        Args:
+            edgeIds (iterable): Ids of the edges to remove, dead ones are
+                skipped.
+        Returns:
+            (None): Returns None.
+        """
+        for edgeId in edgeIds:
+            self.removeEdge(edgeId)
+
+    def removeNodes(self, nodeIds):
+        """This method removes many nodes. All of their edges are collected
+            once and removed before the nodes, so the work is proportional
+            to the number of nodes, ports and edges removed.
+        Args:
+            nodeIds (iterable): Ids of the nodes to remove, dead ones are
+                skipped.
+        Returns:
+            (None): Returns None.
+        """
+        nodeIds = [nodeId for nodeId in nodeIds if self.hasNode(nodeId)]
+        edgeIds = {}
+        for nodeId in nodeIds:
+            edgeIds.update(self.nodeInEdges[nodeId] or ())
+            edgeIds.update(self.nodeOutEdges[nodeId] or ())
+        self.removeEdges(edgeIds)
+        for nodeId in nodeIds:
+            self.removeNode(nodeId)
+
+    @staticmethod
+    def addTo(table, index, value):
+        """This method adds value to a lazily created adjacency row.
+        Args:
+            table (list): Adjacency table.
+            index (int): Row of the table.
+            value (int): Value to add.
+        Returns:
+            (None): Returns None.
+        """
+        row = table[index]
+        if row is None:
+            table[index] = {value: None}
+        else:
+            row[value] = None
+
+    @staticmethod
+    def countIn(table, index, value):
+        """This method counts one more edge to a neighbour node.
+        Args:
+            table (list): nodeUpNodes or nodeDownNodes.
+            index (int): Node id, row of the table.
+            value (int): Id of the neighbour node.
+        Returns:
+            (None): Returns None.
+        """
+        row = table[index]
+        if row is None:
+            table[index] = {value: 1}
+        else:
+            row[value] = row.get(value, 0) + 1
+
+    @staticmethod
+    def countOut(table, index, value):
+        """This method counts one less edge to a neighbour node, dropping
+            the neighbour once no edge is left.
+        Args:
+            table (list): nodeUpNodes or nodeDownNodes.
+            index (int): Node id, row of the table.
+            value (int): Id of the neighbour node.
+        Returns:
+            (None): Returns None.
+        """
+        row = table[index]
+        if row[value] == 1:
+            del row[value]
+        else:
+            row[value] -= 1
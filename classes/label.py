@@ -0,0 +1,26 @@
+"""Creating text label item drawn only when zoomed in enough to read it."""
+from PyQt5 import QtWidgets
+
+import variables
+import tracing
+
+
+@tracing.instrument
+class Label(QtWidgets.QGraphicsTextItem):
+    """Creating Label class by inheriting QtWidgets.QGraphicsTextItem"""
+    @tracing.traced("paint")
+    def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
+        """Overriding paint to skip text below variables.LOD_TEXT zoom.
+        Args:
+            painter (QtGui.QPainter): Painter object to paint the widget.
+            QStyleOptionGraphicsItem (QtWidgets.QStyleOptionGraphicsItem):
+                Style options of the item.
+            widget (QtWidgets.QWidget): Widget painted on.
+        Returns:
+            (None): Returns None.
+        """
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        if lod < variables.LOD_TEXT:
+            return
+        super(Label, self).paint(painter, QStyleOptionGraphicsItem, widget)
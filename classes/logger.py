@@ -1,4 +1,15 @@
+"""Logging of the node editor.
+
+log() only checks the level and queues the message, printing and writing
+happen on a background thread which writes everything queued at once to a
+log file it keeps open. Log files are named by date and rotated once they
+grow above MAX_LOG_SIZE.
+"""
+import atexit
 import datetime
+import queue
+import sys
+import threading
 import time
 import tempfile
 import os
@@ -9,32 +20,238 @@ TEMPDIR = tempfile.gettempdir()
 TEMP_LOG_FOLDER = os.path.join(TEMPDIR, "DUKE")
 DEBUG = True  # If True log will get printed on the shell.
 WRITE_LOG = True  # If True log will get written in TEMP_LOG_FOLDER.
+SUSPENDED = 0  # While above 0 "INFO" messages are skipped, see suspend().
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+LEVEL = "INFO"  # Messages of lower levels are skipped, see setLevel().
+MAX_LOG_SIZE = 10 * 1024 * 1024  # Bytes after which a log file is rotated.
+LOG_BACKUPS = 5  # Rotated log files to keep, name.log.1 being the newest.
+QUEUE = queue.Queue()  # (time, line) waiting for the writer, None stops it.
+WRITER = None  # threading.Thread running write().
+LOCK = threading.Lock()  # guards starting WRITER.
+STAMP = (None, None)  # (minute, timestamp text) of the last message.
 
 
-def log(typ="INFO", msg="No Msg"):
-    """This function prints provided msg with date stamp.
+def log(typ="INFO", msg="No Msg", args=None):
+    """This function queues provided msg with date stamp to be printed and
+        written by the writer thread. Skipped messages are not formatted.
     Args:
         typ (str): type of the message.
-        msg (str): Text to print as message.
+        msg (str): Text to print as message, formatted with args if given.
+        args (tuple): Values for str.format of msg.
 
     Returns:
-        (str): Returns date stamp formatted text in string.
+        (str): Returns date stamp formatted text in string, None if skipped.
     """
-    temp_log_file = os.path.join(TEMP_LOG_FOLDER, "{}.log".format(
-        datetime.datetime.now().date()))
+    if not enabled(typ):
+        return
+    global STAMP
     now = time.time()
-    timestamp = datetime.datetime.fromtimestamp(now).strftime(
-        '%Y-%m-%d %I:%M %p')
-    string_ = "{} : {} : {}".format(typ, timestamp, msg)
-    if DEBUG:
-        print(string_)
-    if WRITE_LOG:
+    minute = int(now // 60)
+    if STAMP[0] != minute:
+        STAMP = (minute, datetime.datetime.fromtimestamp(now).strftime(
+            '%Y-%m-%d %I:%M %p'))
+    string_ = "{} : {} : {}".format(
+        typ, STAMP[1], msg.format(*args) if args else msg)
+    if DEBUG or WRITE_LOG:
+        if WRITER is None:
+            start()
+        QUEUE.put((now, string_))
+    return string_
+
+
+def enabled(typ="INFO"):
+    """This function checks if messages of a type get logged.
+    Args:
+        typ (str): type of the message.
+    Returns:
+        (bool): Returns True if logged.
+    """
+    if SUSPENDED and typ == "INFO":
+        return False
+    return LEVELS.get(typ, LEVELS["ERROR"]) >= LEVELS[LEVEL]
+
+
+def setLevel(level="INFO"):
+    """This function sets lowest type of messages to log.
+    Args:
+        level (str): One of LEVELS.
+    Returns:
+        (None): Returns None.
+    """
+    global LEVEL
+    if level not in LEVELS:
+        log(typ="ERROR", msg="Unknown log level {}", args=(level,))
+        return
+    LEVEL = level
+
+
+def start():
+    """This function starts the writer thread.
+    Returns:
+        (None): Returns None.
+    """
+    global WRITER
+    with LOCK:
+        if WRITER is None:
+            WRITER = threading.Thread(target=write, name="logger",
+                                      daemon=True)
+            WRITER.start()
+
+
+def flush():
+    """This function waits until the writer thread handled every queued
+        message.
+    Returns:
+        (None): Returns None.
+    """
+    if WRITER is not None:
+        QUEUE.join()
+
+
+def stop():
+    """This function writes queued messages and ends the writer thread.
+    Returns:
+        (None): Returns None.
+    """
+    global WRITER
+    if WRITER is None:
+        return
+    QUEUE.put(None)
+    WRITER.join()
+    WRITER = None
+
+
+atexit.register(stop)
+
+
+def write():
+    """This function runs on the writer thread. It takes everything queued,
+        prints it and appends it to the log file of its date in one write.
+    Returns:
+        (None): Returns None.
+    """
+    logFile = LogFile()
+    running = True
+    while running:
+        batch = [QUEUE.get()]
+        while True:
+            try:
+                batch.append(QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        count = len(batch)
+        if None in batch:
+            running = False
+            batch = [x for x in batch if x is not None]
+        if batch:
+            lines = "".join("{}\n".format(line) for _, line in batch)
+            if DEBUG:
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+            if WRITE_LOG:
+                logFile.write(batch)
+        for _ in range(count):
+            QUEUE.task_done()
+    logFile.close()
+
+
+class LogFile(object):
+    """Creating LogFile class keeping the dated log file open."""
+    def __init__(self, folder=None):
+        """Initializing LogFile class.
+        Args:
+            folder (str): Folder of the log files, TEMP_LOG_FOLDER if None.
+        """
+        self.folder = folder or TEMP_LOG_FOLDER
+        self.path = None
+        self.handle = None
+
+    def write(self, batch):
+        """This method appends messages to the log files of their dates.
+        Args:
+            batch (list): (time, line) of the messages.
+        Returns:
+            (None): Returns None.
+        """
+        path = None
         try:  # using "try" to avoid permission errors on end user machines!
-            if not os.path.exists(os.path.join(TEMP_LOG_FOLDER)):
-                os.makedirs(os.path.join(TEMP_LOG_FOLDER))
-            with open(temp_log_file, "a") as rp:
-                rp.write("{}\n".format(string_))
+            lines = []
+            for now, line in batch:
+                path = os.path.join(self.folder, "{}.log".format(
+                    datetime.date.fromtimestamp(now)))
+                if path != self.path:
+                    self.writeLines(lines)
+                    lines = []
+                    self.open(path)
+                lines.append("{}\n".format(line))
+            self.writeLines(lines)
         except Exception as err:
-            print("ERROR : While writing a log to path {}".format(temp_log_file))
+            self.close()
+            print("ERROR : While writing a log to path {}".format(path))
             print("ERROR : msg : {}".format(err))
-    return string_
+
+    def writeLines(self, lines):
+        """This method appends lines to the open log file and rotates it
+            once it grows above MAX_LOG_SIZE.
+        Args:
+            lines (list): Lines to write.
+        Returns:
+            (None): Returns None.
+        """
+        if not lines:
+            return
+        self.handle.write("".join(lines))
+        self.handle.flush()
+        if self.handle.tell() > MAX_LOG_SIZE:
+            path = self.path
+            self.close()
+            for index in range(LOG_BACKUPS - 1, 0, -1):
+                if os.path.exists("{}.{}".format(path, index)):
+                    os.replace("{}.{}".format(path, index),
+                               "{}.{}".format(path, index + 1))
+            if LOG_BACKUPS:
+                os.replace(path, "{}.1".format(path))
+            else:
+                os.remove(path)
+            self.open(path)
+
+    def open(self, path):
+        """This method opens a log file for appending, closing the open one.
+        Args:
+            path (str): Log file path.
+        Returns:
+            (None): Returns None.
+        """
+        self.close()
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        self.handle = open(path, "a")
+        self.path = path
+
+    def close(self):
+        """This method closes the open log file.
+        Returns:
+            (None): Returns None.
+        """
+        if self.handle is not None:
+            self.handle.close()
+        self.handle = self.path = None
+
+
+def suspend():
+    """This function skips "INFO" messages until resume() gets called.
+        Calls can be nested.
+    Returns:
+        (None): Returns None.
+    """
+    global SUSPENDED
+    SUSPENDED += 1
+
+
+def resume():
+    """This function ends one suspend() call.
+    Returns:
+        (None): Returns None.
+    """
+    global SUSPENDED
+    SUSPENDED = max(SUSPENDED - 1, 0)
@@ -1,17 +1,23 @@
 """Creating Node"""
 from PyQt5 import QtGui, QtWidgets, QtCore
-import os
+import collections
 
 import variables
+import graph
 import parameter
 import logger
+import tracing
+import undo
 import note
+import label
+import geometry
 
 
+@tracing.instrument
 class Node(QtWidgets.QGraphicsItem, object):
     """Creating Node Class by inheriting QtWidgets.QGraphicsItem"""
     def __init__(self, scene=None, label=None, nodeType=None, parent=None,
-                 thumbnail=None, toolTip=None):
+                 thumbnail=None, toolTip=None, nodeId=None):
         """Initializing Node Class.
         Args:
             scene (QtWidgets.QGraphicsScene): Graphics Scene item to add this
@@ -21,67 +27,219 @@ class Node(QtWidgets.QGraphicsItem, object):
             parent (QtWidgets.QGraphicsItem): Parent widget of this class.
             thumbnail (str): Thumbnail image path of this Node. (jpg, png)
             toolTip (str): Tool tip for node in string format.
+            nodeId (int): Id of an existing node in scene.graph to display,
+                a new graph node is created if None.
         """
         super(Node, self).__init__(parent=parent)
         self.scene = scene
-        self.label = label
-        self.nodeType = nodeType
-        self.thumbnail = thumbnail
-        self.parameters = []
-        self.outConnections = []
-        self.inConnections = []
-        self.upStreamDependencies = []
-        self.downStreamDependencies = []
+        self.graph = scene.graph
+        if nodeId is None:
+            nodeId = self.graph.addNode(label=label, nodeType=nodeType)
+            self.graph.addPort(nodeId, paramName="out", paramValue=None,
+                               kind=graph.OUTPUT, paramIndex=1)
+        self.nodeId = nodeId
+        self.scene.nodeItems[self.nodeId] = self
+        if thumbnail is not None:
+            self.thumbnail = thumbnail
+        self.parameterTable = collections.OrderedDict()  # paramName : item
+        self.spareParameters = []  # hidden parameter items kept for reuse.
         self.note = None
         self.toolTip = toolTip
         self.setToolTip(self.toolTip)
 
-        # setting up Pens and brushes
-        self.outlineSelectedPen = QtGui.QPen(
-            QtGui.QColor(variables.NODE_OUTLINE_SELECT_COLOR))
-        self.outlineDeSelectedPen = QtGui.QPen(
-            QtGui.QColor(variables.NODE_OUTLINE_DESELECT_COLOR)
-        )
-        self.labelForeBrush = QtGui.QBrush(
-            QtGui.QColor(variables.NODE_LABEL_FORECOLOR))
-        self.bodyBrush = QtGui.QBrush(QtGui.QColor(variables.NODE_BODY_COLOR))
-        self.labelForeColor = QtGui.QColor(variables.NODE_LABEL_FORECOLOR)
-        self.labelBackColor = QtGui.QColor(variables.NODE_LABEL_BACKCOLOR)
-        self.labelBrush = QtGui.QBrush(self.labelBackColor)
-        self.labelFont = QtGui.QFont("Verdana", 10)
-
+        # setting up Pens and brushes, shared by all nodes of a style.
+        style = geometry.currentNodeStyle()
+        self.outlineSelectedPen = style.outlineSelectedPen
+        self.outlineDeSelectedPen = style.outlineDeSelectedPen
+        self.labelForeBrush = style.labelForeBrush
+        self.bodyBrush = style.bodyBrush
+        self.labelForeColor = style.labelForeBrush.color()
+        self.labelBackColor = style.labelBrush.color()
+        self.labelBrush = style.labelBrush
+        self.labelFont = style.labelFont
+        self.setCacheMode(variables.NODE_CACHE_MODE)
+
+        self.setPos(self.graph.nodeXs[self.nodeId],
+                    self.graph.nodeYs[self.nodeId])
         self.setFlags(QtWidgets.QGraphicsItem.ItemIsMovable |
-                      QtWidgets.QGraphicsItem.ItemIsSelectable)
+                      QtWidgets.QGraphicsItem.ItemIsSelectable |
+                      QtWidgets.QGraphicsItem.ItemSendsGeometryChanges |
+                      QtWidgets.QGraphicsItem.ItemSendsScenePositionChanges)
 
         # adding node label
         self.setupLabel()
-        # setting out parameter
-        outParameter = parameter.Parameter(parent=self, node=self,
-                                           paramName="out", paramValue=None,
-                                           paramIndex=1, paramType="output")
-        self.parameters.append(outParameter)
+        self.setupParameters()
+        # setting up note stored in the graph.
+        self.updateNote()
+
+    def setupParameters(self):
+        """This method sets up parameter items for the ports of the graph
+            node, out parameter first. Existing and spare items are reused.
+        Returns:
+            (None): Returns None.
+        """
+        spare = list(self.parameterTable.values()) + self.spareParameters
+        spare.reverse()
+        self.parameterTable = collections.OrderedDict()
+        ports = self.graph.ports(self.nodeId, kind=graph.OUTPUT) + \
+            self.graph.ports(self.nodeId, kind=graph.INPUT)
+        for portId in ports:
+            if spare:
+                parameter_ = spare.pop()
+                parameter_.bind(portId)
+                parameter_.show()
+            else:
+                parameter_ = parameter.Parameter(parent=self, node=self,
+                                                 portId=portId)
+            self.parameterTable[parameter_.paramName] = parameter_
+        for parameter_ in spare:
+            parameter_.hide()
+        self.spareParameters = spare
+
+    def bind(self, nodeId):
+        """This method makes an unbound item display another graph node, so
+            virtualized views can recycle items instead of creating them.
+        Args:
+            nodeId (int): Id of the node in scene.graph to display.
+        Returns:
+            (None): Returns None.
+        """
+        self.nodeId = nodeId
+        self.scene.nodeItems[nodeId] = self
+        self.setPos(self.graph.nodeXs[nodeId], self.graph.nodeYs[nodeId])
+        self.label_item.setPlainText(self.label)
+        self.setupParameters()
+        self.updateNote()
+        self.show()
+        self.update()
+
+    def updateNote(self):
+        """This method sets up the note item for the note stored in the
+            graph.
+        Returns:
+            (None): Returns None.
+        """
+        if self.note:
+            self.note.remove()
+            self.note = None
+        if self.graph.nodeNotes[self.nodeId] is not None:
+            self.note = note.Note(self, node=self,
+                                  message=self.graph.nodeNotes[self.nodeId])
+
+    def unbind(self):
+        """This method detaches this item from its graph node and hides it,
+            the graph node itself is kept.
+        Returns:
+            (None): Returns None.
+        """
+        if self.scene.nodeItems.get(self.nodeId) is self:
+            del self.scene.nodeItems[self.nodeId]
+        for parameter_ in self.parameterTable.values():
+            parameter_.unbind()
+        self.setSelected(False)
+        self.hide()
+
+    @property
+    def parameters(self):
+        """List of parameter items of this node, out parameter first."""
+        return list(self.parameterTable.values())
+
+    @property
+    def label(self):
+        """Label of this node, stored in the graph model."""
+        return self.graph.nodeLabels[self.nodeId]
+
+    @property
+    def nodeType(self):
+        """Node type of this node, stored in the graph model."""
+        return self.graph.nodeTypes[self.nodeId]
+
+    @property
+    def thumbnail(self):
+        """Thumbnail image path of this node, stored in the graph model."""
+        return self.graph.nodeThumbnails[self.nodeId]
+
+    @thumbnail.setter
+    def thumbnail(self, path):
+        self.graph.nodeThumbnails[self.nodeId] = path
+        self.update()
+
+    def itemChange(self, change, value):
+        """Overriding itemChange to keep position in the graph model and
+            to move the connections of this node along with it.
+        Args:
+            change (QtWidgets.QGraphicsItem.GraphicsItemChange): Change.
+            value (): Value of the change.
+        Returns:
+            (): Returns the value of the base class.
+        """
+        if change == QtWidgets.QGraphicsItem.ItemPositionHasChanged and \
+                (value.x() != self.graph.nodeXs[self.nodeId] or
+                 value.y() != self.graph.nodeYs[self.nodeId]):
+            self.graph.setPosition(self.nodeId, value.x(), value.y())
+        elif change == QtWidgets.QGraphicsItem.ItemScenePositionHasChanged:
+            self.updateConnections()
+        return super(Node, self).itemChange(change, value)
+
+    def updateConnections(self):
+        """This method recomputes paths of the connections of this node.
+        Returns:
+            (None): Returns None.
+        """
+        items = self.scene.connectionItems
+        if not items:
+            return
+        for edgeId in self.graph.inEdges(self.nodeId) + \
+                self.graph.outEdges(self.nodeId):
+            con = items.get(edgeId)
+            if con is not None:
+                con.updatePath()
+
+    @property
+    def outConnections(self):
+        """List of connection items going out of this node."""
+        items = self.scene.connectionItems
+        return [items[edgeId] for edgeId in self.graph.outEdges(self.nodeId)
+                if edgeId in items]
+
+    @property
+    def inConnections(self):
+        """List of connection items coming into this node."""
+        items = self.scene.connectionItems
+        return [items[edgeId] for edgeId in self.graph.inEdges(self.nodeId)
+                if edgeId in items]
+
+    @property
+    def upStreamDependencies(self):
+        """List of direct up stream node items, each node once."""
+        items = self.scene.nodeItems
+        return [items[nodeId] for nodeId in self.graph.upStream(self.nodeId)
+                if nodeId in items]
+
+    @property
+    def downStreamDependencies(self):
+        """List of direct down stream node items, each node once."""
+        items = self.scene.nodeItems
+        return [items[nodeId] for nodeId in self.graph.downStream(self.nodeId)
+                if nodeId in items]
 
     def boundingRect(self):
         """"Creating a bounding box for this class.
         Returns:
             (QtCore.QRectF): Bounding box of this widget.
         """
-        return QtCore.QRectF(
-            -variables.NODE_SIZE,
-            -variables.NODE_SIZE,
-            variables.NODE_SIZE * 2,
-            variables.NODE_SIZE * 2
-        ).normalized()
+        return geometry.nodeGeometry(variables.NODE_SIZE).bounds
 
     def setupLabel(self):
-        """Setting up Title of the Node using QGraphicsTextItem"""
-        self.label_item = QtWidgets.QGraphicsTextItem(self)
+        """Setting up Title of the Node using label.Label"""
+        self.label_item = label.Label(self)
         self.label_item.setPlainText(self.label)
         self.label_item.setDefaultTextColor(QtCore.Qt.white)
         self.label_item.setFont(self.labelFont)
         self.label_item.setPos(-variables.NODE_SIZE, -variables.NODE_SIZE - 2)
         self.label_item.setTextWidth(variables.NODE_SIZE)
 
+    @tracing.traced("paint")
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
         """This events paints the Node on screen.
         Args:
@@ -92,47 +250,37 @@ class Node(QtWidgets.QGraphicsItem, object):
         Returns:
             (None): Returns None.
         """
-        self.outlineSelectedPen.setWidth(3)
-        # create body rectangle
-        body = QtGui.QPainterPath()
-        body.setFillRule(QtCore.Qt.WindingFill)
-
-        # create outline polygon
-        outline = QtGui.QPolygon()
-        outline.setPoints(- variables.NODE_SIZE,
-                          - variables.NODE_SIZE,
-                          - variables.NODE_SIZE,
-                          variables.NODE_SIZE,
-                          variables.NODE_SIZE,
-                          variables.NODE_SIZE,
-                          variables.NODE_SIZE,
-                          -variables.NODE_SIZE)
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        shapes = geometry.nodeGeometry(variables.NODE_SIZE)
+        if lod < variables.LOD_MINIMUM:
+            # zoomed out, the body alone is enough.
+            painter.fillRect(shapes.outline.boundingRect(),
+                             self.outlineSelectedPen.color() if
+                             self.isSelected() else self.bodyBrush.color())
+            return
         if self.isSelected():
             painter.setPen(self.outlineSelectedPen)
         else:
             painter.setPen(self.outlineDeSelectedPen)
         painter.setBrush(self.bodyBrush)
-        painter.drawPolygon(outline)
-        # create label polygon
-        label_outline = QtGui.QPolygon()
-        label_outline.setPoints(- variables.NODE_SIZE + 1,
-                                - variables.NODE_SIZE + 1,
-                                -variables.NODE_SIZE + 1,
-                                - variables.NODE_SIZE + 19,
-                                variables.NODE_SIZE - 1,
-                                - variables.NODE_SIZE + 19,
-                                variables.NODE_SIZE - 1,
-                                - variables.NODE_SIZE+1)
+        painter.drawPolygon(shapes.outline)
         painter.setPen(QtCore.Qt.NoPen)
         painter.setBrush(self.labelBrush)
-        painter.drawPolygon(label_outline)
-
-        if self.thumbnail:
-            if os.path.exists(self.thumbnail):
-                pixmap = QtGui.QPixmap(self.thumbnail)
-                painter.drawPixmap(-variables.NODE_SIZE + 15, -variables.NODE_SIZE + 25, variables.NODE_SIZE + 30,
-                                   variables.NODE_SIZE + 30, pixmap)
-
+        painter.drawPolygon(shapes.labelOutline)
+
+        if self.thumbnail and lod >= variables.LOD_TEXT:
+            # decoded in the background, a placeholder is drawn until then.
+            pixmap = self.scene.thumbnails.pixmap(self.thumbnail)
+            if pixmap:
+                # centered in the thumbnail rectangle, keeping its aspect.
+                rect = QtCore.QRect(QtCore.QPoint(), pixmap.size().scaled(
+                    shapes.thumbnail.size(), QtCore.Qt.KeepAspectRatio))
+                rect.moveCenter(shapes.thumbnail.center())
+                painter.drawPixmap(rect, pixmap)
+
+    @tracing.traced("edit")
+    @undo.undoable("Add parameter")
     def addParameter(self, paramName=None, paramValue=None):
         """This method Adds parameter to Node with given name and value.
         Args:
@@ -141,25 +289,29 @@ class Node(QtWidgets.QGraphicsItem, object):
         Returns:
             (parameter.Parameter): Returns the Parameter object.
         """
-        if self.parameters:
-            for param in self.parameters:
-                if param.paramName == paramName:
-                    logger.log(typ="ERROR",
-                               msg="Parameter {} already exists on node {}!".
-                               format(paramName, param.node.label))
-                    return
-        logger.log(msg="Adding parameter {} to node {}".format(paramName,
-                                                               self.label))
-        parameter_ = parameter.Parameter(parent=self,
-                                         node=self,
-                                         paramName=paramName,
-                                         paramValue=paramValue,
-                                         paramIndex=(len(self.parameters)),
-                                         paramType="input")
-        logger.log(msg=parameter_)
-        self.parameters.append(parameter_)
+        if paramName in self.parameterTable:
+            logger.log(typ="ERROR",
+                       msg="Parameter {} already exists on node {}!",
+                       args=(paramName, self.label))
+            return
+        logger.log(msg="Adding parameter {} to node {}",
+                   args=(paramName, self.label))
+        portId = self.graph.addPort(self.nodeId, paramName=paramName,
+                                    paramValue=paramValue, kind=graph.INPUT,
+                                    paramIndex=len(self.parameterTable))
+        parameter_ = parameter.Parameter(parent=self, node=self, portId=portId)
+        self.parameterTable[paramName] = parameter_
         return parameter_
 
+    def getParameter(self, paramName):
+        """This method gets parameter of this node by its name.
+        Args:
+            paramName (str): Name of the parameter.
+        Returns:
+            (parameter.Parameter): Returns the Parameter object or None.
+        """
+        return self.parameterTable.get(paramName)
+
     def removeParameter(self, paramName=None):
         """This method removes the parameter from itself of provided name.
         Args:
@@ -168,14 +320,46 @@ class Node(QtWidgets.QGraphicsItem, object):
         Returns:
             (None): Returns None.
         """
-        parameters = {}
-        [parameters.update({x.paramIndex: x}) for x in self.parameters
-         if self.parameters]
-        if parameters:
-            for index, param_node in parameters.items():
-                if param_node.paramName == paramName:
-                    self.scene.removeItem(param_node)
+        param_node = self.parameterTable.get(paramName)
+        if param_node:
+            param_node.remove()
 
+    def parameterAdded(self, portId):
+        """This method creates the item of a restored port of this node and
+            moves parameters below it down to their index.
+        Args:
+            portId (int): Id of the port in the graph model.
+        Returns:
+            (parameter.Parameter): Returns the new Parameter object.
+        """
+        parameter_ = parameter.Parameter(parent=self, node=self, portId=portId)
+        items = self.scene.parameterItems
+        ports = self.graph.ports(self.nodeId, kind=graph.OUTPUT) + \
+            self.graph.ports(self.nodeId, kind=graph.INPUT)
+        self.parameterTable = collections.OrderedDict(
+            (items[x].paramName, items[x]) for x in ports if x in items)
+        for param in self.parameterTable.values():
+            if param is not parameter_ and \
+                    param.paramType == parameter_.paramType and \
+                    param.paramIndex > parameter_.paramIndex:
+                param.updateIndex()
+        return parameter_
+
+    def parameterRemoved(self, parameter_):
+        """This method drops a removed parameter item from this node and
+            moves parameters below it up to their re-packed index.
+        Args:
+            parameter_ (parameter.Parameter): Removed Parameter object.
+        Returns:
+            (None): Returns None.
+        """
+        self.parameterTable.pop(parameter_.paramName, None)
+        for param in self.parameterTable.values():
+            if param.paramType == parameter_.paramType and \
+                    param.paramIndex >= parameter_.paramIndex:
+                param.updateIndex()
+
+    @tracing.traced("edit")
     def addConnection(self, sourceParam=None, targetParam=None):
         """This method adds connection to the scene.
         Args:
@@ -187,6 +371,8 @@ class Node(QtWidgets.QGraphicsItem, object):
 
         return sourceParam.addConnection(targetParam=targetParam)
 
+    @tracing.traced("edit")
+    @undo.undoable("Remove connection")
     def removeConnection(self, sourcePar, targetPar):
         """This method removes connection from the scene.
         Args:
@@ -195,85 +381,76 @@ class Node(QtWidgets.QGraphicsItem, object):
         Returns:
             (None)
         """
-        if self.outConnections:
-            for connect in self.outConnections:
-                if connect.sourceParam == sourcePar and \
-                        connect.targetParam == targetPar:
-                    connect.remove()
-                else:
-                    logger.log(
-                        typ="ERROR",
-                        msg="No connection found to remove from {}.{} to {}.{}".
-                        format(self.label, sourcePar.paramName,
-                               targetPar.node.label,
-                               targetPar.paramName))
+        if self.graph.outEdges(self.nodeId):
+            targets = self.graph.edgeTargets
+            for edgeId in self.graph.portOutEdges[sourcePar.portId] or ():
+                if targets[edgeId] == targetPar.portId:
+                    self.graph.removeEdge(edgeId)
+                    return
+            logger.log(
+                typ="ERROR",
+                msg="No connection found to remove from {}.{} to {}.{}",
+                args=(self.label, sourcePar.paramName, targetPar.node.label,
+                      targetPar.paramName))
         else:
             logger.log(typ="ERROR",
-                       msg="There are no connections in the node {}".format(
-                           self.label))
+                       msg="There are no connections in the node {}",
+                       args=(self.label,))
 
-    def getDownStreamDependencies(self, node_=None):
+    def getDownStreamDependencies(self, node_=None, ordered=False,
+                                  depth=None, nodeType=None):
         """This method gets all the down stream dependencies of given node.
+            Every node is returned once, however many paths lead to it.
         Args:
             node_ (Node): Node Object.
+            ordered (bool): If True nodes are in topological order.
+            depth (int): Number of levels to walk, all levels if None.
+            nodeType (str): Only return nodes of this type if given.
         Returns:
             (list): Returns List containing Node objects.
         """
         if not node_:
             node_ = self
-        dependencies = []
-        for node_object in node_.downStreamDependencies:
-            dependencies.append(node_object)
-            if node_object.downStreamDependencies:
-                dep = self.getDownStreamDependencies(node_=node_object)
-                if dep:
-                    dependencies.extend(dep)
-        return dependencies
-
-    def getUpStreamDependencies(self, node_=None):
+        items = self.scene.nodeItems
+        return [items[nodeId] for nodeId in self.scene.traversal.downStream(
+                    node_.nodeId, ordered=ordered, depth=depth,
+                    nodeType=nodeType) if nodeId in items]
+
+    def getUpStreamDependencies(self, node_=None, ordered=False, depth=None,
+                                nodeType=None):
         """This method gets all the up stream dependencies of given node.
+            Every node is returned once, however many paths lead to it.
         Args:
             node_ (Node): Node Object.
+            ordered (bool): If True nodes are in topological order.
+            depth (int): Number of levels to walk, all levels if None.
+            nodeType (str): Only return nodes of this type if given.
         Returns:
             (list): Returns List containing Node objects.
         """
         if not node_:
             node_ = self
-        dependencies = []
-        for node_object in node_.upStreamDependencies:
-            dependencies.append(node_object)
-            if node_object.upStreamDependencies:
-                dep = self.getUpStreamDependencies(node_=node_object)
-                if dep:
-                    dependencies.extend(dep)
-        return dependencies
+        items = self.scene.nodeItems
+        return [items[nodeId] for nodeId in self.scene.traversal.upStream(
+                    node_.nodeId, ordered=ordered, depth=depth,
+                    nodeType=nodeType) if nodeId in items]
 
+    @tracing.traced("edit")
+    @undo.undoable("Remove node")
     def remove(self):
         """" This method removes node from scene.
             order is important here.
-            first we need to remove note, connections then parameters and then
-            we can remove node.
+            first we need to remove note, then the graph node. Removing the
+            graph node removes its connections and parameters, the scene
+            drops their items as it observes the graph.
         """
         # removing note
         if self.note:
             self.note.remove()
-        # removing out connections
-        if self.outConnections:
-            for connect in self.outConnections:
-                connect.remove()
-        # removing in connections
-        if self.inConnections:
-            for connect in self.inConnections:
-                connect.remove()
-        # removing parameters
-        if self.parameters:
-            for parameter_ in self.parameters:
-                parameter_.remove()
-
-        logger.log(msg="Removing node {}".format(self.label))
-        # removing node itself.
-        self.scene.removeItem(self)
+        # removing node itself along with its connections and parameters.
+        self.graph.removeNode(self.nodeId)
 
+    @undo.undoable("Add note")
     def addNote(self, note_=None):
         """This method adds note to the note.
             message exceeds 180 characters will get truncated.
@@ -284,9 +461,11 @@ class Node(QtWidgets.QGraphicsItem, object):
         """
         if self.note:
             self.note.remove()
+        self.graph.setNote(self.nodeId, note_)
         self.note = note.Note(self, node=self, message=note_)
         return self.note
 
+    @undo.undoable("Remove note")
     def removeNote(self):
         """This method removes note from the node.
         Returns:
@@ -295,10 +474,11 @@ class Node(QtWidgets.QGraphicsItem, object):
         if self.note:
             self.note.remove()
             self.note = None
+            self.graph.setNote(self.nodeId, None)
         else:
             logger.log(
                 typ="SKIPPED",
-                msg="No Note found to remove in node {}".format(self.label))
+                msg="No Note found to remove in node {}", args=(self.label,))
 
     def getNote(self, asString=False):
         """"This method gets notes from current node
@@ -314,20 +494,38 @@ class Node(QtWidgets.QGraphicsItem, object):
         else:
             logger.log(
                 typ="ERROR",
-                msg="No Note found to query in node {}".format(self.label))
+                msg="No Note found to query in node {}", args=(self.label,))
 
     def disableViewUpdate(self):
-        self.scene.view.viewportUpdateMode(
-            QtWidgets.QGraphicsView.NoViewportUpdate)
+        """This method stops the view from repainting.
+        Returns:
+            (None): Returns None.
+        """
+        if self.scene.view:
+            self.scene.view.setViewportUpdateMode(
+                QtWidgets.QGraphicsView.NoViewportUpdate)
 
     def enbableViewUpdate(self):
-        self.scene.view.viewportUpdateMode(
-            QtWidgets.QGraphicsView.FullViewportUpdate)
+        """This method restores view repainting and repaints once.
+        Returns:
+            (None): Returns None.
+        """
+        if self.scene.view:
+            self.scene.view.setViewportUpdateMode(variables.VIEW_UPDATE_MODE)
+            self.scene.view.viewport().update()
 
+    @tracing.traced("compute")
     def compute(self):
-        self.disableViewUpdate()
-
-        self.enbableViewUpdate()
+        """This method brings this node up to date, computing only its dirty
+            up stream nodes. Inside scene.batch() compute is deferred until
+            the batch ends.
+        Returns:
+            (list): Returns ids of the computed nodes in compute order.
+        """
+        if self.scene.batchDepth:
+            self.scene.pendingCompute.add(self.nodeId)
+            return []
+        return self.scene.evaluator.evaluate([self.nodeId])
 
 
 
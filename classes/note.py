@@ -3,8 +3,11 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 
 import variables
 import logger
+import tracing
+import geometry
 
 
+@tracing.instrument
 class Note(QtWidgets.QGraphicsItem):
     """Creating a Note class by inheriting QtWidgets.QGraphicsItem.
     """
@@ -30,19 +33,17 @@ class Note(QtWidgets.QGraphicsItem):
         Returns:
             (None): Returns None.
         """
-        pos_X = self.node.parameters[0].scenePos().x() + variables.NODE_SIZE
-        pos_Y = self.node.parameters[0].scenePos().y() - variables.NODE_SIZE *2
-        self.setPos(pos_X, pos_Y)
+        # note is a child of the node, so position is relative to it.
+        self.setPos(variables.NODE_SIZE, -variables.NODE_SIZE * 2)
 
     def boundingRect(self):
         """This method creates a bounding rectangle for this class.
         Returns:
             (QtCore.QRectF): rectF object.
         """
-        return QtCore.QRectF(self.node.parameters[0].scenePos().y(),
-                             self.node.parameters[0].scenePos().y(),
-                             100, 100)
+        return geometry.noteBounds()
 
+    @tracing.traced("paint")
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
         """This method paints the widget on screen.
         Args:
@@ -53,7 +54,9 @@ class Note(QtWidgets.QGraphicsItem):
         Returns:
             (None): Returns None.
         """
-        if self.displayNote and self.message:
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        if self.displayNote and self.message and lod >= variables.LOD_MINIMUM:
             # drawing outline polygon
             painter.setBrush(self.brush)
             painter.setPen(self.pen)
@@ -66,6 +69,8 @@ class Note(QtWidgets.QGraphicsItem):
                               75, 50,
                               12, 50)
             painter.drawPolygon(outline)
+            if lod < variables.LOD_TEXT:
+                return
             # drawing text message
             text = QtGui.QStaticText()
             if len(self.message) > 180:
@@ -76,10 +81,11 @@ class Note(QtWidgets.QGraphicsItem):
             text.setTextWidth(140)
             painter.drawStaticText(-70, -40, text)
 
+    @tracing.traced("edit")
     def remove(self):
         """This method removes itself from the scene.
         Returns:
             (None): Returns None.
         """
-        logger.log(msg="Removing note from node {}".format(self.node.label))
+        logger.log(msg="Removing note from node {}", args=(self.node.label,))
         self.node.scene.removeItem(self)
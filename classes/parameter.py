@@ -2,14 +2,20 @@
 from PyQt5 import QtGui, QtCore, QtWidgets
 
 import variables
+import graph
 import connection
 import logger
+import tracing
+import undo
+import label
+import geometry
 
 
+@tracing.instrument
 class Parameter(QtWidgets.QGraphicsItem):
     """Creating a Parameter class by inheriting QtWidgets.QGraphicsItem"""
     def __init__(self,  parent=None, node=None, paramName=None, paramValue=None,
-                 paramIndex=1, paramType="input", toolTip=None):
+                 paramIndex=1, paramType="input", toolTip=None, portId=None):
         """Initializing Parameter class.
         Args:
             parent (QtWidgets.QGraphicsItem): Parent Item of this class.
@@ -19,46 +25,126 @@ class Parameter(QtWidgets.QGraphicsItem):
             paramIndex (int): Index of the Parameter.
             paramType (str): Type of the Parameter.
             toolTip (str): Tool tip of Parameter in string format.
+            portId (int): Id of an existing port in the graph model to
+                display, a new port is created if None.
         """
         super(Parameter, self).__init__(parent=parent)
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable)
         self.setCursor(QtCore.Qt.CrossCursor)
-        self.paramType = paramType
         self.node = node
         self.scene = self.node.scene
-        self.paramName = paramName
-        self.paramValue = paramValue
+        self.graph = self.node.graph
+        if portId is None:
+            portId = self.graph.addPort(
+                self.node.nodeId, paramName=paramName, paramValue=paramValue,
+                kind=graph.PORT_TYPES.index(paramType), paramIndex=paramIndex)
+        self.portId = portId
+        self.bounds = None  # cached boundingRect, reset on geometry changes.
+        self.scene.parameterItems[self.portId] = self
         self.toolTip = toolTip
         self.setToolTip(self.toolTip)
-        self.outConnections = []
-        self.inConnections = []
-        self.paramIndex = paramIndex
-        self.label_item = QtWidgets.QGraphicsTextItem(self)
+        self.label_item = label.Label(self)
         self.labelColor = QtGui.QColor(QtCore.Qt.white)
         self.labelFont = QtGui.QFont(variables.PARAM_LABEL_FONT)
-        self.penActive = QtGui.QPen(QtCore.Qt.green)
-        self.penInActive = QtGui.QPen(QtCore.Qt.white)
-        self.activeBrush = QtGui.QBrush(QtCore.Qt.red)
-        self.inActiveBrush = QtGui.QBrush(QtCore.Qt.black)
-        self.outputInactiveBrush = QtGui.QBrush(QtCore.Qt.black)
-        self.outputInactivePen = QtGui.QPen(QtCore.Qt.black)
+        style = geometry.parameterStyle()
+        self.penActive = style.penActive
+        self.penInActive = style.penInActive
+        self.activeBrush = style.activeBrush
+        self.inActiveBrush = style.inActiveBrush
+        self.outputInactiveBrush = style.outputInactiveBrush
+        self.outputInactivePen = style.outputInactivePen
         if self.paramType == "input":
             self.setupLabel()
 
+    @property
+    def paramName(self):
+        """Name of this parameter, stored in the graph model."""
+        return self.graph.portNames[self.portId]
+
+    @property
+    def paramType(self):
+        """Type of this parameter, "input" or "output"."""
+        return graph.PORT_TYPES[self.graph.portKinds[self.portId]]
+
+    @property
+    def paramIndex(self):
+        """Index of this parameter on its node."""
+        return self.graph.portIndices[self.portId]
+
+    @property
+    def paramValue(self):
+        """Value of this parameter, stored in the graph model."""
+        return self.graph.portValues[self.portId]
+
+    @paramValue.setter
+    def paramValue(self, value):
+        self.graph.setValue(self.portId, value)
+
+    @property
+    def outConnections(self):
+        """List of connection items going out of this parameter."""
+        items = self.scene.connectionItems
+        return [items[edgeId]
+                for edgeId in self.graph.portOutEdges[self.portId] or ()
+                if edgeId in items]
+
+    @property
+    def inConnections(self):
+        """List of connection items coming into this parameter."""
+        items = self.scene.connectionItems
+        return [items[edgeId]
+                for edgeId in self.graph.portInEdges[self.portId] or ()
+                if edgeId in items]
+
     def boundingRect(self):
         """Creating Bounding box for parameter
         Returns:
             (QtCore.QRectF): Returns the QRectF item.
         """
+        if self.bounds is None:
+            self.bounds = geometry.parameterBounds(
+                variables.NODE_SIZE, variables.PARAM_RADIUS, self.paramType,
+                self.paramIndex)
+        return self.bounds
+
+    def bind(self, portId):
+        """This method makes this item display another port of its node's
+            graph node, see node.Node.bind.
+        Args:
+            portId (int): Id of the port in the graph model.
+        Returns:
+            (None): Returns None.
+        """
+        self.prepareGeometryChange()
+        self.portId = portId
+        self.bounds = None
+        self.scene.parameterItems[portId] = self
         if self.paramType == "input":
-            return QtCore.QRectF(-variables.NODE_SIZE - variables.PARAM_RADIUS,
-                                 (variables.NODE_SIZE / 3 * self.paramIndex + 3)
-                                 - variables.NODE_SIZE + 3,
-                                 12, 12).normalized()
-        elif self.paramType == "output":
-            return QtCore.QRectF(variables.NODE_SIZE,
-                                 -variables.NODE_SIZE / 2,
-                                 12, 12).normalized()
+            self.setupLabel()
+        else:
+            self.label_item.setPlainText("")
+
+    def unbind(self):
+        """This method detaches this item from its port.
+        Returns:
+            (None): Returns None.
+        """
+        if self.scene.parameterItems.get(self.portId) is self:
+            del self.scene.parameterItems[self.portId]
+        self.setSelected(False)
+
+    def updateIndex(self):
+        """This method moves parameter to its current paramIndex.
+        Returns:
+            (None): Returns None.
+        """
+        self.prepareGeometryChange()
+        self.bounds = None
+        if self.paramType == "input":
+            self.setupLabel()
+        self.update()
+        for con in self.inConnections:
+            con.updatePath()
 
     def setupLabel(self):
         """Setting up Parameter label
@@ -80,6 +166,7 @@ class Parameter(QtWidgets.QGraphicsItem):
             variables.NODE_SIZE - 2
         )
 
+    @tracing.traced("paint")
     def paint(self, painter, QStyleOptionGraphicsItem, widget=None):
         """This events paints the widget on screen.
         Args:
@@ -90,29 +177,23 @@ class Parameter(QtWidgets.QGraphicsItem):
         Returns:
             (None): Returns None.
         """
-
-        self.penInActive.setWidth(1)
-        self.penActive.setWidth(1)
+        lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        if lod < variables.LOD_MINIMUM:
+            return
+        paramType = self.paramType
         if self.isSelected():
             painter.setBrush(self.activeBrush)
             painter.setPen(self.penActive)
+        elif paramType == "input":
+            painter.setBrush(self.inActiveBrush)
+            painter.setPen(self.penInActive)
         else:
-            if self.paramType == "input":
-                painter.setBrush(self.inActiveBrush)
-                painter.setPen(self.penInActive)
-            else:
-                if self.paramType == "output":
-                    painter.setBrush(self.outputInactiveBrush)
-                    painter.setPen(self.outputInactivePen)
-        if self.paramType == "input":
-            painter.drawEllipse(-variables.NODE_SIZE - variables.PARAM_RADIUS,
-                                (variables.NODE_SIZE / 3 * self.paramIndex + 3)
-                                - variables.NODE_SIZE + 3,
-                                variables.PARAM_RADIUS, variables.PARAM_RADIUS)
-
-        elif self.paramType == "output":
-            painter.drawEllipse(variables.NODE_SIZE, -variables.NODE_SIZE / 2,
-                                variables.PARAM_RADIUS, variables.PARAM_RADIUS)
+            painter.setBrush(self.outputInactiveBrush)
+            painter.setPen(self.outputInactivePen)
+        painter.drawEllipse(geometry.parameterEllipse(
+            variables.NODE_SIZE, variables.PARAM_RADIUS, paramType,
+            self.paramIndex))
 
     def addConnection(self, targetParam=None):
         """This method adds connection to the scene.
@@ -124,52 +205,42 @@ class Parameter(QtWidgets.QGraphicsItem):
         if targetParam.paramType == "output":
             logger.log(typ="ERROR", msg="Target parameter cannot be a output")
             return
-        if targetParam in self.node.parameters:
+        if targetParam.node is self.node:
             logger.log(typ="ERROR",
                        msg="Connection cannot be created with self parameters")
             return
         if self.paramType == targetParam.paramType:
             logger.log(typ="ERROR",
                        msg="Connection cannot be made inbetween same parameter"
-                           " type (! {}.{} --> {}.{})".format(
-                            self.node.label,
-                            self.paramName,
-                            targetParam.node.label,
-                            targetParam.paramName))
+                           " type (! {}.{} --> {}.{})",
+                       args=(self.node.label, self.paramName,
+                             targetParam.node.label, targetParam.paramName))
             return
-        if targetParam.node in self.node.getUpStreamDependencies(node_=self.node):
+        if not self.scene.topology.canConnect(self.node.nodeId,
+                                              targetParam.node.nodeId):
             logger.log(typ="ERROR",
                        msg="Connection cannot be made as node {} is in up"
-                           " stream dependencies of node {}".format(
-                           targetParam.node.label, self.node.label))
+                           " stream dependencies of node {}",
+                       args=(targetParam.node.label, self.node.label))
             return
 
-        if not self.outConnections:
-            logger.log(
-                msg="Connecting parameter {} from node {} to parameter {}"
-                    " of node {}".format(self.paramName, self.node.label,
-                                         targetParam.paramName,
-                                         targetParam.node.label))
-            return self.connect(targetParam)
-
-        for connec in self.outConnections:
-            if connec.targetParam.paramName == targetParam.paramName\
-                    and connec.targetParam.node in self.node.downStreamDependencies\
-                    and connec.targetParam.node.label == targetParam.node.label:
-
+        targets = self.graph.edgeTargets
+        for edgeId in self.graph.portOutEdges[self.portId] or ():
+            if targets[edgeId] == targetParam.portId:
                 logger.log(
                     typ="ERROR",
-                    msg="Connection inbetween {}.{} to {}.{} already exists"
-                        .format(self.node.label, self.paramName,
-                                targetParam.node.label,
-                                targetParam.paramName))
+                    msg="Connection inbetween {}.{} to {}.{} already exists",
+                    args=(self.node.label, self.paramName,
+                          targetParam.node.label, targetParam.paramName))
                 return
         logger.log(msg="Connecting parameter {} from node {} to parameter {}"
-                       " of node {}".format(self.paramName, self.node.label,
-                                            targetParam.paramName,
-                                            targetParam.node.label))
+                       " of node {}",
+                   args=(self.paramName, self.node.label,
+                         targetParam.paramName, targetParam.node.label))
         return self.connect(targetParam)
 
+    @tracing.traced("edit")
+    @undo.undoable("Add connection")
     def connect(self, targetParam):
         """This method connects parameter with given target parameter.
         Args:
@@ -178,36 +249,25 @@ class Parameter(QtWidgets.QGraphicsItem):
             (connection.Connection): Returns connection object.
         """
         # removing connection if has one already
-        if targetParam.inConnections:
-            for connect_ in targetParam.inConnections:
-                connect_.remove()
+        for edgeId in list(self.graph.portInEdges[targetParam.portId] or ()):
+            self.graph.removeEdge(edgeId)
         # adding new connection
+        edgeId = self.graph.addEdge(self.portId, targetParam.portId)
         con = connection.Connection(sourceParam=self,
-                                    targetParam=targetParam)
-        self.outConnections.append(con)
-        self.node.outConnections.append(con)
-        targetParam.inConnections.append(con)
-        targetParam.node.inConnections.append(con)
-        self.node.downStreamDependencies.append(targetParam.node)
-        targetParam.node.upStreamDependencies.append(self.node)
+                                    targetParam=targetParam, edgeId=edgeId)
         self.scene.addItem(con)
         con.setZValue(-1)
-        logger.log(msg=con)
         return con
 
+    @tracing.traced("edit")
+    @undo.undoable("Remove parameter")
     def remove(self):
         """This method removes self from its node.
         Returns:
             (None): Returns None.
         """
-        # removing all connections of this parameter.
-        if self.outConnections:
-            for connect in self.outConnections:
-                connect.remove()
-
-        logger.log(msg="Removing parameter {} from node {}".format(
-            self.paramName, self.node.label))
-        # removing parameter itself.
-        self.node.scene.removeItem(self)
+        # removing the port removes all connections of this parameter, the
+        # scene drops this item as it observes the graph.
+        self.graph.removePort(self.portId)
 
 
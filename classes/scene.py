@@ -1,12 +1,27 @@
 """Creating a graph SC class"""
 from PyQt5 import QtGui, QtCore, QtWidgets
+import contextlib
 import math
 
 import variables
+import graph
+import evaluator
+import scheduler
+import topology
+import traversal
 import node
+import connection
+import geometry
+import serialization
+import store
+import virtualizer
+import thumbnails
+import undo
 import logger
+import tracing
 
 
+@tracing.instrument
 class GraphScene(QtWidgets.QGraphicsScene):
     """Creating GraphSC class by inheriting QGraphicsScene"""
     def __init__(self, parent=None, view=None):
@@ -22,18 +37,37 @@ class GraphScene(QtWidgets.QGraphicsScene):
         # color settings
         self.backGroundColor = QtGui.QColor(variables.SC_BG_COLOR)
         self.setBackgroundBrush(self.backGroundColor)
-        self.gridLightPen = QtGui.QPen(
-            QtGui.QColor(variables.SC_GRID_LIGHT_COLOR))
-        self.gridLightPen.setWidth(variables.SC_GRID_LIGHT_LINE_WIDTH)
-        self.gridDarkPen = QtGui.QPen(
-            QtGui.QColor(variables.SC_GRID_DARK_COLOR))
-        self.gridDarkPen.setWidth(variables.SC_GRID_DARK_LINE_WIDTH)
 
         # setting SC height and width
         self.SceneWidth, self.SceneHeight = 32000, 32000
         self.setSceneRect(-self.SceneWidth/2, -self.SceneHeight/2,
                           self.SceneWidth, self.SceneHeight)
-        self.nodes = []
+        # graph model and the items observing it, keyed by graph ids.
+        self.graph = graph.Graph()
+        self.graph.addListener(self.graphChanged)
+        self.evaluator = evaluator.Evaluator(self.graph)
+        self.topology = topology.TopologicalOrder(self.graph)
+        self.traversal = traversal.Traversal(self.graph, self.topology)
+        # batch edit state, see batch().
+        self.batchDepth = 0
+        self.batchState = None
+        self.pendingCompute = set()
+        self.pendingComputeAll = False
+        self.pendingRelease = []  # connection items released at batch end.
+        # items removed by the last batch which removed any, by graph id, so
+        # undoing the removal puts them back instead of building new ones.
+        self.parkedNodes = {}
+        self.parkedConnections = {}
+        self.parking = False  # True once the running batch parked an item.
+        self.setComputePool(poolType=variables.COMPUTE_POOL_TYPE,
+                            maxWorkers=variables.COMPUTE_POOL_WORKERS)
+        self.nodeItems = {}
+        self.parameterItems = {}
+        self.connectionItems = {}
+        self.store = None  # store.GraphStore nodes are materialized from.
+        self.virtualizer = None  # virtualizer.Virtualizer, see setVirtualized.
+        self.thumbnails = thumbnails.ThumbnailService(self)
+        self.thumbnails.ready.connect(self.thumbnailReady)
 
         for num in range(3):
 
@@ -42,6 +76,176 @@ class GraphScene(QtWidgets.QGraphicsScene):
             node_1.addParameter(paramName="alpha", paramValue=0)
             node_1.addParameter(paramName="test", paramValue=0)
             node_1.addParameter(paramName="blah", paramValue=0)
+        # edits from here on can be undone, see undo.UndoStack.
+        self.undoStack = undo.UndoStack(
+            self.graph, maxMemory=variables.UNDO_MAX_MEMORY)
+
+    @property
+    def nodes(self):
+        """List of node items in this scene in creation order."""
+        return list(self.nodeItems.values())
+
+    def graphChanged(self, event, ident):
+        """This method drops items whose graph node, port or edge got removed.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        if event == "edgeRemoved":
+            item = self.connectionItems.pop(ident, None)
+            if item and self.batchDepth:
+                self.pendingRelease.append(item)
+            elif item:
+                item.release()
+        elif event == "portRemoved":
+            item = self.parameterItems.pop(ident, None)
+            if item:
+                logger.log(msg="Removing parameter {} from node {}",
+                           args=(item.paramName, item.node.label))
+                item.node.parameterRemoved(item)
+                self.removeItem(item)
+        elif event == "nodeRemoved":
+            item = self.nodeItems.pop(ident, None)
+            if item:
+                logger.log(msg="Removing node {}", args=(item.label,))
+                # ports of the node are gone too, its parameters go along.
+                for parameter_ in item.parameterTable.values():
+                    self.parameterItems.pop(parameter_.portId, None)
+                if self.batchDepth:
+                    self.park(item)
+                self.removeItem(item)
+
+    def park(self, item):
+        """This method keeps a node or connection item removed during a
+            batch, so undo or redo puts it back in one pass instead of
+            building a new item. Only items of the last batch which removed
+            anything are kept. Virtualized scenes park nothing, their pools
+            recycle items already.
+        Args:
+            item (QtWidgets.QGraphicsItem): node.Node or
+                connection.Connection whose graph entry got removed.
+        Returns:
+            (None): Returns None.
+        """
+        if self.virtualizer:
+            return
+        if not self.parking:
+            self.parkedNodes, self.parkedConnections = {}, {}
+            self.parking = True
+        item.setSelected(False)
+        if isinstance(item, node.Node):
+            if item.note and item.note.scene() is not self:
+                # removed before its node, updateNote adds it back.
+                item.note = None
+            self.parkedNodes[item.nodeId] = item
+        else:
+            self.parkedConnections[item.edgeId] = item
+
+    @tracing.traced("edit")
+    def undoEdit(self):
+        """This method reverts the last edit of the graph, see
+            undo.UndoStack.
+        Returns:
+            (undo.Command): Returns the reverted command, None if there is
+                nothing to undo.
+        """
+        with self.batch():
+            command = self.undoStack.undo()
+            if command:
+                logger.log(msg="Undo {}", args=(command.name,))
+                self.syncItems(command)
+        return command
+
+    @tracing.traced("edit")
+    def redoEdit(self):
+        """This method applies the last undone edit of the graph again.
+        Returns:
+            (undo.Command): Returns the applied command, None if there is
+                nothing to redo.
+        """
+        with self.batch():
+            command = self.undoStack.redo()
+            if command:
+                logger.log(msg="Redo {}", args=(command.name,))
+                self.syncItems(command)
+        return command
+
+    def syncItems(self, command):
+        """This method brings items in line with the graph after undo or
+            redo applied a command. Items of removed entries are dropped as
+            the scene observes the graph, restored entries get items here.
+        Args:
+            command (undo.Command): Applied command.
+        Returns:
+            (None): Returns None.
+        """
+        graph_ = self.graph
+        with self.undoStack.suspended():
+            self.materialize(sorted(
+                nodeId for nodeId in command.changed("nodeAdded",
+                                                     "nodeRemoved")
+                if graph_.hasNode(nodeId)))
+            for portId in sorted(command.changed("portAdded", "portRemoved")):
+                item = self.nodeItems.get(graph_.portNodes[portId])
+                if item and graph_.hasPort(portId) and \
+                        portId not in self.parameterItems:
+                    item.parameterAdded(portId)
+            self.materializeEdges(sorted(command.changed("edgeAdded",
+                                                         "edgeRemoved")))
+            for nodeId in command.changed("positionChanged"):
+                item = self.nodeItems.get(nodeId)
+                if item:
+                    item.setPos(graph_.nodeXs[nodeId], graph_.nodeYs[nodeId])
+            for nodeId in command.changed("noteChanged"):
+                item = self.nodeItems.get(nodeId)
+                if item:
+                    item.updateNote()
+
+    @tracing.traced("edit")
+    @undo.undoable("Remove items")
+    def removeItems(self, items):
+        """This method removes many nodes and connections in one pass. The
+            edges of all removed nodes are collected once and torn down
+            before the nodes, so the work is proportional to the number of
+            removed nodes, ports and edges. Other items are ignored.
+        Args:
+            items (list): node.Node and connection.Connection objects, e.g.
+                selectedItems().
+        Returns:
+            (None): Returns None.
+        """
+        nodeIds, edgeIds = [], []
+        for item in items:
+            if isinstance(item, node.Node):
+                if item.note:
+                    item.note.remove()
+                nodeIds.append(item.nodeId)
+            elif isinstance(item, connection.Connection):
+                edgeIds.append(item.edgeId)
+        if not nodeIds and not edgeIds:
+            return
+        logger.log(msg="Removing {} nodes and {} connections",
+                   args=(len(nodeIds), len(edgeIds)))
+        # Qt removes items its index has not taken in yet from a plain list,
+        # one search per item, any query makes it index them first.
+        self.items(QtCore.QRectF(0, 0, 1, 1))
+        with self.batch():
+            self.graph.removeEdges(edgeIds)
+            self.graph.removeNodes(nodeIds)
+
+    def thumbnailReady(self, path):
+        """This method repaints nodes showing a thumbnail which got decoded
+            or changed on disk.
+        Args:
+            path (str): Image path.
+        Returns:
+            (None): Returns None.
+        """
+        for item in self.nodeItems.values():
+            if item.thumbnail == path:
+                item.update()
 
     def drawBackgroundImage(self):
         """This method draws image to background of scene.
@@ -53,8 +257,11 @@ class GraphScene(QtWidgets.QGraphicsScene):
             item = self.backGroundImage = QtWidgets.QGraphicsPixmapItem(self.backGroundImage)
             self.addItem(item)
 
+    @tracing.traced("paint")
     def drawBackground(self, painter, rect):
-        """This method draws background on QGraphicsScene
+        """This method draws background on QGraphicsScene. The grid is
+            filled with a pre-rendered tile of one major square, built once
+            per zoom bucket and grid settings, see geometry.gridBrush.
         Args:
             painter (QtGui.QPainter): QtGui painter object to paint rectangle.
             rect (QtCore.QRect): QtCore QRect object to draw rectangle.
@@ -65,37 +272,70 @@ class GraphScene(QtWidgets.QGraphicsScene):
         super().drawBackground(painter, rect)  # overriding the default class.
         if not self.drawGrid:
             return
-        # creating a grid
+        transform = painter.worldTransform()
+        scale = math.hypot(transform.m11(), transform.m12()) or 1.0
+        squares = variables.SC_GRID_SQUARE_SIZE
+        spacing = geometry.gridSpacing(variables.SC_GRID_SIZE, squares, scale,
+                                       variables.SC_GRID_MIN_SPACING)
+        period = spacing * squares
+        # tiles are rendered for powers of two of the zoom and scaled by
+        # less than 1.5 when drawn.
+        bucket = 2.0 ** round(math.log(scale, 2))
+        tileSize = max(int(round(period * bucket)), squares)
+        if tileSize > variables.SC_GRID_TILE_SIZE:
+            # zoomed in far enough for only a few lines to be visible.
+            self.drawGridLines(painter, rect, spacing, squares)
+            return
+        painter.fillRect(rect, geometry.gridBrush(
+            period, tileSize, squares, variables.SC_GRID_LIGHT_COLOR,
+            variables.SC_GRID_DARK_COLOR, variables.SC_GRID_LIGHT_LINE_WIDTH,
+            variables.SC_GRID_DARK_LINE_WIDTH))
+
+    def drawGridLines(self, painter, rect, spacing, squares):
+        """This method draws grid lines of a rectangle one by one.
+        Args:
+            painter (QtGui.QPainter): QtGui painter object to paint rectangle.
+            rect (QtCore.QRectF): Rectangle to draw the grid in.
+            spacing (int): Distance in between the minor lines.
+            squares (int): Minor squares in a major square.
+        Returns:
+            (None): Returns None.
+        """
         # we need to convert values to int because rect.(..) returns floats.
         left = int(math.floor(rect.left()))
         right = int(math.ceil(rect.right()))
         top = int(math.floor(rect.top()))
         bottom = int(math.ceil(rect.bottom()))
-        first_left = left - (left % variables.SC_GRID_SIZE)
-        first_top = top - (top % variables.SC_GRID_SIZE)
+        first_left = left - (left % spacing)
+        first_top = top - (top % spacing)
 
         # getting lines to be drawn on grid
         light_grid_lines, dark_grid_lines = [], []
 
         # drawing vertical lines
-        for x in range(first_left, right, variables.SC_GRID_SIZE):
-            if x % (variables.SC_GRID_SIZE * variables.SC_GRID_SQUARE_SIZE) != 0:
+        for x in range(first_left, right, spacing):
+            if x % (spacing * squares) != 0:
                 light_grid_lines.append(QtCore.QLineF(x, top, x, bottom))
             else:
                 dark_grid_lines.append(QtCore.QLineF(x, top, x, bottom))
         # drawing horizontal lines
-        for y in range(first_top, bottom, variables.SC_GRID_SIZE):
-            if y % (variables.SC_GRID_SIZE * variables.SC_GRID_SQUARE_SIZE) != 0:
+        for y in range(first_top, bottom, spacing):
+            if y % (spacing * squares) != 0:
                 light_grid_lines.append(QtCore.QLineF(left, y, right, y))
             else:
                 dark_grid_lines.append(QtCore.QLineF(left, y, right, y))
 
         # drawing the grid
-        painter.setPen(self.gridLightPen)
+        lightPen, darkPen = geometry.gridPens(
+            variables.SC_GRID_LIGHT_COLOR, variables.SC_GRID_DARK_COLOR,
+            variables.SC_GRID_LIGHT_LINE_WIDTH,
+            variables.SC_GRID_DARK_LINE_WIDTH)
+        painter.setPen(lightPen)
         painter.drawLines(light_grid_lines)
-        painter.setPen(self.gridDarkPen)
+        painter.setPen(darkPen)
         painter.drawLines(dark_grid_lines)
 
+    @undo.undoable("Add node")
     def addNode(self, label=None, nodeType=None, thumbnail=None):
         """This method adds node to the scene
         Args:
@@ -107,15 +347,356 @@ class GraphScene(QtWidgets.QGraphicsScene):
         """
         if not label or not nodeType:
             return
-        for node_ in self.nodes:
-            if node_.label == label:
-                label = "{}_{}".format(label, len(self.nodes))
-        logger.log(msg="Creating node with label {}".format(label))
+        label = self.graph.uniqueLabel(label)
+        logger.log(msg="Creating node with label {}", args=(label,))
         new_node = node.Node(self, label=label, nodeType=nodeType, thumbnail=thumbnail)
         self.addItem(new_node)
-        self.nodes.append(new_node)
+        self.tuneIndex()
         return new_node
 
+    @staticmethod
+    def toList(values):
+        """This method converts a list or NumPy array to a python list.
+        Args:
+            values (list/numpy.ndarray): Values to convert.
+        Returns:
+            (list): Returns list of python values.
+        """
+        if hasattr(values, "tolist"):
+            return values.tolist()
+        return list(values)
+
+    @staticmethod
+    def toRecords(records):
+        """This method converts node records to a list of dicts.
+        Args:
+            records (list/numpy.ndarray): List of dicts or a NumPy structured
+                array.
+        Returns:
+            (list): Returns list of dicts.
+        """
+        names = getattr(getattr(records, "dtype", None), "names", None)
+        if names:
+            return [dict(zip(names, row)) for row in records.tolist()]
+        return list(records)
+
+    @tracing.traced("edit")
+    @undo.undoable("Add nodes")
+    def addNodes(self, records):
+        """This method adds many nodes in one pass. The whole batch gets
+            validated first, nothing is created if any record is invalid.
+        Args:
+            records (list): dicts, or a NumPy structured array, with keys
+                "label" and "nodeType" and optional "thumbnail", "pos" (x, y)
+                and "parameters" ({paramName: value} or [(paramName, value)]).
+        Returns:
+            (list): Returns list of the new node.Node objects.
+        """
+        records = self.toRecords(records)
+        parameters = []
+        for index, record in enumerate(records):
+            if not record.get("label") or not record.get("nodeType"):
+                logger.log(typ="ERROR",
+                           msg="Node record {} needs a label and a nodeType",
+                           args=(index,))
+                return []
+            params = record.get("parameters") or ()
+            if isinstance(params, dict):
+                params = params.items()
+            params = list(params)
+            names = [name for name, value in params]
+            if "out" in names or len(set(names)) != len(names):
+                logger.log(typ="ERROR",
+                           msg="Node record {} has duplicate parameters",
+                           args=(index,))
+                return []
+            parameters.append(params)
+
+        logger.log(msg="Creating {} nodes", args=(len(records),))
+        graph_ = self.graph
+        nodeIds = []
+        with self.batch():
+            for record, params in zip(records, parameters):
+                nodeId = graph_.addNode(label=record["label"],
+                                        nodeType=record["nodeType"])
+                graph_.addPort(nodeId, paramName="out", kind=graph.OUTPUT,
+                               paramIndex=1)
+                for paramIndex, (name, value) in enumerate(params, 1):
+                    graph_.addPort(nodeId, paramName=name, paramValue=value,
+                                   kind=graph.INPUT, paramIndex=paramIndex)
+                if record.get("pos") is not None:
+                    graph_.setPosition(nodeId, *record["pos"])
+                graph_.nodeThumbnails[nodeId] = record.get("thumbnail")
+                nodeIds.append(nodeId)
+            return self.materialize(nodeIds)
+
+    def materialize(self, nodeIds):
+        """This method creates items for graph nodes which have none yet,
+            plus connection items in between materialized parameters. Items
+            parked when their node was removed are put back instead.
+        Args:
+            nodeIds (list): Ids of nodes in the graph model.
+        Returns:
+            (list): Returns list of the new node.Node objects.
+        """
+        if self.virtualizer:
+            # only nodes in view get items, see setVirtualized.
+            self.virtualizer.update()
+            return [self.nodeItems[x] for x in nodeIds if x in self.nodeItems]
+        graph_ = self.graph
+        nodes = []
+        with self.batch():
+            for nodeId in nodeIds:
+                if nodeId in self.nodeItems:
+                    continue
+                new_node = self.parkedNodes.pop(nodeId, None)
+                if new_node is None:
+                    new_node = node.Node(self, nodeId=nodeId)
+                    self.addItem(new_node)
+                else:
+                    self.addItem(new_node)
+                    self.nodeItems[nodeId] = new_node
+                    for parameter_ in new_node.parameterTable.values():
+                        self.parameterItems[parameter_.portId] = parameter_
+                    new_node.updateNote()
+                nodes.append(new_node)
+            edgeIds = []
+            for new_node in nodes:
+                edgeIds.extend(graph_.inEdges(new_node.nodeId))
+                edgeIds.extend(graph_.outEdges(new_node.nodeId))
+            self.materializeEdges(edgeIds)
+        return nodes
+
+    def materializeEdges(self, edgeIds):
+        """This method creates connection items for alive graph edges which
+            have none yet and whose parameters both have items, parked items
+            of the edges are put back instead.
+        Args:
+            edgeIds (list): Ids of edges in the graph model.
+        Returns:
+            (list): Returns list of the new connection.Connection objects.
+        """
+        graph_ = self.graph
+        items = self.parameterItems
+        connections = []
+        for edgeId in edgeIds:
+            sourcePort = graph_.edgeSources[edgeId]
+            targetPort = graph_.edgeTargets[edgeId]
+            if edgeId in self.connectionItems or not graph_.hasEdge(edgeId) \
+                    or sourcePort not in items or targetPort not in items:
+                continue
+            con = self.parkedConnections.pop(edgeId, None)
+            if con is None:
+                con = connection.Connection(sourceParam=items[sourcePort],
+                                            targetParam=items[targetPort],
+                                            edgeId=edgeId)
+            else:
+                con.bind(items[sourcePort], items[targetPort], edgeId)
+            self.addItem(con)
+            con.setZValue(-1)
+            connections.append(con)
+        return connections
+
+    def save(self, path, binary=None):
+        """This method saves the graph of this scene to a file.
+        Args:
+            path (str): File path, ".neg" files use the binary format and
+                anything else line delimited JSON.
+            binary (bool): Overrides the format picked from the extension.
+        Returns:
+            (None): Returns None.
+        """
+        logger.log(msg="Saving {} nodes to {}", args=(len(self.graph), path))
+        nodes = sorted(self.graph.nodes(), key=self.topology.sortKey)
+        serialization.save(self.graph, path, binary=binary, nodes=nodes)
+
+    @undo.undoable("Load graph")
+    def load(self, path):
+        """This method loads a graph file into this scene.
+        Args:
+            path (str): File path, format is detected from the file.
+        Returns:
+            (list): Returns list of the new node.Node objects, empty on
+                error.
+        """
+        logger.log(msg="Loading graph from {}", args=(path,))
+        mark = len(self.undoStack.current or ())
+        with self.batch():
+            try:
+                _, nodeIds = serialization.load(path, self.graph)
+            except (OSError, ValueError) as error:
+                # drops nodes and edges read before the error.
+                self.undoStack.revert(mark)
+                logger.log(typ="ERROR", msg="Cannot load graph {}: {}",
+                           args=(path, error))
+                return []
+            return self.materialize(list(nodeIds.values()))
+
+    def saveStore(self, path):
+        """This method writes the graph of this scene to a memory mapped
+            store file, see openStore.
+        Args:
+            path (str): File path.
+        Returns:
+            (None): Returns None.
+        """
+        logger.log(msg="Writing store of {} nodes to {}",
+                   args=(len(self.graph), path))
+        store.write(self.graph, path)
+
+    def openStore(self, path):
+        """This method opens a store file to materialize nodes from. Nothing
+            is loaded until materializeRegion or materializeUpStream asks for
+            it, the rest of the graph stays on disk.
+        Args:
+            path (str): File path of a store written with saveStore.
+        Returns:
+            (store.GraphStore): Returns the opened store or None on error.
+        """
+        if self.store:
+            self.store.close()
+            self.store = None
+        try:
+            self.store = store.GraphStore(path)
+        except (OSError, ValueError) as error:
+            logger.log(typ="ERROR", msg="Cannot open store {}: {}",
+                       args=(path, error))
+            return None
+        logger.log(msg="Opened store {} of {} nodes",
+                   args=(path, len(self.store)))
+        return self.store
+
+    def materializeRegion(self, rect):
+        """This method loads nodes of the open store positioned inside a
+            region, along with their connections to loaded nodes.
+        Args:
+            rect (QtCore.QRectF): Region in scene coordinates.
+        Returns:
+            (list): Returns list of the new node.Node objects.
+        """
+        if not self.store:
+            logger.log(typ="ERROR", msg="No store is open")
+            return []
+        rows = self.store.region(rect.left(), rect.top(), rect.right(),
+                                 rect.bottom())
+        # loading from the store is not an edit.
+        with self.batch(), self.undoStack.suspended():
+            return self.materialize(self.store.materialize(rows, self.graph))
+
+    def materializeUpStream(self, node_, depth=None):
+        """This method loads up stream dependencies of a node from the open
+            store, along with their connections to loaded nodes.
+        Args:
+            node_ (node.Node): Node loaded from the store.
+            depth (int): Number of levels to load, all levels if None.
+        Returns:
+            (list): Returns list of the new node.Node objects.
+        """
+        row = self.store.rowOf(node_.nodeId) if self.store else None
+        if row is None:
+            logger.log(typ="ERROR", msg="Node {} is not from the open store",
+                       args=(node_.label,))
+            return []
+        rows = self.store.upStream(row, depth=depth)
+        with self.batch(), self.undoStack.suspended():
+            return self.materialize(self.store.materialize(rows, self.graph))
+
+    @tracing.traced("edit")
+    @undo.undoable("Add connections")
+    def addConnections(self, sourcePorts, targetPorts):
+        """This method connects many parameters in one pass. The whole batch
+            gets validated first, including one cycle check over the graph,
+            and nothing is connected if any pair is invalid. Like
+            Parameter.connect, existing connections into the targets get
+            replaced, pairs which are connected already are skipped.
+        Args:
+            sourcePorts (list/numpy.ndarray): Graph port ids of the outputs,
+                e.g. node.getParameter("out").portId.
+            targetPorts (list/numpy.ndarray): Graph port ids of the inputs.
+        Returns:
+            (list): Returns list of the new connection.Connection objects.
+        """
+        graph_ = self.graph
+        sources, targets = self.toList(sourcePorts), self.toList(targetPorts)
+        error = None
+        if len(sources) != len(targets):
+            error = "Got {} source and {} target parameters".format(
+                len(sources), len(targets))
+        elif len(set(targets)) != len(targets):
+            error = "A target parameter can only take one connection"
+        for sourcePort, targetPort in zip(sources, targets):
+            if error:
+                break
+            if not graph_.hasPort(sourcePort) or \
+                    not graph_.hasPort(targetPort):
+                error = "No parameter with id {} or {}".format(sourcePort,
+                                                              targetPort)
+            elif graph_.portKinds[sourcePort] != graph.OUTPUT or \
+                    graph_.portKinds[targetPort] != graph.INPUT:
+                error = "Connection has to go from an output to an input" \
+                        " ({} --> {})".format(sourcePort, targetPort)
+            elif graph_.portNodes[sourcePort] == graph_.portNodes[targetPort]:
+                error = "Connection cannot be created with self parameters"
+        if error:
+            logger.log(typ="ERROR", msg=error)
+            return []
+
+        pairs, replaced = [], []
+        for sourcePort, targetPort in zip(sources, targets):
+            inEdges = graph_.portInEdges[targetPort] or ()
+            if any(graph_.edgeSources[edgeId] == sourcePort
+                   for edgeId in inEdges):
+                continue
+            replaced.extend(inEdges)
+            pairs.append((sourcePort, targetPort))
+        portNodes = graph_.portNodes
+        order = self.topology.sortWith(
+            [(portNodes[x], portNodes[y]) for x, y in pairs], replaced)
+        if len(order) != len(graph_):
+            logger.log(typ="ERROR",
+                       msg="Connections cannot be made as they create a cycle")
+            return []
+
+        logger.log(msg="Creating {} connections", args=(len(pairs),))
+        connections = []
+        with self.batch():
+            for edgeId in replaced:
+                graph_.removeEdge(edgeId)
+            # new connections all follow this order, so keeping the
+            # topological order up to date is O(1) per connection.
+            self.topology.applyOrder(order)
+            items = self.parameterItems
+            for sourcePort, targetPort in pairs:
+                edgeId = graph_.addEdge(sourcePort, targetPort)
+                if sourcePort in items and targetPort in items:
+                    con = connection.Connection(sourceParam=items[sourcePort],
+                                                targetParam=items[targetPort],
+                                                edgeId=edgeId)
+                    self.addItem(con)
+                    con.setZValue(-1)
+                    connections.append(con)
+        return connections
+
+    def findNode(self, label):
+        """This method finds node by its label.
+        Args:
+            label (str): Label of the node.
+        Returns:
+            (node.Node): Returns the node or None if not found.
+        """
+        return self.nodeItems.get(self.graph.findNode(label))
+
+    def nodesOfType(self, nodeType):
+        """This method gets all nodes of a node type.
+        Args:
+            nodeType (str): Type of the nodes.
+        Returns:
+            (list): Returns list of node.Node objects in creation order.
+        """
+        items = self.nodeItems
+        return [items[nodeId] for nodeId in self.graph.nodesOfType(nodeType)
+                if nodeId in items]
+
     def removeNode(self, node):
         """This method removes node from the scene.
         Args:
@@ -124,11 +705,221 @@ class GraphScene(QtWidgets.QGraphicsScene):
         Returns:
             (None)
         """
-        logger.log(msg="Removing node {}".format(node.label))
-        self.nodes.remove(node)
-        self.removeItem(node)
+        node.remove()
+
+    def setVirtualized(self, enabled=True, rect=None):
+        """This method switches viewport virtualization. Virtualized scenes
+            only hold items for nodes in view and their neighbours, items of
+            other nodes are recycled as the view moves. Graph ids stay valid
+            for all nodes, node items only while they are in view.
+        Args:
+            enabled (bool): Virtualize if True, else create items for all
+                nodes.
+            rect (QtCore.QRectF): Visible region in scene coordinates.
+        Returns:
+            (None): Returns None.
+        """
+        if enabled:
+            self.parkedNodes, self.parkedConnections = {}, {}
+            if not self.virtualizer:
+                self.virtualizer = virtualizer.Virtualizer(self)
+            self.virtualizer.update(rect)
+        elif self.virtualizer:
+            self.virtualizer.close()
+            self.virtualizer = None
+            self.materialize(list(self.graph.nodes()))
+
+    def updateVisible(self, rect):
+        """This method binds items to the nodes in a region of a virtualized
+            scene.
+        Args:
+            rect (QtCore.QRectF): Visible region in scene coordinates.
+        Returns:
+            (None): Returns None.
+        """
+        if self.virtualizer:
+            self.virtualizer.update(rect)
+
+    def setNodeCacheMode(self, mode):
+        """This method sets how node items cache their painting. With
+            QGraphicsItem.DeviceCoordinateCache unchanged nodes are repainted
+            from a pixmap, which is redrawn on selection, label, thumbnail
+            or zoom changes. ItemCoordinateCache also keeps the pixmap while
+            zooming, painting it scaled at the detail it was drawn with.
+        Args:
+            mode (QtWidgets.QGraphicsItem.CacheMode): Cache mode of the nodes.
+        Returns:
+            (None): Returns None.
+        """
+        variables.NODE_CACHE_MODE = mode
+        items = list(self.nodeItems.values())
+        if self.virtualizer:
+            items.extend(self.virtualizer.nodePool)
+        for item in items:
+            item.setCacheMode(mode)
+
+    def setIndexTuning(self, enabled=True, minItems=None, depth=None):
+        """This method sets how the item index follows the number of items,
+            see tuneIndex.
+        Args:
+            enabled (bool): Pick index method by item count if True, keep
+                the current one if False.
+            minItems (int): Item count from which a BSP tree is used.
+            depth (int): BSP tree depth, 0 lets Qt pick it.
+        Returns:
+            (None): Returns None.
+        """
+        variables.SC_AUTO_INDEX = enabled
+        if minItems is not None:
+            variables.SC_INDEX_MIN_ITEMS = minItems
+        if depth is not None:
+            variables.SC_BSP_TREE_DEPTH = depth
+        self.tuneIndex()
+
+    def tuneIndex(self):
+        """This method picks item index method for the number of items.
+            Small scenes are scanned linearly, which beats keeping a BSP tree
+            up to date, bigger ones use a BSP tree of SC_BSP_TREE_DEPTH.
+            Inside batch() the choice gets applied when the batch ends.
+        Returns:
+            (None): Returns None.
+        """
+        if not variables.SC_AUTO_INDEX or self.batchDepth:
+            return
+        if self.itemCount() < variables.SC_INDEX_MIN_ITEMS:
+            method = QtWidgets.QGraphicsScene.NoIndex
+        else:
+            method = QtWidgets.QGraphicsScene.BspTreeIndex
+            if self.bspTreeDepth() != variables.SC_BSP_TREE_DEPTH:
+                self.setBspTreeDepth(variables.SC_BSP_TREE_DEPTH)
+        if self.itemIndexMethod() != method:
+            self.indexWith(method)
+
+    def itemCount(self):
+        """This method estimates number of items in the scene without
+            listing them.
+        Returns:
+            (int): Returns the estimated count.
+        """
+        # node, its label and parameters with their labels, connection and
+        # its arrow head.
+        return len(self.nodeItems) * 2 + len(self.parameterItems) * 2 + \
+            len(self.connectionItems) * 2
+
+    def indexWith(self, method):
+        """This method switches item index method of the scene.
+            A BSP tree created by setItemIndexMethod does not get the scene
+            rect until it changes and answers every query by a linear scan,
+            so the scene rect gets set again after the switch.
+        Args:
+            method (QtWidgets.QGraphicsScene.ItemIndexMethod): Index method.
+        Returns:
+            (None): Returns None.
+        """
+        if self.itemIndexMethod() == method:
+            return
+        self.setItemIndexMethod(method)
+        if method == QtWidgets.QGraphicsScene.BspTreeIndex:
+            rect = self.sceneRect()
+            self.setSceneRect(rect.adjusted(0, 0, 1, 1))
+            self.setSceneRect(rect)
+
+    def setComputePool(self, poolType=None, maxWorkers=None):
+        """This method sets pool used to compute independent nodes in
+            parallel.
+        Args:
+            poolType (str): "thread", "process" or None to compute serially.
+            maxWorkers (int): Number of workers, cpu count if None.
+        Returns:
+            (None): Returns None.
+        """
+        if self.evaluator.scheduler:
+            self.evaluator.scheduler.shutdown()
+            self.evaluator.scheduler = None
+        if poolType:
+            self.evaluator.scheduler = scheduler.Scheduler(
+                poolType=poolType, maxWorkers=maxWorkers)
+
+    def shutdown(self):
+        """This method stops the thumbnail and compute threads of this scene,
+            call it before the scene goes away.
+        Returns:
+            (None): Returns None.
+        """
+        self.thumbnails.shutdown()
+        self.setComputePool(None)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """This method suspends repaint, info logging and compute while the
+            scene gets edited, then repaints and computes once at the end.
+            The item index is kept, a BSP tree takes new items in lazily and
+            removes items in O(1), where switching to NoIndex would make
+            every removal a linear search. Batches can be nested.
+            usage:
+                with scene.batch():
+                    ...
+        Returns:
+            (contextlib.GeneratorContextManager): Yields this scene.
+        """
+        self.batchDepth += 1
+        if self.batchDepth == 1:
+            self.beginBatch()
+        try:
+            yield self
+        finally:
+            self.batchDepth -= 1
+            if not self.batchDepth:
+                self.endBatch()
+
+    def beginBatch(self):
+        """This method suspends repaint, logging and compute.
+        Returns:
+            (None): Returns None.
+        """
+        updateMode = None
+        if self.view:
+            updateMode = self.view.viewportUpdateMode()
+            self.view.setViewportUpdateMode(
+                QtWidgets.QGraphicsView.NoViewportUpdate)
+        self.batchState = updateMode
+        logger.suspend()
+
+    def endBatch(self):
+        """This method restores what beginBatch suspended, repaints once and
+            runs the compute requested during the batch.
+        Returns:
+            (None): Returns None.
+        """
+        updateMode = self.batchState
+        self.batchState = None
+        # Qt finds a top-level item by a search through all of them, node
+        # items of a loaded scene come first, so connections get released
+        # once the removed nodes are gone.
+        for item in self.pendingRelease:
+            item.release()
+            self.park(item)
+        self.pendingRelease = []
+        self.parking = False
+        logger.resume()
+        self.tuneIndex()
+        if self.view:
+            self.view.setViewportUpdateMode(updateMode)
+            self.view.viewport().update()
+        if self.pendingComputeAll:
+            self.compute()
+        elif self.pendingCompute:
+            self.evaluator.evaluate(list(self.pendingCompute))
+        self.pendingComputeAll = False
+        self.pendingCompute = set()
 
     def compute(self):
-        if self.nodes:
-            for node in self.nodes:
-                node.compute()
+        """This method computes all dirty nodes of the scene. Inside batch()
+            compute is deferred until the batch ends.
+        Returns:
+            (list): Returns ids of the computed nodes in compute order.
+        """
+        if self.batchDepth:
+            self.pendingComputeAll = True
+            return []
+        return self.evaluator.evaluate()
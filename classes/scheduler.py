@@ -0,0 +1,117 @@
+"""Parallel scheduler evaluating independent graph branches on a pool.
+
+Nodes are released to a concurrent.futures thread or process pool as soon
+as all of their up stream nodes are done. Inputs are gathered and results
+are stored back on the graph model in the calling thread, so the graph
+itself is never touched from a worker.
+"""
+from concurrent import futures
+
+import evaluator
+
+
+POOL_TYPES = ("thread", "process")
+
+
+def runCompute(function, inputs):
+    """This function runs a compute function inside a pool worker.
+        Kept at module level so process pools can pickle it.
+    Args:
+        function (callable): Registered compute function of the node type.
+        inputs (dict): {paramName: value} of node inputs.
+    Returns:
+        (): Returns the computed value.
+    """
+    return function(inputs)
+
+
+class Scheduler(object):
+    """Creating Scheduler class running a DAG of nodes on an executor."""
+    def __init__(self, poolType="thread", maxWorkers=None):
+        """Initializing Scheduler class.
+        Args:
+            poolType (str): "thread" or "process". Process pools need compute
+                functions and values which can be pickled.
+            maxWorkers (int): Number of workers, concurrent.futures default if
+                None.
+        """
+        if poolType not in POOL_TYPES:
+            raise ValueError("Unknown pool type {}, expected one of {}".format(
+                poolType, POOL_TYPES))
+        self.poolType = poolType
+        self.maxWorkers = maxWorkers
+        if poolType == "process":
+            self.executor = futures.ProcessPoolExecutor(max_workers=maxWorkers)
+        else:
+            self.executor = futures.ThreadPoolExecutor(max_workers=maxWorkers)
+
+    def shutdown(self):
+        """This method shuts the pool down, waiting for running nodes.
+        Returns:
+            (None): Returns None.
+        """
+        self.executor.shutdown(wait=True)
+
+    def run(self, evaluator_, nodeIds):
+        """This method computes given nodes as their up stream gets done.
+        Args:
+            evaluator_ (evaluator.Evaluator): Evaluator owning dirty state.
+            nodeIds (set): Ids of the dirty nodes to compute.
+        Returns:
+            (list): Returns ids of the computed nodes in completion order.
+        """
+        graph_ = evaluator_.graph
+        upStream, downStream = graph_.upStream, graph_.downStream
+        inDegree = dict.fromkeys(nodeIds, 0)
+        for nodeId in nodeIds:
+            for upNode in upStream(nodeId):
+                if upNode in inDegree:
+                    inDegree[nodeId] += 1
+        ready = [nodeId for nodeId, count in inDegree.items() if not count]
+        running = {}
+        computed = []
+
+        def release(nodeId_):
+            for downNode in downStream(nodeId_):
+                if downNode in inDegree:
+                    inDegree[downNode] -= 1
+                    if not inDegree[downNode]:
+                        ready.append(downNode)
+
+        while ready or running:
+            while ready:
+                nodeId = ready.pop()
+                function = evaluator.COMPUTE_FUNCTIONS.get(
+                    graph_.nodeTypes[nodeId])
+                if not function:
+                    # nothing to run, node keeps its outputs.
+                    evaluator_.finishNode(nodeId, None, None, store=False)
+                    computed.append(nodeId)
+                    release(nodeId)
+                    continue
+                key, hit, value = evaluator_.lookup(nodeId)
+                if hit:
+                    evaluator_.finishNode(nodeId, key, value)
+                    computed.append(nodeId)
+                    release(nodeId)
+                    continue
+                future = self.executor.submit(
+                    runCompute, function, evaluator_.gatherInputs(nodeId))
+                running[future] = (nodeId, key)
+            if not running:
+                break
+            done, _ = futures.wait(running,
+                                   return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                nodeId, key = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as err:
+                    # down stream of a failed node never gets released and
+                    # stays dirty.
+                    evaluator_.computeFailed(nodeId, err)
+                    continue
+                evaluator_.finishNode(nodeId, key, value)
+                computed.append(nodeId)
+                release(nodeId)
+        return computed
@@ -0,0 +1,440 @@
+"""Streaming save and load of the graph model.
+
+Two formats are supported, both written record by record so no full
+document is ever built in memory:
+
+* line delimited JSON (".ndjson"), one record per line.
+* compact binary (".neg"), struct packed records framed by a tag and a
+  length. Parameter values are stored as JSON in both formats.
+
+Files start with a header record holding FORMAT_VERSION, followed by node
+records (with their parameters, position, thumbnail and note) and then
+edge records referring to nodes by their id in the file. Output values are
+not stored, they get computed again. Files are written next to their path
+and replace it once complete, so a failed save keeps the previous file.
+"""
+import contextlib
+import json
+import os
+import struct
+
+import graph
+
+
+"""Declaring global variables for serialization"""
+FORMAT_NAME = "NodeEditor"
+FORMAT_VERSION = 1
+BINARY_MAGIC = b"NEGB"
+BINARY_EXTENSIONS = (".neg",)
+READ_CHUNK_SIZE = 1024 * 1024  # Bytes read from disk at once.
+TEMP_SUFFIX = ".tmp"  # Suffix of files being written, see replacing.
+
+TAG_HEADER, TAG_NODE, TAG_EDGE = 0, 1, 2
+NONE_LENGTH = 0xFFFFFFFF  # Length used for a None string.
+FRAME = struct.Struct("<BI")  # tag, payload length.
+NODE_HEAD = struct.Struct("<qddI")  # id, x, y, port count.
+PORT_HEAD = struct.Struct("<BI")  # kind, index.
+EDGE_NODE = struct.Struct("<q")
+LENGTH = struct.Struct("<I")
+
+
+def iterRecords(graph_, nodes=None):
+    """This function yields records describing a graph.
+    Args:
+        graph_ (graph.Graph): Graph to describe.
+        nodes (iterable): Node ids in the order to write them, all nodes in
+            id order if None. Writing up stream nodes first keeps loading
+            the connections cheap.
+    Returns:
+        (generator): Generator of record dicts.
+    """
+    yield {"type": "header", "format": FORMAT_NAME, "version": FORMAT_VERSION}
+    for nodeId in graph_.nodes() if nodes is None else nodes:
+        yield nodeRecord(graph_, nodeId)
+    names, portNodes = graph_.portNames, graph_.portNodes
+    for edgeId in graph_.edges():
+        sourcePort = graph_.edgeSources[edgeId]
+        targetPort = graph_.edgeTargets[edgeId]
+        yield {"type": "edge",
+               "source": [portNodes[sourcePort], names[sourcePort]],
+               "target": [portNodes[targetPort], names[targetPort]]}
+
+
+# line delimited JSON
+def writeJson(records, stream):
+    """This function writes records as line delimited JSON.
+    Args:
+        records (iterable): Record dicts.
+        stream (io.TextIOBase): Text stream to write to.
+    Returns:
+        (None): Returns None.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for record in records:
+        try:
+            line = encoder.encode(record)
+        except (TypeError, ValueError) as error:
+            raise encodeError(record, error)
+        stream.write(line)
+        stream.write("\n")
+
+
+def readJson(stream):
+    """This function reads records from line delimited JSON.
+    Args:
+        stream (io.TextIOBase): Text stream to read from.
+    Returns:
+        (generator): Generator of record dicts.
+    """
+    decoder = json.JSONDecoder()
+    for line in stream:
+        if line.strip():
+            yield decoder.decode(line)
+
+
+def encodeError(record, error):
+    """This function describes a record which cannot be encoded.
+    Args:
+        record (dict): Record which failed.
+        error (Exception): Error raised by the encoder.
+    Returns:
+        (ValueError): Returns the error to raise.
+    """
+    if record.get("type") == "node":
+        return ValueError("Node {} has a parameter value which cannot be "
+                          "saved: {}".format(record["label"], error))
+    return ValueError("Record cannot be saved: {}".format(error))
+
+
+# binary
+def packString(value):
+    """This function packs a string or None with its length.
+    Args:
+        value (str): String to pack.
+    Returns:
+        (bytes): Returns packed bytes.
+    """
+    if value is None:
+        return LENGTH.pack(NONE_LENGTH)
+    data = value.encode("utf-8")
+    return LENGTH.pack(len(data)) + data
+
+
+def unpackString(buffer, offset):
+    """This function unpacks a string packed with packString.
+    Args:
+        buffer (bytes): Buffer to read.
+        offset (int): Offset of the string.
+    Returns:
+        (tuple): Returns (string, offset after the string).
+    """
+    length, = LENGTH.unpack_from(buffer, offset)
+    offset += LENGTH.size
+    if length == NONE_LENGTH:
+        return None, offset
+    return str(buffer[offset:offset + length], "utf-8"), offset + length
+
+
+def packRecord(record):
+    """This function packs a record to a binary frame.
+    Args:
+        record (dict): Record to pack.
+    Returns:
+        (bytes): Returns packed frame.
+    """
+    typ = record["type"]
+    if typ == "node":
+        parts = [NODE_HEAD.pack(record["id"], record["pos"][0],
+                                record["pos"][1], len(record["ports"])),
+                 packString(record["label"]), packString(record["nodeType"]),
+                 packString(record["thumbnail"]), packString(record["note"])]
+        for paramName, kind, paramIndex, value in record["ports"]:
+            parts.append(PORT_HEAD.pack(kind, paramIndex))
+            parts.append(packString(paramName))
+        # values of all ports go into one JSON array.
+        try:
+            values = json.dumps([port[3] for port in record["ports"]],
+                                separators=(",", ":"))
+        except (TypeError, ValueError) as error:
+            raise encodeError(record, error)
+        parts.append(packString(values))
+        tag = TAG_NODE
+    elif typ == "edge":
+        parts = [EDGE_NODE.pack(record["source"][0]),
+                 packString(record["source"][1]),
+                 EDGE_NODE.pack(record["target"][0]),
+                 packString(record["target"][1])]
+        tag = TAG_EDGE
+    else:
+        parts = [packString(json.dumps(record))]
+        tag = TAG_HEADER
+    payload = b"".join(parts)
+    return FRAME.pack(tag, len(payload)) + payload
+
+
+def unpackRecord(tag, payload):
+    """This function unpacks a binary frame payload to a record.
+    Args:
+        tag (int): Tag of the frame.
+        payload (bytes): Payload of the frame.
+    Returns:
+        (dict): Returns the record.
+    """
+    if tag == TAG_NODE:
+        nodeId, x, y, count = NODE_HEAD.unpack_from(payload, 0)
+        offset = NODE_HEAD.size
+        label, offset = unpackString(payload, offset)
+        nodeType, offset = unpackString(payload, offset)
+        thumbnail, offset = unpackString(payload, offset)
+        note, offset = unpackString(payload, offset)
+        ports = []
+        for _ in range(count):
+            kind, paramIndex = PORT_HEAD.unpack_from(payload, offset)
+            offset += PORT_HEAD.size
+            paramName, offset = unpackString(payload, offset)
+            ports.append([paramName, kind, paramIndex, None])
+        values = json.loads(unpackString(payload, offset)[0])
+        for port, value in zip(ports, values):
+            port[3] = value
+        return {"type": "node", "id": nodeId, "label": label,
+                "nodeType": nodeType, "pos": [x, y], "thumbnail": thumbnail,
+                "note": note, "ports": ports}
+    if tag == TAG_EDGE:
+        sourceNode, = EDGE_NODE.unpack_from(payload, 0)
+        sourceName, offset = unpackString(payload, EDGE_NODE.size)
+        targetNode, = EDGE_NODE.unpack_from(payload, offset)
+        targetName, offset = unpackString(payload, offset + EDGE_NODE.size)
+        return {"type": "edge", "source": [sourceNode, sourceName],
+                "target": [targetNode, targetName]}
+    return json.loads(unpackString(payload, 0)[0])
+
+
+def writeBinary(records, stream):
+    """This function writes records in the binary format.
+    Args:
+        records (iterable): Record dicts.
+        stream (io.BufferedIOBase): Binary stream to write to.
+    Returns:
+        (None): Returns None.
+    """
+    stream.write(BINARY_MAGIC)
+    for record in records:
+        stream.write(packRecord(record))
+
+
+def readBinary(stream):
+    """This function reads records from the binary format, reading the
+        file in chunks of READ_CHUNK_SIZE bytes.
+    Args:
+        stream (io.BufferedIOBase): Binary stream positioned after the magic.
+    Returns:
+        (generator): Generator of record dicts.
+    """
+    buffer = b""
+    offset = 0
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if chunk:
+            buffer = buffer[offset:] + chunk
+            offset = 0
+        while len(buffer) - offset >= FRAME.size:
+            tag, length = FRAME.unpack_from(buffer, offset)
+            end = offset + FRAME.size + length
+            if end > len(buffer):
+                break
+            try:
+                record = unpackRecord(
+                    tag, memoryview(buffer)[offset + FRAME.size:end])
+            except struct.error:
+                raise ValueError("Corrupt graph file")
+            yield record
+            offset = end
+        if not chunk:
+            if offset != len(buffer):
+                raise ValueError("Truncated graph file")
+            return
+
+
+# graph
+def addNodeRecord(record, graph_):
+    """This function adds the node described by a node record to a graph.
+    Args:
+        record (dict): Node record.
+        graph_ (graph.Graph): Graph to add to.
+    Returns:
+        (int): Returns id of the new node, its ports are in record order.
+    """
+    nodeId = graph_.addNode(label=record["label"], nodeType=record["nodeType"])
+    for paramName, kind, paramIndex, value in record["ports"]:
+        graph_.addPort(nodeId, paramName=paramName, paramValue=value,
+                       kind=kind, paramIndex=paramIndex)
+    graph_.setPosition(nodeId, *record["pos"])
+    graph_.nodeThumbnails[nodeId] = record["thumbnail"]
+    if record["note"] is not None:
+        graph_.setNote(nodeId, record["note"])
+    return nodeId
+
+
+def nodeRecord(graph_, nodeId, fileId=None):
+    """This function describes a node of a graph as a node record.
+    Args:
+        graph_ (graph.Graph): Graph holding the node.
+        nodeId (int): Id of the node.
+        fileId (int): Id stored in the record, nodeId if None.
+    Returns:
+        (dict): Returns the node record.
+    """
+    return {
+        "type": "node",
+        "id": nodeId if fileId is None else fileId,
+        "label": graph_.nodeLabels[nodeId],
+        "nodeType": graph_.nodeTypes[nodeId],
+        "pos": [graph_.nodeXs[nodeId], graph_.nodeYs[nodeId]],
+        "thumbnail": graph_.nodeThumbnails[nodeId],
+        "note": graph_.nodeNotes[nodeId],
+        # outputs hold whatever compute returned, see module docstring.
+        "ports": [[graph_.portNames[portId], graph_.portKinds[portId],
+                   graph_.portIndices[portId],
+                   None if graph_.portKinds[portId] == graph.OUTPUT else
+                   graph_.portValues[portId]]
+                  for portId in graph_.ports(nodeId)],
+    }
+
+
+def findEdgePort(end, nodeIds, graph_):
+    """This function finds the port an end of an edge record refers to.
+    Args:
+        end (list): [file node id, paramName] of the edge record.
+        nodeIds (dict): {file node id: new node id} of the nodes read.
+        graph_ (graph.Graph): Graph the nodes were added to.
+    Returns:
+        (int): Returns id of the port.
+    Raises:
+        ValueError: If the node or its port is unknown.
+    """
+    nodeId = nodeIds.get(end[0])
+    if nodeId is None:
+        raise ValueError("Edge refers to unknown node {}".format(end[0]))
+    portId = graph_.findPort(nodeId, end[1])
+    if portId is None:
+        raise ValueError("Edge refers to unknown parameter {} of node {}"
+                         .format(end[1], graph_.nodeLabels[nodeId]))
+    return portId
+
+
+def applyRecords(records, graph_):
+    """This function adds nodes and edges described by records to a graph.
+    Args:
+        records (iterable): Record dicts, starting with the header.
+        graph_ (graph.Graph): Graph to add to.
+    Returns:
+        (dict): Returns {file node id: new node id}.
+    Raises:
+        ValueError: If the header is missing or of a newer version, a
+            record lacks a field or has one of the wrong shape, or an edge
+            refers to an unknown node or parameter. Nodes added until then
+            stay in the graph.
+    """
+    records = iter(records)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise ValueError("Not a {} graph file".format(FORMAT_NAME))
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError("Graph file version {} is newer than {}".format(
+            header["version"], FORMAT_VERSION))
+    nodeIds = {}
+    for number, record in enumerate(records, 1):
+        try:
+            if record["type"] == "node":
+                nodeIds[record["id"]] = addNodeRecord(record, graph_)
+            elif record["type"] == "edge":
+                graph_.addEdge(
+                    findEdgePort(record["source"], nodeIds, graph_),
+                    findEdgePort(record["target"], nodeIds, graph_))
+        except (KeyError, IndexError, TypeError, AttributeError) as error:
+            raise ValueError("Bad record {}: {}: {}".format(
+                number, type(error).__name__, error))
+    return nodeIds
+
+
+def isBinary(path):
+    """This function checks if a path uses the binary format by extension.
+    Args:
+        path (str): File path.
+    Returns:
+        (bool): Returns True for binary files.
+    """
+    return path.lower().endswith(BINARY_EXTENSIONS)
+
+
+@contextlib.contextmanager
+def replacing(path, binary=True):
+    """This function opens a temporary file which replaces path once the
+        with block finished, or gets removed if it raised.
+    Args:
+        path (str): File path.
+        binary (bool): Open in binary mode if True, as utf-8 text if False.
+    Returns:
+        (contextlib.GeneratorContextManager): Yields the open stream.
+    """
+    tempPath = path + TEMP_SUFFIX
+    try:
+        if binary:
+            stream = open(tempPath, "wb")
+        else:
+            stream = open(tempPath, "w", encoding="utf-8")
+        with stream:
+            yield stream
+        os.replace(tempPath, path)
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+
+def save(graph_, path, binary=None, nodes=None):
+    """This function saves a graph to a file.
+    Args:
+        graph_ (graph.Graph): Graph to save.
+        path (str): File path.
+        binary (bool): Binary format if True, JSON lines if False, decided
+            by extension if None.
+        nodes (iterable): Node ids in the order to write them, see
+            iterRecords.
+    Returns:
+        (None): Returns None.
+    Raises:
+        ValueError: If a parameter value cannot be stored as JSON, the file
+            at path is left as it was.
+    """
+    if binary is None:
+        binary = isBinary(path)
+    records = iterRecords(graph_, nodes=nodes)
+    with replacing(path, binary=binary) as stream:
+        if binary:
+            writeBinary(records, stream)
+        else:
+            writeJson(records, stream)
+
+
+def load(path, graph_=None):
+    """This function loads a graph file, the format is detected from the
+        file itself.
+    Args:
+        path (str): File path.
+        graph_ (graph.Graph): Graph to add to, a new one if None.
+    Returns:
+        (tuple): Returns (graph, {file node id: new node id}).
+    """
+    if graph_ is None:
+        graph_ = graph.Graph()
+    with open(path, "rb") as stream:
+        binary = stream.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if binary:
+        with open(path, "rb") as stream:
+            stream.seek(len(BINARY_MAGIC))
+            nodeIds = applyRecords(readBinary(stream), graph_)
+    else:
+        with open(path, "r", encoding="utf-8") as stream:
+            nodeIds = applyRecords(readJson(stream), graph_)
+    return graph_, nodeIds
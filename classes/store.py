@@ -0,0 +1,374 @@
+"""Memory mapped on disk graph store.
+
+A store file holds a whole graph in a form which can be opened without
+reading it, so only the part of the graph being looked at needs to be in
+memory. The file is made of fixed sections of little endian arrays:
+
+* node columns (x, y, record offset), nodes are numbered by their row and
+  rows are sorted by (cell y, cell x) of a CELL_SIZE grid.
+* cell directory, sorted cell keys and the first row of every cell, so a
+  region query is one binary search per grid row it covers.
+* in edges grouped by target row and out edges grouped by source row, as
+  offsets plus (node row, own port ordinal, other port ordinal) columns.
+* node records packed like serialization.packRecord, read on demand.
+
+Port ordinals are positions of ports in the node record.
+"""
+import bisect
+import math
+import mmap
+import struct
+
+import serialization
+
+
+"""Declaring global variables for store"""
+STORE_MAGIC = b"NEGS"
+STORE_VERSION = 1
+CELL_SIZE = 1000.0  # Size of the grid cells nodes are sorted by.
+HEADER = struct.Struct("<4sIQQQd")  # magic, version, nodes, edges, cells,
+# cell size, followed by SECTIONS offsets.
+SECTIONS = ("xs", "ys", "records", "cellKeys", "cellRows", "inStarts",
+            "inNodes", "inPorts", "inOtherPorts", "outStarts", "outNodes",
+            "outPorts", "outOtherPorts", "heap")
+OFFSETS = struct.Struct("<{}Q".format(len(SECTIONS)))
+CELL_BITS = 32
+
+
+def cellKey(cellX, cellY):
+    """This function combines grid coordinates of a cell to one sortable key.
+    Args:
+        cellX (int): Column of the cell.
+        cellY (int): Row of the cell.
+    Returns:
+        (int): Returns key, sorted by row then column.
+    """
+    return (cellY << CELL_BITS) + (cellX + (1 << (CELL_BITS - 1)))
+
+
+def cellOf(x, y, cellSize=CELL_SIZE):
+    """This function gets grid cell of a position.
+    Args:
+        x (float): X position.
+        y (float): Y position.
+        cellSize (float): Size of the grid cells.
+    Returns:
+        (tuple): Returns (column, row).
+    """
+    return int(math.floor(x / cellSize)), int(math.floor(y / cellSize))
+
+
+def writeArray(stream, code, values):
+    """This function writes an array section padded to 8 bytes.
+    Args:
+        stream (io.BufferedIOBase): Binary stream to write to.
+        code (str): struct format character of the items.
+        values (list): Items to write.
+    Returns:
+        (int): Returns offset of the section.
+    """
+    offset = stream.tell()
+    data = struct.pack("<{}{}".format(len(values), code), *values)
+    stream.write(data + b"\0" * (-len(data) % 8))
+    return offset
+
+
+def write(graph_, path, cellSize=CELL_SIZE):
+    """This function writes a graph to a store file.
+    Args:
+        graph_ (graph.Graph): Graph to write.
+        path (str): File path.
+        cellSize (float): Size of the grid cells nodes are sorted by.
+    Returns:
+        (list): Returns node ids of the graph in row order of the file.
+    Raises:
+        ValueError: If a parameter value cannot be stored as JSON, the file
+            at path is left as it was.
+    """
+    xs, ys = graph_.nodeXs, graph_.nodeYs
+    keys = {nodeId: cellKey(*cellOf(xs[nodeId], ys[nodeId], cellSize))
+            for nodeId in graph_.nodes()}
+    nodes = sorted(keys, key=keys.get)
+    rows = {nodeId: row for row, nodeId in enumerate(nodes)}
+    ordinals = {}  # portId : position of the port in its node record.
+    for nodeId in nodes:
+        for ordinal, portId in enumerate(graph_.ports(nodeId)):
+            ordinals[portId] = ordinal
+
+    cellKeys, cellRows = [], []
+    for row, nodeId in enumerate(nodes):
+        if not cellKeys or cellKeys[-1] != keys[nodeId]:
+            cellKeys.append(keys[nodeId])
+            cellRows.append(row)
+    cellRows.append(len(nodes))
+
+    portNodes, sources, targets = graph_.portNodes, graph_.edgeSources, \
+        graph_.edgeTargets
+    columns = {}
+    for direction, edges, ownPorts, otherPorts in (
+            ("in", graph_.inEdges, targets, sources),
+            ("out", graph_.outEdges, sources, targets)):
+        starts, others, own, other = [0], [], [], []
+        for nodeId in nodes:
+            for edgeId in edges(nodeId):
+                others.append(rows[portNodes[otherPorts[edgeId]]])
+                own.append(ordinals[ownPorts[edgeId]])
+                other.append(ordinals[otherPorts[edgeId]])
+            starts.append(len(others))
+        columns[direction] = (starts, others, own, other)
+
+    offsets = {}
+    # a failed write keeps the previous file, see serialization.replacing.
+    with serialization.replacing(path) as stream:
+        stream.write(b"\0" * (HEADER.size + OFFSETS.size))
+        stream.write(b"\0" * (-stream.tell() % 8))
+        offsets["xs"] = writeArray(stream, "d", [xs[x] for x in nodes])
+        offsets["ys"] = writeArray(stream, "d", [ys[x] for x in nodes])
+        # record offsets are relative to the heap, known once it is written.
+        recordsOffset = stream.tell()
+        stream.write(b"\0" * (8 * (len(nodes) + 1)))
+        offsets["cellKeys"] = writeArray(stream, "q", cellKeys)
+        offsets["cellRows"] = writeArray(stream, "Q", cellRows)
+        for direction in ("in", "out"):
+            starts, others, own, other = columns[direction]
+            offsets[direction + "Starts"] = writeArray(stream, "Q", starts)
+            offsets[direction + "Nodes"] = writeArray(stream, "I", others)
+            offsets[direction + "Ports"] = writeArray(stream, "H", own)
+            offsets[direction + "OtherPorts"] = writeArray(stream, "H", other)
+        offsets["heap"] = stream.tell()
+        records = [0]
+        for row, nodeId in enumerate(nodes):
+            frame = serialization.packRecord(
+                serialization.nodeRecord(graph_, nodeId, fileId=row))
+            stream.write(frame)
+            records.append(records[-1] + len(frame))
+        stream.seek(recordsOffset)
+        offsets["records"] = writeArray(stream, "Q", records)
+        stream.seek(0)
+        stream.write(HEADER.pack(STORE_MAGIC, STORE_VERSION, len(nodes),
+                                 len(columns["in"][1]),
+                                 len(cellKeys), cellSize))
+        stream.write(OFFSETS.pack(*[offsets[name] for name in SECTIONS]))
+    return nodes
+
+
+class GraphStore(object):
+    """Creating GraphStore class reading a store file through mmap."""
+    def __init__(self, path):
+        """Initializing GraphStore class. Only the header is read, the rest
+            of the file gets paged in as it is queried.
+        Args:
+            path (str): File path of a store written with store.write.
+        Raises:
+            ValueError: If the file is not a store or of a newer version.
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size + OFFSETS.size:
+            self.close()
+            raise ValueError("Not a graph store file")
+        magic, version, self.nodeCount, self.edgeCount, cellCount, \
+            self.cellSize = HEADER.unpack_from(self.map, 0)
+        if magic != STORE_MAGIC:
+            self.close()
+            raise ValueError("Not a graph store file")
+        if version > STORE_VERSION:
+            self.close()
+            raise ValueError("Graph store version {} is newer than {}".format(
+                version, STORE_VERSION))
+        offsets = dict(zip(SECTIONS, OFFSETS.unpack_from(self.map,
+                                                         HEADER.size)))
+        self.view = view = memoryview(self.map)
+        inCount, outCount = self.edgeCount, self.edgeCount
+        sizes = {"xs": ("d", self.nodeCount), "ys": ("d", self.nodeCount),
+                 "records": ("Q", self.nodeCount + 1),
+                 "cellKeys": ("q", cellCount),
+                 "cellRows": ("Q", cellCount + 1),
+                 "inStarts": ("Q", self.nodeCount + 1),
+                 "inNodes": ("I", inCount), "inPorts": ("H", inCount),
+                 "inOtherPorts": ("H", inCount),
+                 "outStarts": ("Q", self.nodeCount + 1),
+                 "outNodes": ("I", outCount), "outPorts": ("H", outCount),
+                 "outOtherPorts": ("H", outCount)}
+        for name, (code, count) in sizes.items():
+            start = offsets[name]
+            size = struct.calcsize(code) * count
+            setattr(self, name, view[start:start + size].cast(code))
+        self.heap = offsets["heap"]
+        self.graph = None
+        self.nodeIds = {}  # row : node id in self.graph.
+        self.rows = {}  # node id in self.graph : row.
+        self.portIds = {}  # row : port ids of the node in record order.
+
+    def __len__(self):
+        return self.nodeCount
+
+    def close(self):
+        """This method releases the mapping and the file.
+        Returns:
+            (None): Returns None.
+        """
+        for name in SECTIONS[:-1]:
+            column = getattr(self, name, None)
+            if column is not None:
+                column.release()
+                setattr(self, name, None)
+        if getattr(self, "view", None) is not None:
+            self.view.release()
+            self.view = None
+        self.map.close()
+        self.file.close()
+
+    def record(self, row):
+        """This method reads the node record of a row.
+        Args:
+            row (int): Row of the node.
+        Returns:
+            (dict): Returns node record, see serialization.nodeRecord.
+        """
+        start = self.heap + self.records[row]
+        end = self.heap + self.records[row + 1]
+        frame = self.map[start:end]
+        tag, _ = serialization.FRAME.unpack_from(frame, 0)
+        return serialization.unpackRecord(
+            tag, memoryview(frame)[serialization.FRAME.size:])
+
+    def position(self, row):
+        """This method gets position of a node without reading its record.
+        Args:
+            row (int): Row of the node.
+        Returns:
+            (tuple): Returns (x, y).
+        """
+        return self.xs[row], self.ys[row]
+
+    def inEdges(self, row):
+        """This method gets connections into a node.
+        Args:
+            row (int): Row of the node.
+        Returns:
+            (list): Returns (source row, source port ordinal, target port
+                ordinal) tuples.
+        """
+        start, end = self.inStarts[row], self.inStarts[row + 1]
+        return list(zip(self.inNodes[start:end], self.inOtherPorts[start:end],
+                        self.inPorts[start:end]))
+
+    def outEdges(self, row):
+        """This method gets connections out of a node.
+        Args:
+            row (int): Row of the node.
+        Returns:
+            (list): Returns (target row, source port ordinal, target port
+                ordinal) tuples.
+        """
+        start, end = self.outStarts[row], self.outStarts[row + 1]
+        return list(zip(self.outNodes[start:end], self.outPorts[start:end],
+                        self.outOtherPorts[start:end]))
+
+    def region(self, left, top, right, bottom):
+        """This method finds nodes positioned inside a rectangle.
+        Args:
+            left (float): Smallest x.
+            top (float): Smallest y.
+            right (float): Largest x.
+            bottom (float): Largest y.
+        Returns:
+            (list): Returns rows of the nodes.
+        """
+        if not self.nodeCount:
+            return []
+        cellLeft, cellTop = cellOf(left, top, self.cellSize)
+        cellRight, cellBottom = cellOf(right, bottom, self.cellSize)
+        keys, cellRows, xs, ys = self.cellKeys, self.cellRows, self.xs, self.ys
+        firstRow = (keys[0] >> CELL_BITS)
+        lastRow = (keys[len(keys) - 1] >> CELL_BITS)
+        rows = []
+        for cellY in range(max(cellTop, firstRow),
+                           min(cellBottom, lastRow) + 1):
+            first = bisect.bisect_left(keys, cellKey(cellLeft, cellY))
+            last = bisect.bisect_right(keys, cellKey(cellRight, cellY))
+            if first == last:
+                continue
+            for row in range(cellRows[first], cellRows[last]):
+                if left <= xs[row] <= right and top <= ys[row] <= bottom:
+                    rows.append(row)
+        return rows
+
+    def upStream(self, row, depth=None):
+        """This method walks up stream of a node on disk.
+        Args:
+            row (int): Row of the start node, not part of the result.
+            depth (int): Number of levels to walk, all levels if None.
+        Returns:
+            (list): Returns rows in breadth first order, each once.
+        """
+        starts, inNodes = self.inStarts, self.inNodes
+        visited = {row}
+        result = []
+        level = [row]
+        while level and (depth is None or depth > 0):
+            nextLevel = []
+            for current in level:
+                for upRow in inNodes[starts[current]:starts[current + 1]]:
+                    if upRow not in visited:
+                        visited.add(upRow)
+                        nextLevel.append(upRow)
+            result.extend(nextLevel)
+            level = nextLevel
+            if depth is not None:
+                depth -= 1
+        return result
+
+    def rowOf(self, nodeId):
+        """This method finds row of a materialized node.
+        Args:
+            nodeId (int): Id of the node in the graph.
+        Returns:
+            (int): Returns row or None if the node is not from this store.
+        """
+        return self.rows.get(nodeId)
+
+    def materialize(self, rows, graph_):
+        """This method loads nodes into a graph along with their connections
+            to nodes loaded already. Rows loaded before are skipped, edits
+            made to loaded nodes are not written back to the file.
+        Args:
+            rows (iterable): Rows of the nodes to load.
+            graph_ (graph.Graph): Graph to load into, has to be the same
+                for every call.
+        Returns:
+            (list): Returns ids of the new nodes.
+        """
+        self.graph = graph_
+        nodeIds, portIds = self.nodeIds, self.portIds
+        # drop rows whose node got removed from the graph since.
+        for row in [x for x, nodeId in nodeIds.items()
+                    if not graph_.hasNode(nodeId)]:
+            del self.rows[nodeIds.pop(row)]
+            del portIds[row]
+        newRows = [row for row in dict.fromkeys(rows) if row not in nodeIds]
+        for row in newRows:
+            nodeId = serialization.addNodeRecord(self.record(row), graph_)
+            nodeIds[row] = nodeId
+            self.rows[nodeId] = row
+            portIds[row] = graph_.ports(nodeId)
+
+        def connect(sourceRow, sourceOrdinal, targetRow, targetOrdinal):
+            sourcePort = portIds[sourceRow][sourceOrdinal]
+            targetPort = portIds[targetRow][targetOrdinal]
+            if graph_.hasPort(sourcePort) and graph_.hasPort(targetPort) \
+                    and not graph_.portInEdges[targetPort]:
+                graph_.addEdge(sourcePort, targetPort)
+
+        newRowSet = set(newRows)
+        for row in newRows:
+            for sourceRow, sourceOrdinal, targetOrdinal in self.inEdges(row):
+                if sourceRow in nodeIds:
+                    connect(sourceRow, sourceOrdinal, row, targetOrdinal)
+            for targetRow, sourceOrdinal, targetOrdinal in self.outEdges(row):
+                # edges between two new nodes were made by the in edge loop.
+                if targetRow in nodeIds and targetRow not in newRowSet:
+                    connect(row, sourceOrdinal, targetRow, targetOrdinal)
+        return [nodeIds[row] for row in newRows]
@@ -0,0 +1,157 @@
+"""Asynchronous decoding and caching of node thumbnails.
+
+Images are decoded and scaled to fit THUMBNAIL_SIZE on a thread pool, then
+kept as pixmaps in a byte bounded LRU keyed by path, modification time and
+file size. Painting only looks the path up in memory, the file system is
+touched once per image and again when a QFileSystemWatcher reports a change.
+"""
+from PyQt5 import QtGui, QtCore
+import concurrent.futures
+import os
+
+import variables
+import cache
+
+
+class ThumbnailService(QtCore.QObject):
+    """Creating ThumbnailService class by inheriting QtCore.QObject"""
+    decoded = QtCore.pyqtSignal(str, object, object)  # path, key, QImage.
+    ready = QtCore.pyqtSignal(str)  # path whose thumbnail changed.
+
+    def __init__(self, parent=None, size=None, budget=None, workers=None):
+        """Initializing ThumbnailService class.
+        Args:
+            parent (QtCore.QObject): Parent object of this class.
+            size (int): Size thumbnails are scaled to, THUMBNAIL_SIZE if None.
+            budget (int): Bytes of pixmaps to keep, THUMBNAIL_CACHE_SIZE if
+                None.
+            workers (int): Decoding threads, THUMBNAIL_WORKERS if None.
+        """
+        super(ThumbnailService, self).__init__(parent)
+        self.size = size or variables.THUMBNAIL_SIZE
+        self.cache = cache.OutputCache(
+            budget=variables.THUMBNAIL_CACHE_SIZE if budget is None else budget)
+        self.keys = {}  # path : cache key, None if the file is unreadable.
+        self.pending = set()
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or variables.THUMBNAIL_WORKERS)
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.fileChanged)
+        self.watcher.directoryChanged.connect(self.directoryChanged)
+        # decoded is emitted by worker threads, so store runs on this thread.
+        self.decoded.connect(self.store)
+        self.placeholder = QtGui.QPixmap(self.size, self.size)
+        self.placeholder.fill(QtGui.QColor(0, 0, 0, 40))
+
+    def pixmap(self, path):
+        """This method gets thumbnail of an image, decoding it in the
+            background on first use.
+        Args:
+            path (str): Image path.
+        Returns:
+            (QtGui.QPixmap): Returns the thumbnail, placeholder while it is
+                decoded or None if the image cannot be read.
+        """
+        if path in self.keys:
+            key = self.keys[path]
+            if key is None:
+                return None
+            found, pixmap = self.cache.get(key)
+            if found:
+                return pixmap
+        self.request(path)
+        return self.placeholder
+
+    def request(self, path):
+        """This method queues decoding of an image.
+        Args:
+            path (str): Image path.
+        Returns:
+            (None): Returns None.
+        """
+        if path not in self.pending:
+            self.pending.add(path)
+            self.pool.submit(self.decode, path)
+
+    def decode(self, path):
+        """This method reads and scales an image, it runs on a worker thread.
+        Args:
+            path (str): Image path.
+        Returns:
+            (None): Returns None.
+        """
+        image = None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            key = None
+        else:
+            key = (path, stat.st_mtime_ns, stat.st_size, self.size)
+            reader = QtGui.QImageReader(path)
+            size = reader.size()
+            if size.isValid():
+                # fits the image in the square, keeping its aspect ratio.
+                reader.setScaledSize(size.scaled(
+                    self.size, self.size, QtCore.Qt.KeepAspectRatio))
+            else:
+                reader.setScaledSize(QtCore.QSize(self.size, self.size))
+            image = reader.read()
+            if image.isNull():
+                image = key = None
+        self.decoded.emit(path, key, image)
+
+    def store(self, path, key, image):
+        """This method caches a decoded image and watches its file.
+        Args:
+            path (str): Image path.
+            key (tuple): Cache key or None if the image cannot be read.
+            image (QtGui.QImage): Decoded image.
+        Returns:
+            (None): Returns None.
+        """
+        self.pending.discard(path)
+        self.keys[path] = key
+        if key is None:
+            # watch the folder to notice the file showing up.
+            self.watcher.addPath(os.path.dirname(os.path.abspath(path)))
+        else:
+            pixmap = QtGui.QPixmap.fromImage(image)
+            self.cache.put(key, pixmap, size=pixmap.width() *
+                           pixmap.height() * pixmap.depth() // 8)
+            if path not in self.watcher.files():
+                self.watcher.addPath(path)
+        self.ready.emit(path)
+
+    def fileChanged(self, path):
+        """This method drops thumbnail of a changed image.
+        Args:
+            path (str): Image path.
+        Returns:
+            (None): Returns None.
+        """
+        self.keys.pop(path, None)
+        self.ready.emit(path)
+
+    def directoryChanged(self, directory):
+        """This method retries unreadable images of a changed folder.
+        Args:
+            directory (str): Folder path.
+        Returns:
+            (None): Returns None.
+        """
+        for path in [x for x, key in self.keys.items() if key is None and
+                     os.path.dirname(os.path.abspath(x)) == directory]:
+            del self.keys[path]
+            self.ready.emit(path)
+
+    def shutdown(self):
+        """This method stops the decoding threads, dropping images not
+            decoded yet, and stops watching files.
+        Returns:
+            (None): Returns None.
+        """
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
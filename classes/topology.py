@@ -0,0 +1,198 @@
+"""Dynamic topological order of the graph model.
+
+The order is maintained incrementally on every connect (Pearce-Kelly), so
+checking whether a new connection would create a cycle only walks the nodes
+in between the two ends of the connection in the current order. Removing
+connections never invalidates a topological order.
+"""
+import logger
+
+
+class TopologicalOrder(object):
+    """Creating TopologicalOrder class listening to a graph."""
+    def __init__(self, graph_=None):
+        """Initializing TopologicalOrder class.
+        Args:
+            graph_ (graph.Graph): Graph model to keep ordered.
+        """
+        self.graph = graph_
+        self.order = {}  # nodeId : position.
+        self.nextPosition = 0
+        self.rebuild()
+        self.graph.addListener(self.graphChanged)
+
+    def rebuild(self):
+        """This method computes the order from scratch.
+        Returns:
+            (None): Returns None.
+        """
+        nodes = self.sortWith()
+        if len(nodes) != len(self.graph):
+            logger.log(typ="ERROR", msg="Graph contains a cycle")
+            sortedNodes = set(nodes)
+            nodes.extend(nodeId for nodeId in self.graph.nodes()
+                         if nodeId not in sortedNodes)
+        self.applyOrder(nodes)
+
+    def sortWith(self, newEdges=(), ignoredEdges=()):
+        """This method sorts the whole graph as if some connections were
+            added and some removed, without touching the graph.
+        Args:
+            newEdges (list): (sourceNode, targetNode) pairs to add.
+            ignoredEdges (iterable): Ids of edges to leave out.
+        Returns:
+            (list): Returns node ids in topological order. Nodes on a cycle
+                are missing, so the list is shorter than the graph.
+        """
+        graph_ = self.graph
+        portNodes, targets = graph_.portNodes, graph_.edgeTargets
+        ignored = set(ignoredEdges)
+        extra = {}
+        inDegree = dict.fromkeys(graph_.nodes(), 0)
+        for edgeId in graph_.edges():
+            if edgeId not in ignored:
+                inDegree[portNodes[targets[edgeId]]] += 1
+        for sourceNode, targetNode in newEdges:
+            extra.setdefault(sourceNode, []).append(targetNode)
+            inDegree[targetNode] += 1
+        ready = [nodeId for nodeId, count in inDegree.items() if not count]
+        nodes = []
+        while ready:
+            nodeId = ready.pop()
+            nodes.append(nodeId)
+            downNodes = [portNodes[targets[edgeId]]
+                         for edgeId in graph_.nodeOutEdges[nodeId] or ()
+                         if edgeId not in ignored]
+            downNodes.extend(extra.get(nodeId, ()))
+            for downNode in downNodes:
+                inDegree[downNode] -= 1
+                if not inDegree[downNode]:
+                    ready.append(downNode)
+        return nodes
+
+    def applyOrder(self, nodes):
+        """This method replaces the order with given one.
+        Args:
+            nodes (list): All node ids in topological order.
+        Returns:
+            (None): Returns None.
+        """
+        self.order = {nodeId: position for position, nodeId in enumerate(nodes)}
+        self.nextPosition = len(nodes)
+
+    def append(self, nodeId):
+        """This method puts a node at the end of the order.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (None): Returns None.
+        """
+        self.order[nodeId] = self.nextPosition
+        self.nextPosition += 1
+
+    def graphChanged(self, event, ident):
+        """This method updates the order as the graph changes.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        if event == "edgeAdded":
+            sourceNode, targetNode = self.graph.edgeNodes(ident)
+            if not self.addEdge(sourceNode, targetNode):
+                logger.log(typ="ERROR",
+                           msg="Connection from node {} to node {} creates a"
+                               " cycle",
+                           args=(self.graph.nodeLabels[sourceNode],
+                                 self.graph.nodeLabels[targetNode]))
+        elif event == "nodeAdded":
+            self.append(ident)
+        elif event == "nodeRemoved":
+            self.order.pop(ident, None)
+
+    def sortKey(self, nodeId):
+        """This method gets position of a node to sort nodes with.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (int): Returns position of the node in the order.
+        """
+        return self.order[nodeId]
+
+    def forward(self, nodeId, upperBound):
+        """This method collects nodes reachable from a node whose position is
+            not above upperBound.
+        Args:
+            nodeId (int): Id of the start node.
+            upperBound (int): Highest position to visit.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        order, downStream = self.order, self.graph.downStream
+        visited = {nodeId}
+        stack = [nodeId]
+        while stack:
+            for downNode in downStream(stack.pop()):
+                if downNode not in visited and order[downNode] <= upperBound:
+                    visited.add(downNode)
+                    stack.append(downNode)
+        return list(visited)
+
+    def backward(self, nodeId, lowerBound):
+        """This method collects nodes reaching a node whose position is above
+            lowerBound.
+        Args:
+            nodeId (int): Id of the start node.
+            lowerBound (int): Positions up to this one are not visited.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        order, upStream = self.order, self.graph.upStream
+        visited = {nodeId}
+        stack = [nodeId]
+        while stack:
+            for upNode in upStream(stack.pop()):
+                if upNode not in visited and order[upNode] > lowerBound:
+                    visited.add(upNode)
+                    stack.append(upNode)
+        return list(visited)
+
+    def canConnect(self, sourceNode, targetNode):
+        """This method checks if connecting two nodes keeps the graph acyclic.
+        Args:
+            sourceNode (int): Id of the up stream node.
+            targetNode (int): Id of the down stream node.
+        Returns:
+            (bool): Returns False if the connection would create a cycle.
+        """
+        if sourceNode == targetNode:
+            return False
+        upperBound = self.order[sourceNode]
+        if self.order[targetNode] < upperBound:
+            return sourceNode not in self.forward(targetNode, upperBound)
+        return True
+
+    def addEdge(self, sourceNode, targetNode):
+        """This method reorders the affected region after a connection.
+        Args:
+            sourceNode (int): Id of the up stream node.
+            targetNode (int): Id of the down stream node.
+        Returns:
+            (bool): Returns False if the connection created a cycle.
+        """
+        order = self.order
+        lowerBound, upperBound = order[targetNode], order[sourceNode]
+        if lowerBound > upperBound:
+            return True
+        deltaForward = self.forward(targetNode, upperBound)
+        if sourceNode in deltaForward:
+            return False
+        deltaBackward = self.backward(sourceNode, lowerBound)
+        deltaForward.sort(key=self.sortKey)
+        deltaBackward.sort(key=self.sortKey)
+        nodes = deltaBackward + deltaForward
+        positions = sorted(order[nodeId] for nodeId in nodes)
+        for nodeId, position in zip(nodes, positions):
+            order[nodeId] = position
+        return True
@@ -0,0 +1,181 @@
+"""Opt-in tracing of hot paths, exported as Chrome trace events.
+
+Methods get marked with traced() and their classes with instrument(). While
+tracing is off marked methods run untouched, enable() swaps in wrappers
+recording a span per call and disable() puts the methods back. Spans are
+tagged with label and node type of the node an item belongs to, export()
+writes them as trace event JSON for chrome://tracing or ui.perfetto.dev.
+"""
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+import variables
+import logger
+
+
+"""Declaring global variables for tracing"""
+ENABLED = False
+REGISTRY = []  # (class, attribute name, function, category, describe).
+EVENTS = collections.deque()  # (name, category, start, end, thread, args).
+
+
+def traced(category, describe=None):
+    """This function marks a method to be traced, see instrument().
+        usage:
+            @tracing.traced("paint")
+            def paint(self, painter, option, widget=None):
+    Args:
+        category (str): Category of the spans.
+        describe (callable): Called with the arguments of the method, returns
+            dict of span arguments. itemArgs if None.
+    Returns:
+        (callable): Returns decorator leaving the method as it is.
+    """
+    def mark(function):
+        function.traceCategory = category
+        function.traceDescribe = describe or itemArgs
+        return function
+    return mark
+
+
+def instrument(cls):
+    """This function registers methods of a class marked with traced().
+    Args:
+        cls (type): Class to register.
+    Returns:
+        (type): Returns the class.
+    """
+    for name, function in list(vars(cls).items()):
+        if hasattr(function, "traceCategory"):
+            REGISTRY.append((cls, name, function, function.traceCategory,
+                             function.traceDescribe))
+            if ENABLED:
+                setattr(cls, name, wrap(function, function.traceCategory,
+                                        function.traceDescribe))
+    return cls
+
+
+def wrap(function, category, describe):
+    """This function builds the tracing wrapper of a method.
+    Args:
+        function (callable): Method to trace.
+        category (str): Category of the spans.
+        describe (callable): Builds span arguments.
+    Returns:
+        (callable): Returns the wrapper.
+    """
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            end = time.perf_counter_ns()
+            try:
+                spanArgs = describe(*args, **kwargs)
+            except Exception:
+                spanArgs = {}
+            EVENTS.append((name, category, start, end, threading.get_ident(),
+                           spanArgs))
+            if len(EVENTS) > variables.TRACE_MAX_EVENTS:
+                EVENTS.popleft()
+    return wrapper
+
+
+def enable():
+    """This function starts tracing the marked methods.
+    Returns:
+        (None): Returns None.
+    """
+    global ENABLED
+    if ENABLED:
+        return
+    ENABLED = True
+    for cls, name, function, category, describe in REGISTRY:
+        setattr(cls, name, wrap(function, category, describe))
+
+
+def disable():
+    """This function stops tracing, recorded spans are kept.
+    Returns:
+        (None): Returns None.
+    """
+    global ENABLED
+    if not ENABLED:
+        return
+    ENABLED = False
+    for cls, name, function, _, _ in REGISTRY:
+        setattr(cls, name, function)
+
+
+def clear():
+    """This function drops recorded spans.
+    Returns:
+        (None): Returns None.
+    """
+    EVENTS.clear()
+
+
+def itemArgs(item, *args, **kwargs):
+    """This function gets span arguments of an item, label and type of the
+        node it belongs to.
+    Args:
+        item (object): Node, parameter, connection or other object.
+    Returns:
+        (dict): Returns the arguments, empty if it has no node.
+    """
+    node_ = getattr(item, "node", None)
+    if node_ is None and hasattr(item, "targetParam"):
+        node_ = item.targetParam.node
+    if node_ is None and hasattr(item, "nodeType"):
+        node_ = item
+    if node_ is None and hasattr(item, "parentItem") and \
+            item.parentItem() is not None:
+        return itemArgs(item.parentItem())
+    if node_ is None or getattr(node_, "nodeId", None) is None:
+        return {}
+    return {"label": node_.label, "nodeType": node_.nodeType}
+
+
+def nodeIdArgs(owner, nodeId, *args, **kwargs):
+    """This function gets span arguments of a node id.
+    Args:
+        owner (object): Object with the graph.Graph as graph attribute.
+        nodeId (int): Id of the node.
+    Returns:
+        (dict): Returns label and node type of the node.
+    """
+    return {"label": owner.graph.nodeLabels[nodeId],
+            "nodeType": owner.graph.nodeTypes[nodeId]}
+
+
+def export(path):
+    """This function writes recorded spans as Chrome trace event JSON.
+    Args:
+        path (str): JSON file path.
+    Returns:
+        (str): Returns the path, None if writing failed.
+    """
+    pid = os.getpid()
+    events = [{"name": name, "cat": category, "ph": "X", "pid": pid,
+               "tid": thread, "ts": start / 1000.0,
+               "dur": (end - start) / 1000.0, "args": args}
+              for name, category, start, end, thread, args in list(EVENTS)]
+    for thread in threading.enumerate():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid,
+                       "tid": thread.ident, "args": {"name": thread.name}})
+    try:
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+    except (IOError, OSError) as err:
+        logger.log(typ="ERROR", msg="Cannot write trace {}: {}",
+                   args=(path, err))
+        return None
+    logger.log(msg="Wrote {} spans to {}", args=(len(EVENTS), path))
+    return path
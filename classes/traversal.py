@@ -0,0 +1,175 @@
+"""Iterative up stream and down stream traversal of the graph model.
+
+Every node of a closure is returned once, however many paths lead to it.
+Full closures are cached per node and a cached closure is only dropped when
+a connection into (up stream) or out of (down stream) it changes.
+"""
+import collections
+
+
+class Traversal(object):
+    """Creating Traversal class caching dependency closures of a graph."""
+    def __init__(self, graph_=None, topology_=None):
+        """Initializing Traversal class.
+        Args:
+            graph_ (graph.Graph): Graph model to walk.
+            topology_ (topology.TopologicalOrder): Order used to sort
+                closures, sorted on demand if None.
+        """
+        self.graph = graph_
+        self.topology = topology_
+        self.upClosures = {}  # nodeId : frozenset of up stream node ids.
+        self.downClosures = {}  # nodeId : frozenset of down stream node ids.
+        self.graph.addListener(self.graphChanged)
+
+    def graphChanged(self, event, ident):
+        """This method drops cached closures affected by a graph change.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        if event in ("edgeAdded", "edgeRemoved"):
+            sourceNode, targetNode = self.graph.edgeNodes(ident)
+            self.invalidate(self.upClosures, targetNode)
+            self.invalidate(self.downClosures, sourceNode)
+        elif event == "nodeRemoved":
+            self.upClosures.pop(ident, None)
+            self.downClosures.pop(ident, None)
+
+    @staticmethod
+    def invalidate(closures, nodeId):
+        """This method drops closures of a node and of all nodes whose
+            closure contains it.
+        Args:
+            closures (dict): Cached closures.
+            nodeId (int): Id of the node whose connections changed.
+        Returns:
+            (None): Returns None.
+        """
+        closures.pop(nodeId, None)
+        stale = [key for key, closure in closures.items() if nodeId in closure]
+        for key in stale:
+            del closures[key]
+
+    def walk(self, nodeId, neighbours, depth=None):
+        """This method walks the graph breadth first from a node.
+        Args:
+            nodeId (int): Id of the start node, not part of the result.
+            neighbours (callable): graph.upStream or graph.downStream.
+            depth (int): Number of levels to walk, all levels if None.
+        Returns:
+            (list): Returns node ids in breadth first order, each once.
+        """
+        visited = {nodeId}
+        result = []
+        level = [nodeId]
+        while level and (depth is None or depth > 0):
+            nextLevel = []
+            for current in level:
+                for neighbour in neighbours(current):
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        nextLevel.append(neighbour)
+            result.extend(nextLevel)
+            level = nextLevel
+            if depth is not None:
+                depth -= 1
+        return result
+
+    def closure(self, nodeId, upStream=True):
+        """This method gets cached full closure of a node.
+        Args:
+            nodeId (int): Id of the node.
+            upStream (bool): Up stream closure if True else down stream.
+        Returns:
+            (frozenset): Returns ids of the nodes in the closure.
+        """
+        closures = self.upClosures if upStream else self.downClosures
+        closure = closures.get(nodeId)
+        if closure is None:
+            neighbours = self.graph.upStream if upStream else \
+                self.graph.downStream
+            closure = closures[nodeId] = frozenset(
+                self.walk(nodeId, neighbours))
+        return closure
+
+    def sortNodes(self, nodeIds):
+        """This method sorts nodes in topological order.
+        Args:
+            nodeIds (iterable): Ids of the nodes to sort.
+        Returns:
+            (list): Returns list of node ids, up stream first.
+        """
+        if self.topology:
+            return sorted(nodeIds, key=self.topology.sortKey)
+        graph_ = self.graph
+        inDegree = dict.fromkeys(nodeIds, 0)
+        for nodeId in inDegree:
+            for upNode in graph_.upStream(nodeId):
+                if upNode in inDegree:
+                    inDegree[nodeId] += 1
+        ready = collections.deque(
+            nodeId for nodeId, count in inDegree.items() if not count)
+        order = []
+        while ready:
+            nodeId = ready.popleft()
+            order.append(nodeId)
+            for downNode in graph_.downStream(nodeId):
+                if downNode in inDegree:
+                    inDegree[downNode] -= 1
+                    if not inDegree[downNode]:
+                        ready.append(downNode)
+        return order
+
+    def collect(self, nodeId, upStream=True, ordered=False, depth=None,
+                nodeType=None):
+        """This method gets dependencies of a node, each node once.
+        Args:
+            nodeId (int): Id of the node.
+            upStream (bool): Up stream dependencies if True else down stream.
+            ordered (bool): If True result is in topological order.
+            depth (int): Number of levels to walk, all levels if None.
+            nodeType (str): Only return nodes of this type if given.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        if depth is None:
+            nodes = self.closure(nodeId, upStream=upStream)
+        else:
+            neighbours = self.graph.upStream if upStream else \
+                self.graph.downStream
+            nodes = self.walk(nodeId, neighbours, depth=depth)
+        if nodeType is not None:
+            types = self.graph.nodeTypes
+            nodes = [x for x in nodes if types[x] == nodeType]
+        if ordered:
+            return self.sortNodes(nodes)
+        return list(nodes)
+
+    def upStream(self, nodeId, ordered=False, depth=None, nodeType=None):
+        """This method gets up stream dependencies of a node, each once.
+        Args:
+            nodeId (int): Id of the node.
+            ordered (bool): If True result is in topological order.
+            depth (int): Number of levels to walk, all levels if None.
+            nodeType (str): Only return nodes of this type if given.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        return self.collect(nodeId, upStream=True, ordered=ordered,
+                            depth=depth, nodeType=nodeType)
+
+    def downStream(self, nodeId, ordered=False, depth=None, nodeType=None):
+        """This method gets down stream dependencies of a node, each once.
+        Args:
+            nodeId (int): Id of the node.
+            ordered (bool): If True result is in topological order.
+            depth (int): Number of levels to walk, all levels if None.
+            nodeType (str): Only return nodes of this type if given.
+        Returns:
+            (list): Returns list of node ids.
+        """
+        return self.collect(nodeId, upStream=False, ordered=ordered,
+                            depth=depth, nodeType=nodeType)
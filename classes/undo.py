@@ -0,0 +1,356 @@
+"""Undo and redo of graph.Graph edits.
+
+The stack is the journal of a graph, every mutator of the graph reports to
+record what it changed. A command keeps compact diffs only: an event code
+and an id per change, plus the old position or note where those changed.
+Removed entries stay in the graph tables under their ids, so undoing a
+removal restores ids instead of re-creating items from pickles. Moves of a
+node within one command coalesce to a single entry, so a drag is one entry
+per dragged node however many mouse moves it took. History is capped by the
+approximate memory its commands use.
+"""
+import collections
+import contextlib
+import functools
+import sys
+from array import array
+
+
+"""Declaring global variables for undo"""
+EVENTS = ("nodeAdded", "nodeRemoved", "portAdded", "portRemoved",
+          "edgeAdded", "edgeRemoved", "positionChanged", "noteChanged")
+CODES = {event: code for code, event in enumerate(EVENTS)}
+NODE_ADDED, NODE_REMOVED = CODES["nodeAdded"], CODES["nodeRemoved"]
+PORT_ADDED, PORT_REMOVED = CODES["portAdded"], CODES["portRemoved"]
+EDGE_ADDED, EDGE_REMOVED = CODES["edgeAdded"], CODES["edgeRemoved"]
+POSITION_CHANGED = CODES["positionChanged"]
+NOTE_CHANGED = CODES["noteChanged"]
+OPPOSITES = {"nodeAdded": "nodeRemoved", "portAdded": "portRemoved",
+             "edgeAdded": "edgeRemoved"}
+OPPOSITES.update({y: x for x, y in OPPOSITES.items()})
+INVERSE = tuple(CODES[OPPOSITES.get(event, event)]
+                for event in EVENTS)  # code applied to undo each code.
+
+
+class Command(object):
+    """Creating Command class holding the changes of one undoable edit."""
+    __slots__ = ("name", "events", "ids", "xs", "ys", "notes", "size")
+
+    def __init__(self, name=None):
+        """Initializing Command class.
+        Args:
+            name (str): Name of the edit shown to the user.
+        """
+        self.name = name
+        self.events = bytearray()  # event codes, see CODES.
+        self.ids = array("q")  # id of the node, port or edge changed.
+        # old positions and notes, in order of their events.
+        self.xs = array("d")
+        self.ys = array("d")
+        self.notes = []
+        self.size = 0
+
+    def __len__(self):
+        """Returns number of changes in the command."""
+        return len(self.events)
+
+    def measure(self):
+        """This method approximates memory used by the command.
+        Returns:
+            (int): Returns size in bytes.
+        """
+        self.size = sys.getsizeof(self) + sys.getsizeof(self.events) + \
+            sys.getsizeof(self.ids) + sys.getsizeof(self.xs) + \
+            sys.getsizeof(self.ys) + sys.getsizeof(self.notes) + \
+            sum(sys.getsizeof(note) for note in self.notes
+                if note is not None)
+        return self.size
+
+    def changed(self, *events):
+        """This method gets ids changed by given events.
+        Args:
+            *events (str): Names of the events.
+        Returns:
+            (set): Returns set of ids.
+        """
+        codes = {CODES[event] for event in events}
+        return {ident for code, ident in zip(self.events, self.ids)
+                if code in codes}
+
+
+class UndoStack(object):
+    """Creating UndoStack class recording undoable edits of a graph."""
+    def __init__(self, graph_, maxMemory=None):
+        """Initializing UndoStack class.
+        Args:
+            graph_ (graph.Graph): Graph to record, the stack becomes its
+                journal.
+            maxMemory (int): Bytes the history may use, None for no limit.
+                The last command is always kept.
+        """
+        self.graph = graph_
+        self.maxMemory = maxMemory
+        self.undoCommands = collections.deque()
+        self.redoCommands = []
+        self.current = None  # Command being recorded.
+        self.depth = 0  # nesting of command().
+        self.moved = set()  # nodes with a position in current.
+        self.suspendDepth = 0
+        self.memory = 0  # bytes used by undoCommands and redoCommands.
+        graph_.journal = self
+
+    def record(self, event, ident, *old):
+        """This method records a change reported by the graph.
+            Changes outside command() open a command which lasts until
+            close is called.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+            *old (): Old x and y of positionChanged, old note of noteChanged.
+        Returns:
+            (None): Returns None.
+        """
+        if self.suspendDepth:
+            return
+        command = self.current
+        if command is None:
+            command = self.current = Command()
+        code = CODES[event]
+        if code == POSITION_CHANGED:
+            if ident in self.moved:
+                return
+            self.moved.add(ident)
+            command.xs.append(old[0])
+            command.ys.append(old[1])
+        elif code == NOTE_CHANGED:
+            command.notes.append(old[0])
+        command.events.append(code)
+        command.ids.append(ident)
+        if self.redoCommands:
+            self.memory -= sum(x.size for x in self.redoCommands)
+            self.redoCommands = []
+
+    @contextlib.contextmanager
+    def command(self, name):
+        """This method records everything changed inside the with block as
+            one command. Nested blocks join the outermost one.
+        Args:
+            name (str): Name of the edit shown to the user.
+        Returns:
+            (contextlib.GeneratorContextManager): Returns context manager.
+        """
+        if not self.depth:
+            self.close()
+            self.current = Command(name)
+        self.depth += 1
+        try:
+            yield self.current
+        finally:
+            self.depth -= 1
+            if not self.depth:
+                self.close()
+
+    def close(self):
+        """This method ends the command being recorded and pushes it on the
+            undo stack. Empty commands are dropped. Inside command() it does
+            nothing.
+        Returns:
+            (None): Returns None.
+        """
+        command = self.current
+        if command is None or self.depth:
+            return
+        self.current = None
+        self.moved.clear()
+        if not len(command):
+            return
+        if command.name is None:
+            moves = command.events.count(POSITION_CHANGED)
+            command.name = "Move nodes" if moves == len(command) else \
+                "Edit graph"
+        self.memory += command.measure()
+        self.undoCommands.append(command)
+        if self.maxMemory is not None:
+            while self.memory > self.maxMemory and \
+                    len(self.undoCommands) > 1:
+                self.memory -= self.undoCommands.popleft().size
+
+    def revert(self, mark=0):
+        """This method reverts changes recorded by the open command since a
+            mark and drops them from it, e.g. the part of an edit which
+            failed halfway.
+        Args:
+            mark (int): Number of changes of the command to keep, its
+                len() when the failing edit started.
+        Returns:
+            (None): Returns None.
+        """
+        command = self.current
+        if command is None or len(command) <= mark:
+            return
+        head = command.events[:mark]
+        moves = head.count(POSITION_CHANGED)
+        notes = head.count(NOTE_CHANGED)
+        tail = Command(command.name)
+        tail.events = command.events[mark:]
+        tail.ids = command.ids[mark:]
+        tail.xs, tail.ys = command.xs[moves:], command.ys[moves:]
+        tail.notes = command.notes[notes:]
+        self.apply(tail, undo=True)
+        del command.events[mark:], command.ids[mark:], command.xs[moves:], \
+            command.ys[moves:], command.notes[notes:]
+        self.moved = {ident for code, ident in zip(command.events, command.ids)
+                      if code == POSITION_CHANGED}
+
+    def canUndo(self):
+        """This method checks if there is something to undo.
+        Returns:
+            (bool): Returns True if undo would change the graph.
+        """
+        return bool(self.undoCommands) or bool(self.current)
+
+    def canRedo(self):
+        """This method checks if there is something to redo.
+        Returns:
+            (bool): Returns True if redo would change the graph.
+        """
+        return bool(self.redoCommands) and not self.current
+
+    def undo(self):
+        """This method reverts the last command.
+        Returns:
+            (Command): Returns the reverted command, None if there is none.
+        """
+        self.close()
+        if self.depth or not self.undoCommands:
+            return None
+        command = self.undoCommands.pop()
+        self.apply(command, undo=True)
+        self.redoCommands.append(command)
+        return command
+
+    def redo(self):
+        """This method applies the last undone command again.
+        Returns:
+            (Command): Returns the applied command, None if there is none.
+        """
+        self.close()
+        if self.depth or not self.redoCommands:
+            return None
+        command = self.redoCommands.pop()
+        self.apply(command, undo=False)
+        self.undoCommands.append(command)
+        return command
+
+    def apply(self, command, undo=True):
+        """This method applies changes of a command to the graph.
+            Undo walks the changes backwards applying their inverse, redo
+            walks them forwards. Consecutive changes of the same kind go to
+            the graph in one call, so a bulk edit is replayed in bulk.
+            Positions and notes are swapped with the graph, so the command
+            holds the values to go back to afterwards.
+        Args:
+            command (Command): Command to apply.
+            undo (bool): Revert the command if True, apply it if False.
+        Returns:
+            (None): Returns None.
+        """
+        graph_ = self.graph
+        events, ids = command.events, command.ids
+        count = len(events)
+        order = range(count - 1, -1, -1) if undo else range(count)
+        # index into xs, ys and notes, walking the same direction.
+        slot = len(command.xs) - 1 if undo else 0
+        noteSlot = len(command.notes) - 1 if undo else 0
+        step = -1 if undo else 1
+        # ports of nodes an undo removes go along with them and stay in
+        # their rows, restoreNodes brings them back on redo.
+        added = command.changed("nodeAdded") if undo else ()
+        with self.suspended():
+            run = []
+            runCode = None
+            for index in order:
+                code = INVERSE[events[index]] if undo else events[index]
+                ident = ids[index]
+                if code == POSITION_CHANGED:
+                    x, y = graph_.nodeXs[ident], graph_.nodeYs[ident]
+                    graph_.setPosition(ident, command.xs[slot],
+                                       command.ys[slot])
+                    command.xs[slot], command.ys[slot] = x, y
+                    slot += step
+                    continue
+                if code == NOTE_CHANGED:
+                    note = graph_.nodeNotes[ident]
+                    graph_.setNote(ident, command.notes[noteSlot])
+                    command.notes[noteSlot] = note
+                    noteSlot += step
+                    continue
+                if code == PORT_REMOVED and added and \
+                        graph_.portNodes[ident] in added:
+                    continue
+                if code != runCode:
+                    self.applyRun(runCode, run)
+                    run = []
+                    runCode = code
+                run.append(ident)
+            self.applyRun(runCode, run)
+
+    def applyRun(self, code, ids):
+        """This method applies consecutive changes of the same kind.
+        Args:
+            code (int): Event code to apply, see CODES.
+            ids (list): Ids of the nodes, ports or edges in apply order.
+        Returns:
+            (None): Returns None.
+        """
+        graph_ = self.graph
+        if not ids:
+            return
+        if code == NODE_ADDED:
+            graph_.restoreNodes(ids)
+        elif code == NODE_REMOVED:
+            graph_.removeNodes(ids)
+        elif code == PORT_ADDED:
+            for portId in ids:
+                graph_.restorePort(portId)
+        elif code == PORT_REMOVED:
+            for portId in ids:
+                graph_.removePort(portId)
+        elif code == EDGE_ADDED:
+            for edgeId in ids:
+                graph_.restoreEdge(edgeId)
+        elif code == EDGE_REMOVED:
+            graph_.removeEdges(ids)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """This method stops recording inside the with block, for changes
+            which are not edits, e.g. materializing items.
+        Returns:
+            (contextlib.GeneratorContextManager): Returns context manager.
+        """
+        self.suspendDepth += 1
+        try:
+            yield
+        finally:
+            self.suspendDepth -= 1
+
+
+def undoable(name):
+    """This function makes a method of an item or scene record everything
+        it changes as one command of its graph journal.
+    Args:
+        name (str): Name of the edit shown to the user.
+    Returns:
+        (callable): Returns the decorator.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            journal = self.graph.journal
+            if journal is None:
+                return method(self, *args, **kwargs)
+            with journal.command(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -23,6 +23,11 @@ SC_GRID_DARK_LINE_WIDTH = 2   # Grid dark line width
 
 SC_GRID_SIZE = 20  # size of one square
 
+SC_GRID_MIN_SPACING = 6  # Grid lines closer than this many pixels are hidden.
+
+SC_GRID_TILE_SIZE = 512  # Largest grid tile in pixels, the grid gets drawn
+# line by line when zoomed in further.
+
 VIEW_HIGH_ANTI_ALIASING = (
         QtGui.QPainter.Antialiasing |
         QtGui.QPainter.HighQualityAntialiasing |
@@ -32,6 +37,20 @@ VIEW_HIGH_ANTI_ALIASING = (
 
 VIEW_UPDATE_MODE = QtWidgets.QGraphicsView.FullViewportUpdate
 
+VIEW_ADAPTIVE_QUALITY = True  # Render cheaper while panning, zooming or
+# dragging and restore full quality once the view is idle.
+
+VIEW_INTERACTIVE_ANTI_ALIASING = QtGui.QPainter.TextAntialiasing  # Render
+# hints while interacting.
+
+VIEW_INTERACTIVE_UPDATE_MODE = \
+    QtWidgets.QGraphicsView.BoundingRectViewportUpdate  # Update mode while
+# interacting, scrolling reuses the pixels already on screen.
+
+VIEW_IDLE_TIME = 200  # Milliseconds without interaction to restore quality.
+
+VIEW_ADAPTIVE_MIN_ITEMS = 500  # Scenes with fewer items keep full quality.
+
 VIEW_ZOOM_FACTOR = 1.25
 
 VIEW_ZOOM = 10.0
@@ -58,3 +77,39 @@ PARAM_LABEL_FONT = QtGui.QFont("Verdana", 9)
 
 PARAM_RADIUS = 12
 
+COMPUTE_POOL_TYPE = None  # "thread" or "process" for parallel compute.
+
+COMPUTE_POOL_WORKERS = None  # Compute pool size, None for cpu count.
+
+VIRTUAL_CELL_SIZE = 500  # Grid cell size used to find visible nodes.
+
+VIRTUAL_MARGIN = 200  # Scene units around the viewport kept materialized.
+
+VIRTUAL_POOL_SIZE = 2000  # Unbound items kept for reuse, per item type.
+
+LOD_MINIMUM = 0.3  # Below this zoom items are drawn as plain shapes.
+
+LOD_TEXT = 0.5  # Below this zoom labels, notes text and thumbnails are skipped.
+
+THUMBNAIL_SIZE = NODE_SIZE + 30  # Size thumbnails are decoded to, in pixels.
+
+THUMBNAIL_CACHE_SIZE = 64 * 1024 * 1024  # Bytes of decoded thumbnails kept.
+
+THUMBNAIL_WORKERS = 2  # Threads decoding thumbnails.
+
+NODE_CACHE_MODE = QtWidgets.QGraphicsItem.NoCache  # Or DeviceCoordinateCache
+# / ItemCoordinateCache to repaint static nodes from a cached pixmap.
+
+SC_AUTO_INDEX = True  # Pick scene item index method by item count.
+
+SC_INDEX_MIN_ITEMS = 200  # Fewer items are scanned linearly (NoIndex).
+
+SC_BSP_TREE_DEPTH = 0  # BSP tree depth, 0 lets Qt pick it from item count.
+
+TRACE_ENABLED = False  # Record spans of hot paths, see tracing.py.
+
+TRACE_MAX_EVENTS = 1000000  # Spans kept while tracing, oldest get dropped.
+
+TRACE_FILE = "node_editor_trace.json"  # Trace editor.py writes on exit.
+
+UNDO_MAX_MEMORY = 32 * 1024 * 1024  # Bytes of undo history kept, see undo.py.
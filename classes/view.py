@@ -4,11 +4,11 @@ from PyQt5 import QtWidgets, QtCore, QtGui
 import scene
 import variables
 import parameter
-import connection
-import node
 import logger
+import tracing
 
 
+@tracing.instrument
 class GraphView(QtWidgets.QGraphicsView):
     """Creating a GraphView class by inheriting QGraphicsView"""
     def __init__(self, parent=None):
@@ -31,7 +31,92 @@ class GraphView(QtWidgets.QGraphicsView):
         self.draggedPosition = None
         self.isDragging = False
         self.dragLine = []
+        # virtualized scenes get their items updated once the view settled.
+        self.visibleTimer = QtCore.QTimer(self)
+        self.visibleTimer.setSingleShot(True)
+        self.visibleTimer.setInterval(0)
+        self.visibleTimer.timeout.connect(self.updateVisible)
+        # cheaper rendering while interacting, see beginInteraction.
+        self.interacting = False
+        self.idleTimer = QtCore.QTimer(self)
+        self.idleTimer.setSingleShot(True)
+        self.idleTimer.timeout.connect(self.endInteraction)
 
+    def setVirtualized(self, enabled=True):
+        """This method switches viewport virtualization of the scene, see
+            scene.GraphScene.setVirtualized.
+        Args:
+            enabled (bool): Virtualize if True.
+        Returns:
+            (None): Returns None.
+        """
+        self.scene.setVirtualized(enabled, rect=self.visibleRect())
+
+    def visibleRect(self):
+        """This method gets region of the scene shown in the viewport.
+        Returns:
+            (QtCore.QRectF): Returns the region in scene coordinates.
+        """
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def updateVisible(self):
+        """This method updates items of a virtualized scene to the region
+            shown in the viewport.
+        Returns:
+            (None): Returns None.
+        """
+        if self.scene.virtualizer:
+            self.scene.updateVisible(self.visibleRect())
+
+    def beginInteraction(self):
+        """This method lowers render quality while the view is panned,
+            zoomed or dragged in, see VIEW_INTERACTIVE_ANTI_ALIASING and
+            VIEW_INTERACTIVE_UPDATE_MODE. Full quality comes back after
+            VIEW_IDLE_TIME milliseconds without interaction.
+        Returns:
+            (None): Returns None.
+        """
+        if not variables.VIEW_ADAPTIVE_QUALITY:
+            return
+        self.idleTimer.start(variables.VIEW_IDLE_TIME)
+        if self.interacting or self.scene.batchDepth or \
+                self.scene.itemCount() < variables.VIEW_ADAPTIVE_MIN_ITEMS:
+            return
+        self.interacting = True
+        self.setRenderHints(variables.VIEW_INTERACTIVE_ANTI_ALIASING)
+        self.setViewportUpdateMode(variables.VIEW_INTERACTIVE_UPDATE_MODE)
+
+    def endInteraction(self):
+        """This method restores full render quality and repaints once.
+        Returns:
+            (None): Returns None.
+        """
+        if not self.interacting:
+            return
+        if self.scene.batchDepth:
+            # the batch restores the update mode it found when it ends.
+            self.idleTimer.start(variables.VIEW_IDLE_TIME)
+            return
+        self.interacting = False
+        self.setRenderHints(variables.VIEW_HIGH_ANTI_ALIASING)
+        self.setViewportUpdateMode(variables.VIEW_UPDATE_MODE)
+        self.viewport().update()
+
+    def scrollContentsBy(self, dx, dy):
+        """Overriding scrollContentsBy to render cheaper while panning and
+            follow it when virtualized."""
+        self.beginInteraction()
+        super().scrollContentsBy(dx, dy)
+        if self.scene.virtualizer:
+            self.visibleTimer.start()
+
+    def resizeEvent(self, event):
+        """Overriding resizeEvent to follow resizing when virtualized."""
+        super().resizeEvent(event)
+        if self.scene.virtualizer:
+            self.visibleTimer.start()
+
+    @tracing.traced("input")
     def mousePressEvent(self, event):
         """Overriding mouse press event to middle mouse press.
         Args:
@@ -49,6 +134,7 @@ class GraphView(QtWidgets.QGraphicsView):
         else:
             super().mousePressEvent(event)
 
+    @tracing.traced("input")
     def mouseReleaseEvent(self, event):
         """Overriding mouse release event to on middle mouse release.
         Args:
@@ -157,18 +243,23 @@ class GraphView(QtWidgets.QGraphicsView):
         if item:
             if type(item) == parameter.Parameter:
                 if self.draggedParameter:
-                    logger.log(msg="Adding connection from {}.{} to {}.{}".
-                               format(self.draggedParameter.node.label,
-                                      self.draggedParameter.paramName,
-                                      item.node.label, item.paramName))
+                    logger.log(msg="Adding connection from {}.{} to {}.{}",
+                               args=(self.draggedParameter.node.label,
+                                     self.draggedParameter.paramName,
+                                     item.node.label, item.paramName))
                     con = self.draggedParameter.node.addConnection(
                         sourceParam=self.draggedParameter, targetParam=item)
                     if con:
                         self.draggedParameter = None
                     self.isDragging = False
         super().mouseReleaseEvent(event)
+        # a drag moves nodes on every mouse move, it ends as one command.
+        self.scene.undoStack.close()
 
+    @tracing.traced("input")
     def mouseMoveEvent(self, event):
+        if event.buttons():
+            self.beginInteraction()
         if self.dragLine:
             self.scene.removeItem(self.dragLine)
             self.dragLine = None
@@ -197,6 +288,7 @@ class GraphView(QtWidgets.QGraphicsView):
         """
         super().mouseReleaseEvent(event)
 
+    @tracing.traced("input")
     def wheelEvent(self, event):
         """Overriding the wheel event to make zoom the viewport.
         Args:
@@ -205,6 +297,7 @@ class GraphView(QtWidgets.QGraphicsView):
         Returns:
             (None)
         """
+        self.beginInteraction()
         # calculating zoom factor
         zoom_out_factor = 1 / variables.VIEW_ZOOM_FACTOR
 
@@ -228,25 +321,23 @@ class GraphView(QtWidgets.QGraphicsView):
         # scaling the scene
         if not variables.VIEW_ZOOM_CLAMP:
             self.scale(zoom_factor, zoom_factor)
+            if self.scene.virtualizer:
+                self.visibleTimer.start()
 
     def keyPressEvent(self, event):
-        """Overriding keyPressEvent to add delete functionality"""
+        """Overriding keyPressEvent to add delete, undo and redo
+            functionality"""
         if event.key() == QtCore.Qt.Key_Delete:
             self.deleteSelected()
+        elif event.matches(QtGui.QKeySequence.Undo):
+            self.scene.undoEdit()
+        elif event.matches(QtGui.QKeySequence.Redo):
+            self.scene.redoEdit()
         else:
             super().keyPressEvent(event)
 
+    @tracing.traced("edit")
     def deleteSelected(self):
-        """This method deletes selected Node/parameter/Connection"""
-        # order is important here.
-        # First we need to remove all connections and then nodes.
-
-        # removing connections
-        selected_items = self.scene.selectedItems()
-        for item in self.scene.selectedItems():
-            if isinstance(item, connection.Connection):
-                item.remove()
-        # removing nodes
-        for item in self.scene.selectedItems():
-            if isinstance(item, node.Node):
-                item.remove()
+        """This method deletes selected Node/Connection in one pass, see
+            scene.GraphScene.removeItems."""
+        self.scene.removeItems(self.scene.selectedItems())
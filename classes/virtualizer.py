@@ -0,0 +1,210 @@
+"""Viewport virtualization of a GraphScene.
+
+The graph model holds every node, the scene only holds items for nodes in
+the visible region (plus VIRTUAL_MARGIN), their direct neighbours and the
+connections in between. Items leaving the region are unbound and pooled,
+items entering it are taken from the pool and bound to their graph node.
+Node positions are kept in a grid of VIRTUAL_CELL_SIZE cells so finding the
+nodes of a region only looks at the cells it covers.
+"""
+import math
+
+import variables
+import node
+import connection
+
+
+class Virtualizer(object):
+    """Creating Virtualizer class binding scene items to visible nodes."""
+    def __init__(self, scene=None):
+        """Initializing Virtualizer class.
+        Args:
+            scene (scene.GraphScene): Scene to virtualize.
+        """
+        self.scene = scene
+        self.graph = scene.graph
+        self.cellSize = variables.VIRTUAL_CELL_SIZE
+        self.cells = {}  # (column, row) : set of node ids.
+        self.nodeCells = {}  # nodeId : (column, row).
+        self.nodePool = []  # unbound node.Node items.
+        self.connectionPool = []  # unbound connection.Connection items.
+        self.rect = None  # last region, (left, top, right, bottom).
+        for nodeId in self.graph.nodes():
+            self.place(nodeId)
+        self.graph.addListener(self.graphChanged)
+
+    def close(self):
+        """This method stops observing the graph and drops the pools.
+        Returns:
+            (None): Returns None.
+        """
+        self.graph.removeListener(self.graphChanged)
+        for item in self.nodePool:
+            self.scene.removeItem(item)
+        for item in self.connectionPool:
+            self.scene.removeItem(item)
+        self.nodePool, self.connectionPool = [], []
+
+    def cellOf(self, x, y):
+        """This method gets grid cell of a position.
+        Args:
+            x (float): X position.
+            y (float): Y position.
+        Returns:
+            (tuple): Returns (column, row).
+        """
+        return (int(math.floor(x / self.cellSize)),
+                int(math.floor(y / self.cellSize)))
+
+    def place(self, nodeId):
+        """This method puts a node into the cell of its position.
+        Args:
+            nodeId (int): Id of the node.
+        Returns:
+            (None): Returns None.
+        """
+        cell = self.cellOf(self.graph.nodeXs[nodeId], self.graph.nodeYs[nodeId])
+        old = self.nodeCells.get(nodeId)
+        if old == cell:
+            return
+        if old is not None:
+            self.cells[old].discard(nodeId)
+        self.cells.setdefault(cell, set()).add(nodeId)
+        self.nodeCells[nodeId] = cell
+
+    def graphChanged(self, event, ident):
+        """This method keeps the grid up to date with the graph.
+        Args:
+            event (str): Name of the graph event.
+            ident (int): Id of the node, port or edge which changed.
+        Returns:
+            (None): Returns None.
+        """
+        if event in ("nodeAdded", "positionChanged"):
+            self.place(ident)
+        elif event == "nodeRemoved":
+            cell = self.nodeCells.pop(ident, None)
+            if cell is not None:
+                self.cells[cell].discard(ident)
+
+    def nodesIn(self, left, top, right, bottom):
+        """This method finds nodes whose body overlaps a region.
+        Args:
+            left (float): Smallest x.
+            top (float): Smallest y.
+            right (float): Largest x.
+            bottom (float): Largest y.
+        Returns:
+            (set): Returns ids of the nodes.
+        """
+        size = variables.NODE_SIZE
+        left, top, right, bottom = left - size, top - size, right + size, \
+            bottom + size
+        firstColumn, firstRow = self.cellOf(left, top)
+        lastColumn, lastRow = self.cellOf(right, bottom)
+        xs, ys, cells = self.graph.nodeXs, self.graph.nodeYs, self.cells
+        result = set()
+        if (lastColumn - firstColumn + 1) * (lastRow - firstRow + 1) > \
+                len(cells):
+            # region covers more cells than there are used ones.
+            candidates = (nodeIds for (column, row), nodeIds in cells.items()
+                          if firstColumn <= column <= lastColumn and
+                          firstRow <= row <= lastRow)
+        else:
+            candidates = (cells[(column, row)]
+                          for row in range(firstRow, lastRow + 1)
+                          for column in range(firstColumn, lastColumn + 1)
+                          if (column, row) in cells)
+        for nodeIds in candidates:
+            result.update(nodeId for nodeId in nodeIds
+                          if left <= xs[nodeId] <= right and
+                          top <= ys[nodeId] <= bottom)
+        return result
+
+    def update(self, rect=None):
+        """This method binds items to the nodes of a region and its direct
+            neighbours and unbinds all other items. Selected items are kept.
+        Args:
+            rect (QtCore.QRectF): Visible region in scene coordinates, last
+                region if None.
+        Returns:
+            (list): Returns list of the newly bound node.Node objects.
+        """
+        if rect is not None:
+            self.rect = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        if self.rect is None:
+            return []
+        margin = variables.VIRTUAL_MARGIN
+        left, top, right, bottom = self.rect
+        graph_, scene = self.graph, self.scene
+        visible = self.nodesIn(left - margin, top - margin, right + margin,
+                               bottom + margin)
+        wanted = set(visible)
+        for nodeId in visible:
+            wanted.update(graph_.upStream(nodeId))
+            wanted.update(graph_.downStream(nodeId))
+        wanted.update(nodeId for nodeId, item in scene.nodeItems.items()
+                      if item.isSelected())
+
+        nodes = []
+        with scene.batch():
+            for edgeId, item in list(scene.connectionItems.items()):
+                sourceNode, targetNode = graph_.edgeNodes(edgeId)
+                if sourceNode not in wanted or targetNode not in wanted:
+                    item.unbind()
+                    self.connectionPool.append(item)
+            for nodeId, item in list(scene.nodeItems.items()):
+                if nodeId not in wanted:
+                    item.unbind()
+                    self.nodePool.append(item)
+            for nodeId in wanted.difference(scene.nodeItems):
+                if self.nodePool:
+                    item = self.nodePool.pop()
+                    item.bind(nodeId)
+                else:
+                    item = node.Node(scene, nodeId=nodeId)
+                    scene.addItem(item)
+                nodes.append(item)
+            self.connect(nodes)
+            self.trim()
+        return nodes
+
+    def connect(self, nodes):
+        """This method binds connection items to edges of newly bound nodes
+            whose both ends have items.
+        Args:
+            nodes (list): Newly bound node.Node objects.
+        Returns:
+            (None): Returns None.
+        """
+        graph_, scene = self.graph, self.scene
+        items = scene.parameterItems
+        for item in nodes:
+            for edgeId in graph_.inEdges(item.nodeId) + \
+                    graph_.outEdges(item.nodeId):
+                sourcePort = graph_.edgeSources[edgeId]
+                targetPort = graph_.edgeTargets[edgeId]
+                if edgeId in scene.connectionItems or \
+                        sourcePort not in items or targetPort not in items:
+                    continue
+                if self.connectionPool:
+                    self.connectionPool.pop().bind(items[sourcePort],
+                                                   items[targetPort], edgeId)
+                else:
+                    con = connection.Connection(sourceParam=items[sourcePort],
+                                                targetParam=items[targetPort],
+                                                edgeId=edgeId)
+                    scene.addItem(con)
+                    con.setZValue(-1)
+
+    def trim(self):
+        """This method removes pooled items above VIRTUAL_POOL_SIZE from the
+            scene.
+        Returns:
+            (None): Returns None.
+        """
+        limit = variables.VIRTUAL_POOL_SIZE
+        while len(self.nodePool) > limit:
+            self.scene.removeItem(self.nodePool.pop())
+        while len(self.connectionPool) > limit:
+            self.scene.removeItem(self.connectionPool.pop())